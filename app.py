@@ -1,18 +1,66 @@
 import streamlit as st
+import streamlit.components.v1 as components
+from streamlit.errors import StreamlitAPIException
 import math
-import requests
 import textwrap
+import hashlib
 import html
 import re
+import os
 import random
 import time
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
+from local_store import LocalStore, SyncEngine, local_store_path
+from game_rules import (
+    DEBT_CAP,
+    DEFAULT_DEBT_VALUES,
+    DEFAULT_STATS,
+    DEFAULT_XP_VALUES,
+    OATH_KEYS,
+    XP_REGISTRY,
+    PlayerState,
+)
+from hud_templates import render_daily_quests, render_hud_card, render_panel
+from log_cache import LogCache
+from rules_loader import DEFAULT_RULES_PATH, RulesLoader
+from supabase_client import SupabaseClient, diff_partitions, log_filter_key, split_partitions
+from write_behind import WriteBehindQueue
+
 st.set_page_config(page_title="Player HUD", layout="wide")
 
+# ---------- STYLESHEET (static/hud.css) ----------
+# The gate + HUD CSS lives in static/hud.css. Each full run adds a <link> to
+# app/static/hud.css?v=<hash>, so the browser fetches the sheet once and reruns
+# only resend the tag. The hash changes with the file, which busts the browser
+# cache. Without static serving the CSS goes out inline as a style-only st.html.
+STYLESHEET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "hud.css")
+
+
+@st.cache_resource(show_spinner=False)
+def load_stylesheet(path: str) -> tuple:
+    """(css, short content hash), read once per process."""
+    with open(path, encoding="utf-8") as f:
+        css = f.read()
+    return css, hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+
+
+def inject_stylesheet():
+    css, version = load_stylesheet(STYLESHEET_PATH)
+    if st.get_option("server.enableStaticServing"):
+        href = f"app/static/{os.path.basename(STYLESHEET_PATH)}?v={version}"
+        st.markdown(f'<link rel="stylesheet" href="{href}">', unsafe_allow_html=True)
+    else:
+        st.html(f"<style>{css}</style>")
+
+
+inject_stylesheet()
+
 # ---------- PIN GATE ----------
 APP_PIN = "681"  # NOTE: not real security
+WELCOME_SECONDS = 0.75  # minimum time the welcome card stays up
 
 # session flags
 if "authed" not in st.session_state:
@@ -25,148 +73,7 @@ if "_clear_pin_next" not in st.session_state:
     st.session_state._clear_pin_next = False
 
 
-def _gate_styles():
-    st.markdown(
-        """
-        <style>
-        /* --- gate background matches HUD --- */
-        [data-testid="stApp"]{
-            background:
-                linear-gradient(180deg, #020412 0%, #0a0f28 60%, #121845 100%),
-                radial-gradient(circle at 80% 50%, rgba(0,255,255,0.18), transparent 55%),
-                repeating-linear-gradient(90deg, rgba(0,255,255,0.03) 0px, rgba(0,255,255,0.03) 1px, transparent 1px, transparent 40px),
-                repeating-linear-gradient(180deg, rgba(0,255,255,0.03) 0px, rgba(0,255,255,0.03) 1px, transparent 1px, transparent 40px);
-            background-blend-mode: normal, screen, normal, normal;
-            min-height: 100vh;
-            color: white;
-        }
-        header, [data-testid="stHeader"], [data-testid="stToolbar"] { background: transparent !important; }
-
-        /* tighter page padding on gate */
-        section.main > div.block-container{
-            padding-top: 20px !important;
-            padding-bottom: 22px !important;
-            max-width: 560px !important;
-        }
-
-        /* --- gate card --- */
-        .gate-wrap{
-            border-radius: 16px;
-            background: rgba(0,3,20,0.62);
-            border: 2px solid rgba(0,220,255,0.55);
-            box-shadow: 0 0 26px rgba(0,220,255,0.60), inset 0 0 16px rgba(0,220,255,0.18);
-            padding: 18px 18px 16px 18px;
-        }
-        .gate-top{
-            display:flex;
-            align-items:center;
-            justify-content:space-between;
-            gap: 12px;
-        }
-        .gate-title{
-            font-weight: 950;
-            font-size: 26px;
-            letter-spacing: 0.5px;
-            color: rgba(255,255,255,0.98);
-            text-shadow: 0 0 18px rgba(0,220,255,0.85);
-            line-height: 1.05;
-        }
-        .gate-sub{
-            margin-top: 6px;
-            font-size: 13px;
-            font-weight: 800;
-            color: rgba(255,255,255,0.75);
-            letter-spacing: 0.2px;
-        }
-        .gate-divider{
-            height: 1px;
-            background: linear-gradient(90deg, rgba(0,220,255,0.05), rgba(0,220,255,0.45), rgba(0,220,255,0.05));
-            margin: 12px 0 0 0;
-        }
-        .gate-badge{
-            width: 44px;
-            height: 44px;
-            border-radius: 999px;
-            border: 2px solid rgba(0,220,255,0.55);
-            box-shadow: 0 0 18px rgba(0,220,255,0.55), inset 0 0 12px rgba(0,220,255,0.20);
-            background: rgba(0,3,20,0.55);
-            display:flex;
-            align-items:center;
-            justify-content:center;
-            color: rgba(180,255,255,0.95);
-            font-weight: 950;
-        }
-        .gate-label{
-            font-size: 12px;
-            font-weight: 900;
-            color: rgba(255,255,255,0.82);
-            text-shadow: 0 0 10px rgba(0,220,255,0.45);
-            letter-spacing: 0.3px;
-            margin: 0 0 8px 0;
-        }
-
-        /* --- PIN input neon --- */
-        div[data-testid="stTextInput"] input{
-            border-radius: 12px !important;
-            background: rgba(0,3,20,0.55) !important;
-            border: 2px solid rgba(0,220,255,0.55) !important;
-            box-shadow:
-                0 0 18px rgba(0,220,255,0.40),
-                inset 0 0 12px rgba(0,220,255,0.18) !important;
-            color: #e8fbff !important;
-            font-weight: 900 !important;
-            min-height: 46px !important;
-        }
-        div[data-testid="stTextInput"] input:focus{
-            border: 2px solid rgba(0,255,255,0.95) !important;
-            box-shadow:
-                0 0 26px rgba(0,255,255,0.70),
-                inset 0 0 14px rgba(0,255,255,0.20) !important;
-        }
-
-        /* --- ENTER button neon (this is the real fix) --- */
-        div[data-testid="stButton"] > button,
-        button[data-testid^="baseButton-"]{
-            width: 100% !important;
-            min-height: 46px !important;
-            padding: 12px 14px !important;
-
-            border-radius: 12px !important;
-            border: 2px solid rgba(0,220,255,0.70) !important;
-
-            background: rgba(0,3,20,0.55) !important;
-            background-image: none !important;
-
-            color: #e8fbff !important;
-            font-weight: 950 !important;
-            letter-spacing: 0.6px !important;
-
-            box-shadow:
-                0 0 22px rgba(0,220,255,0.75),
-                0 0 52px rgba(0,220,255,0.35),
-                inset 0 0 14px rgba(0,220,255,0.22) !important;
-        }
-
-        div[data-testid="stButton"] > button:hover,
-        button[data-testid^="baseButton-"]:hover{
-            border: 2px solid rgba(0,255,255,0.95) !important;
-            box-shadow:
-                0 0 28px rgba(0,255,255,0.85),
-                0 0 64px rgba(0,255,255,0.40),
-                inset 0 0 16px rgba(0,255,255,0.25) !important;
-        }
-
-        div[data-testid="stButton"] > button:active,
-        button[data-testid^="baseButton-"]:active{
-            transform: translateY(1px) !important;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-
 def _gate_card_start(title: str, subtitle: str, badge: str = "JB"):
-    _gate_styles()
     st.markdown(
         f"""
         <div class="gate-root">
@@ -221,6 +128,9 @@ def pin_gate():
 
 
 def welcome_screen():
+    shown_until = time.monotonic() + WELCOME_SECONDS
+    start_prefetch()
+
     _gate_card_start("Welcome", "Loading your HUD…")
 
     st.markdown('<div style="height:18px;"></div>', unsafe_allow_html=True)
@@ -248,7 +158,8 @@ def welcome_screen():
     )
 
     _gate_card_end()
-    time.sleep(0.75)
+    # the prefetch runs under the card; only the part of WELCOME_SECONDS it left over is slept
+    time.sleep(max(0.0, shown_until - time.monotonic()))
     st.session_state.welcomed = True
     st.rerun()
 
@@ -258,10 +169,6 @@ if not st.session_state.authed:
     pin_gate()
     st.stop()
 
-if not st.session_state.welcomed:
-    welcome_screen()
-    st.stop()
-
 # ---------- TIMEZONE ----------
 USER_TZ = ZoneInfo("Europe/London")
 
@@ -287,168 +194,6 @@ if "section" not in st.session_state:
 if st.session_state.section in ["XP wall debt", "XP wall Debt"]:
     st.session_state.section = "XP Wall Debt"
 
-# ---------- XP BREAKDOWN DEFAULTS (SOURCE OF TRUTH) ----------
-DEFAULT_XP_VALUES = {
-    "Admin Work": 0.0,
-    "Design Work": 0.0,
-    "Jiu Jitsu Training": 0.0,
-    "Gym Workout": 0.0,
-    "Italian Studying": 0.0,
-    "Italian Passive listening": 0.0,
-    "Chess - Rated Matches": 0.0,
-    "Chess - Study/ Analysis": 0.0,
-    "Reading": 0.0,
-    "New Skill Learning": 0.0,
-    "Personal Challenge Quest": 0.0,
-    "Recovery": 0.0,
-    "Creative Output": 0.0,
-    "General Life Task": 0.0,
-    "Quest 1": 0.0,
-    "Quest 2": 0.0,
-    "Quest 3": 0.0,
-    "Chess Streak": 0.0,
-    "Italian Streak": 0.0,
-    "Gym Streak": 0.0,
-    "Jiu Jitsu Streak": 0.0,
-    "Eating Healthy": 0.0,
-    "Meet Hydration target": 0.0,
-}
-
-# ---------- XP RULES ----------
-XP_PER_HOUR = {
-    "Admin Work": 0.5,
-    "Design Work": 1.0,
-    "Jiu Jitsu Training": 4.0,
-    "Gym Workout": 3.0,
-    "Italian Studying": 2.0,
-    "Italian Passive listening": 0.2,
-    "Chess - Rated Matches": 2.0,
-    "Chess - Study/ Analysis": 1.0,
-    "Reading": 1.5,
-    "New Skill Learning": 2.4,
-    "Personal Challenge Quest": 3.6,
-    "Recovery": 1.6,
-    "Creative Output": 2.0,
-    "General Life Task": 0.8,
-}
-XP_COMPLETION = {"Quest 1": 3.0, "Quest 2": 2.0, "Quest 3": 1.0}
-XP_STREAK = {
-    "Chess Streak": 1.0,
-    "Italian Streak": 1.0,
-    "Gym Streak": 1.0,
-    "Jiu Jitsu Streak": 1.0,
-    "Eating Healthy": 1.0,
-    "Meet Hydration target": 1.0,
-}
-
-def xp_delta_from_choice(category: str, choice: str) -> float:
-    if category in XP_PER_HOUR:
-        rate = float(XP_PER_HOUR[category])
-        if choice == "30 min":
-            return rate * 0.5
-        if choice == "1 hour":
-            return rate * 1.0
-        return 0.0
-    if category in XP_COMPLETION:
-        return float(XP_COMPLETION[category])
-    if category in XP_STREAK:
-        return float(XP_STREAK[category])
-    return 0.0
-
-# ---------- XP WALL DEBT DEFAULTS (SHORT NAMES, 3 WORDS MAX) ----------
-OATH_KEYS = [
-    "Oath: No Cheating",
-    "Oath: No Betrayal of Trust",
-    "Oath: No Stealing",
-    "Oath: No Harm Defenseless",
-    "Oath: No Malicious Exploit",
-    "Oath: Honor Commitments",
-    "Oath: Compete w/ Integrity",
-    "Oath: Accountability",
-    "Oath: No Sabotage Others",
-]
-
-DEFAULT_DEBT_VALUES = {
-    "Skip Training": 0.0,
-    "Junk Eating": 0.0,
-    "Drug Use": 0.0,
-    "Blackout Drunk": 0.0,
-    "Reckless Driving": 0.0,
-    "Start Fight": 0.0,
-    "Doomscrolling": 0.0,
-    "Miss Work": 0.0,
-    "Impulsive Spend": 0.0,
-    "Malicious Deceit": 0.0,
-    "Break Oath": 0.0,
-    "All Nighter": 0.0,
-    "Avoid Duty": 0.0,
-    "Ignore Injury": 0.0,
-    "Miss Hydration": 0.0,
-    "Sleep Collapse": 0.0,
-    "Ghost Obligation": 0.0,
-    "Ego Decisions": 0.0,
-    "No Logging": 0.0,
-    "Message Pile": 0.0,
-    "Quest Miss": 0.0,
-    # --- OATH DEBT ITEMS (each Add = +6 XP debt) ---
-    "Oath: No Cheating": 0.0,
-    "Oath: No Betrayal of Trust": 0.0,
-    "Oath: No Stealing": 0.0,
-    "Oath: No Harm Defenseless": 0.0,
-    "Oath: No Malicious Exploit": 0.0,
-    "Oath: Honor Commitments": 0.0,
-    "Oath: Compete w/ Integrity": 0.0,
-    "Oath: Accountability": 0.0,
-    "Oath: No Sabotage Others": 0.0,
-}
-
-DEBT_PENALTY = {
-    "Skip Training": 2.0,
-    "Junk Eating": 2.0,
-    "Drug Use": 5.0,
-    "Blackout Drunk": 3.0,
-    "Reckless Driving": 4.0,
-    "Start Fight": 3.0,
-    "Doomscrolling": 1.5,
-    "Miss Work": 4.0,
-    "Impulsive Spend": 2.5,
-    "Malicious Deceit": 2.0,
-    "Break Oath": 6.0,
-    "All Nighter": 2.0,
-    "Avoid Duty": 2.0,
-    "Ignore Injury": 2.5,
-    "Miss Hydration": 1.0,
-    "Sleep Collapse": 2.0,
-    "Ghost Obligation": 3.5,
-    "Ego Decisions": 2.0,
-    "No Logging": 1.0,
-    "Message Pile": 1.5,
-    "Quest Miss": 3.0,
-    # --- OATH PENALTIES (each Add = +6 XP debt) ---
-    "Oath: No Cheating": 6.0,
-    "Oath: No Betrayal of Trust": 6.0,
-    "Oath: No Stealing": 6.0,
-    "Oath: No Harm Defenseless": 6.0,
-    "Oath: No Malicious Exploit": 6.0,
-    "Oath: Honor Commitments": 6.0,
-    "Oath: Compete w/ Integrity": 6.0,
-    "Oath: Accountability": 6.0,
-    "Oath: No Sabotage Others": 6.0,
-}
-
-# ---------- STATS DEFAULTS ----------
-DEFAULT_PHYSICAL = {"PUSH": 1, "PULL": 1, "SPD": 1, "STM": 1, "DUR": 1, "BAL": 1, "FLX": 1, "RFLX": 1, "POW": 1}
-DEFAULT_MENTAL   = {"LRN": 1, "LOG": 1, "MEM": 1, "STRAT": 1, "FOCUS": 1, "CREAT": 1, "AWARE": 1, "JUDG": 1, "CALM": 1}
-DEFAULT_SOCIAL   = {"SOC": 1, "LEAD": 1, "NEG": 1, "COM": 1, "EMP": 1, "PRES": 1}
-DEFAULT_SKILL    = {"CHESS": 1, "ITALIAN": 1, "JIUJITSU": 1, "SKATE": 1}
-
-DEFAULT_STATS = {
-    "Physical": DEFAULT_PHYSICAL,
-    "Mental": DEFAULT_MENTAL,
-    "Social": DEFAULT_SOCIAL,
-    "Skill": DEFAULT_SKILL,
-}
-
 # ---------- DAILY QUESTS (RESET @ 00:00 UTC, RANDOMISED) ----------
 # Pool 1 = Physical tests alignment (PUSH/PULL/SPD/STM/DUR/BAL/FLX/RFLX/POW)
 QUEST_POOL_1 = [
@@ -551,8 +296,8 @@ def reroll_daily_quests(force: bool = False):
     today_utc = datetime.now(timezone.utc).date().isoformat()
 
     meta = {}
-    if isinstance(st.session_state.get("xp_values", {}), dict):
-        meta = st.session_state.xp_values.get("__daily_quests__", {}) or {}
+    if "player" in st.session_state:
+        meta = st.session_state.player.meta.get("__daily_quests__", {}) or {}
 
     stored_date = meta.get("date_utc")
     stored_active = meta.get("active", {})
@@ -576,8 +321,8 @@ def reroll_daily_quests(force: bool = False):
         "completed": completed,
     }
 
-    if isinstance(st.session_state.get("xp_values", {}), dict):
-        st.session_state.xp_values["__daily_quests__"] = {
+    if "player" in st.session_state:
+        st.session_state.player.meta["__daily_quests__"] = {
             "date_utc": today_utc,
             "active": active,
             "completed": completed,
@@ -595,8 +340,8 @@ def ensure_daily_quests_in_session_from_meta():
         return
 
     meta = {}
-    if isinstance(st.session_state.get("xp_values", {}), dict):
-        meta = st.session_state.xp_values.get("__daily_quests__", {}) or {}
+    if "player" in st.session_state:
+        meta = st.session_state.player.meta.get("__daily_quests__", {}) or {}
 
     stored_date = meta.get("date_utc")
     stored_active = meta.get("active", {})
@@ -627,7 +372,7 @@ def ensure_daily_quests_in_session_from_meta():
 def write_daily_quests_to_meta_before_save():
     if "daily_quests" not in st.session_state:
         return
-    if not isinstance(st.session_state.get("xp_values", {}), dict):
+    if "player" not in st.session_state:
         return
 
     dq = st.session_state.daily_quests or {}
@@ -639,7 +384,7 @@ def write_daily_quests_to_meta_before_save():
     if not isinstance(completed, dict):
         completed = {}
 
-    st.session_state.xp_values["__daily_quests__"] = {
+    st.session_state.player.meta["__daily_quests__"] = {
         "date_utc": dq.get("date_utc"),
         "active": {
             "Quest 1": str(active.get("Quest 1", "")),
@@ -662,9 +407,8 @@ def fmt_xp(x: float, max_decimals: int = 2) -> str:
     s = f"{x:.{max_decimals}f}".rstrip("0").rstrip(".")
     return s if s else "0"
 
-def fmt_log_dt_from_payload(payload: dict) -> str:
-    ts = (payload or {}).get("_ts_utc")
-    dt = _parse_iso_dt(ts)
+def fmt_log_dt(ts_utc) -> str:
+    dt = _parse_iso_dt(ts_utc)
     if not dt:
         return "??:?? - ??.??.????"
     if dt.tzinfo is None:
@@ -672,80 +416,63 @@ def fmt_log_dt_from_payload(payload: dict) -> str:
     local = dt.astimezone(USER_TZ)
     return local.strftime("%H:%M - %d.%m.%Y")
 
-def coerce_and_align_keep_meta(loaded: dict, defaults: dict) -> dict:
+def apply_xp_with_debt_payment(xp_gain: float) -> tuple:
     """
-    Aligns to defaults, coerces to float.
-    Keeps any meta keys that start with '__' (used to persist extra data).
+    Pays debt in session first (game_rules.pay_debt_batch).
+    Returns (XP left over, {debt category: XP paid}) - the breakdown goes into the log.
     """
-    loaded = loaded or {}
-    out = {}
-    for k, dv in defaults.items():
-        try:
-            out[k] = float(loaded.get(k, dv))
-        except Exception:
-            out[k] = float(dv)
-
-    for k, v in loaded.items():
-        if isinstance(k, str) and k.startswith("__"):
-            out[k] = v
-    return out
-
-def coerce_int_dict(loaded: dict, defaults: dict) -> dict:
-    loaded = loaded or {}
-    out = {}
-    for k, dv in defaults.items():
-        try:
-            out[k] = int(loaded.get(k, dv))
-        except Exception:
-            out[k] = int(dv)
-        out[k] = max(1, min(1000, out[k]))
-    return out
+    return st.session_state.player.pay_debt(xp_gain)
 
-def apply_xp_with_debt_payment(xp_gain: float) -> float:
-    """
-    Pays down XP Wall Debt first using earned XP.
-    Returns leftover XP after debt is reduced.
-    Reduces debt proportionally across categories.
+XP_BULK_MAX_HOURS = 24.0
 
-    IMPORTANT:
-    - Only operates on real debt keys (DEFAULT_DEBT_VALUES),
-      never on meta keys like __stats__ etc.
+def parse_xp_bulk_rows(rows: list) -> tuple:
+    """
+    Validates the bulk entry table. Returns ([(category, hours, base, mode)], [error, ...]);
+    rows without a category are blank (a new row comes pre-filled with the default hours)
+    and skipped, and nothing is applied while any row is invalid.
     """
-    xp_gain = float(max(0.0, xp_gain))
-    if xp_gain <= 0:
-        return 0.0
-
-    debt_keys = list(DEFAULT_DEBT_VALUES.keys())
-    total_debt = float(sum(float(st.session_state.debt_values.get(k, 0.0)) for k in debt_keys))
-    if total_debt <= 0:
-        return xp_gain
-
-    pay = min(xp_gain, total_debt)
-    remaining_pay = pay
-
-    # proportional reduction
-    for k in debt_keys:
-        v = float(st.session_state.debt_values.get(k, 0.0))
-        if v <= 0 or remaining_pay <= 0:
+    entries, errors = [], []
+    for n, row in enumerate(rows or [], start=1):
+        cat = row.get("Category")
+        hours = row.get("Hours")
+        mode = row.get("Mode") or "Add"
+        if not cat:
             continue
-        share = (v / total_debt) * pay
-        reduction = min(v, share)
-        st.session_state.debt_values[k] = float(max(0.0, v - reduction))
-        remaining_pay -= reduction
-
-    # cleanup for float rounding remainder
-    if remaining_pay > 1e-6:
-        for k in debt_keys:
-            if remaining_pay <= 0:
-                break
-            v = float(st.session_state.debt_values.get(k, 0.0))
-            if v <= 0:
-                continue
-            reduction = min(v, remaining_pay)
-            st.session_state.debt_values[k] = float(max(0.0, v - reduction))
-            remaining_pay -= reduction
-
-    return float(xp_gain - pay)
+        if cat not in XP_REGISTRY:
+            errors.append(f"Row {n}: unknown category {cat}.")
+            continue
+        if mode not in ("Add", "Minus"):
+            errors.append(f"Row {n}: mode must be Add or Minus.")
+            continue
+        try:
+            hours = float(hours if hours not in (None, "") else 0.0)
+        except (TypeError, ValueError):
+            errors.append(f"Row {n}: hours must be a number.")
+            continue
+        if cat in RULES.xp_per_hour and not (0 < hours <= XP_BULK_MAX_HOURS):
+            errors.append(f"Row {n}: {cat} needs between 0 and {XP_BULK_MAX_HOURS:g} hours.")
+            continue
+        entries.append((cat, hours, RULES.xp_for_hours(cat, hours), mode))
+    return entries, errors
+
+def apply_xp_bulk(entries: list) -> list:
+    """Applies validated bulk rows in one pay_debt_batch; returns the xp_adjust log events."""
+    results = st.session_state.player.apply_xp_entries((cat, base, mode) for cat, _h, base, mode in entries)
+    return [
+        (
+            "xp_adjust",
+            {
+                "category": cat,
+                "mode": mode,
+                "time_choice": f"{hours:g} h" if cat in RULES.xp_per_hour else "bulk",
+                "base": base,
+                "leftover_after_debt": leftover,
+                "debt_paid": debt_paid,
+                "bulk": True,
+            },
+        )
+        for (cat, hours, base, mode), (leftover, debt_paid) in zip(entries, results)
+    ]
 
 def rule_md_to_html(md: str) -> str:
     """
@@ -804,246 +531,192 @@ def rule_md_to_html(md: str) -> str:
     return "\n".join(out)
 
 # ---------- BACKGROUND RULES: LEVEL + TITLE SYSTEM ----------
-MAX_LEVEL = 100
-TITLE_RANGES = [
-    ("Novice", 1, 5),
-    ("Trainee", 6, 10),
-    ("Adept", 11, 15),
-    ("Knight", 16, 20),
-    ("Champion", 21, 25),
-    ("Elite", 26, 30),
-    ("Legend", 31, 35),
-    ("Mythic", 36, 40),
-    ("Master", 41, 45),
-    ("Grandmaster", 46, 50),
-    ("Ascendant", 51, 55),
-    ("Exemplar", 56, 60),
-    ("Paragon", 61, 65),
-    ("Titan", 66, 70),
-    ("Sovereign", 71, 75),
-    ("Immortal-Seed", 76, 80),
-    ("Immortal", 81, 85),
-    ("Eternal-Seed", 86, 90),
-    ("Eternal", 91, 95),
-    ("World-Class", 96, 100),
-]
-
-def level_requirement(level: int) -> float:
-    return float(level * 10)
-
-def title_for_level(level: int) -> str:
-    for t, lo, hi in TITLE_RANGES:
-        if lo <= level <= hi:
-            return t
-    return "Unranked"
-
-def title_next_threshold(level: int) -> int:
-    for _t, lo, hi in TITLE_RANGES:
-        if lo <= level <= hi:
-            next_level = hi + 1
-            return next_level if next_level <= TITLE_RANGES[-1][2] else hi
-    return level
-
-def compute_level(total_xp: float, max_level: int = MAX_LEVEL) -> tuple[int, float, float]:
-    total_xp_int = max(0, int(math.floor(total_xp)))
-    level = 1
-    remaining = float(total_xp_int)
-    while level < max_level:
-        req = level_requirement(level)
-        if remaining >= req:
-            remaining -= req
-            level += 1
-        else:
-            break
-    req = level_requirement(level)
-    xp_in_level = remaining
-    return level, xp_in_level, req
-
+# (level / title tables and compute_level live in game_rules)
 def compute_derived_state_now() -> dict:
-    xp_total_now = float(sum(st.session_state.xp_values[k] for k in DEFAULT_XP_VALUES.keys()))
-    debt_total_now = float(sum(st.session_state.debt_values[k] for k in DEFAULT_DEBT_VALUES.keys()))
-    effective_xp_now = max(0.0, xp_total_now - debt_total_now)
-    lvl_now, _xin, _req = compute_level(effective_xp_now, MAX_LEVEL)
-    ttl_now = title_for_level(lvl_now)
-    return {
-        "xp_total": float(xp_total_now),
-        "debt_total": float(debt_total_now),
-        "effective_xp": float(effective_xp_now),
-        "level": int(lvl_now),
-        "title": str(ttl_now),
-    }
+    return st.session_state.player.derived.snapshot()
 
 def get_prev_derived_state() -> dict:
     meta = {}
-    if isinstance(st.session_state.get("xp_values", {}), dict):
-        meta = st.session_state.xp_values.get("__last_derived__", {}) or {}
+    if "player" in st.session_state:
+        meta = st.session_state.player.meta.get("__last_derived__", {}) or {}
     return meta if isinstance(meta, dict) else {}
 
 def set_prev_derived_state(state: dict):
-    if isinstance(st.session_state.get("xp_values", {}), dict):
-        st.session_state.xp_values["__last_derived__"] = state
-
-# ---------- CLOUD SAVE (SUPABASE) ----------
+    if "player" in st.session_state:
+        st.session_state.player.meta["__last_derived__"] = state
+
+# ---------- RULE TABLES (data.json, shared by all sessions) ----------
+@st.cache_resource(show_spinner=False)
+def get_rules_loader(path: str) -> RulesLoader:
+    return RulesLoader(path)
+
+_RULES_LOADER = get_rules_loader(st.secrets["RULES_PATH"] if "RULES_PATH" in st.secrets else DEFAULT_RULES_PATH)
+RULES = _RULES_LOADER.get()  # one stat() per rerun; recompiled only when the file changes
+if _RULES_LOADER.last_error:
+    st.warning(f"Rules file not applied, keeping the previous rates.\n\nDetails: {_RULES_LOADER.last_error}")
+
+# ---------- PERSISTENCE (LOCAL SQLITE + SUPABASE SYNC) ----------
+# Local SQLite is always the primary store (reads + writes hit local disk).
+# With Supabase configured, a SyncEngine mirrors it to the cloud in the background.
 CLOUD_ENABLED = (
     "SUPABASE_URL" in st.secrets
     and "SUPABASE_SERVICE_ROLE_KEY" in st.secrets
     and "SAVE_KEY" in st.secrets
 )
 
+SAVE_KEY = st.secrets["SAVE_KEY"] if "SAVE_KEY" in st.secrets else "local"
+LOCAL_DATA_DIR = (
+    st.secrets["LOCAL_DATA_DIR"]
+    if "LOCAL_DATA_DIR" in st.secrets
+    else os.path.join(os.path.dirname(os.path.abspath(__file__)), ".hud_data")
+)
+
+@st.cache_resource(show_spinner=False)
+def get_log_cache() -> LogCache:
+    """Log pages shared by every session; kept current by the store's append hook."""
+    return LogCache(ttl=30.0)
+
+@st.cache_resource(show_spinner=False)
+def get_local_store(data_dir: str, save_key: str) -> LocalStore:
+    """One SQLite file per save_key, shared by every Streamlit session."""
+    store = LocalStore(local_store_path(data_dir, save_key))
+    store.on_logs_appended = lambda rows: get_log_cache().merge_new(save_key, rows)
+    store.on_logs_reset = lambda: get_log_cache().invalidate(save_key)
+    return store
+
+@st.cache_resource(show_spinner=False)
+def get_write_behind(data_dir: str, save_key: str) -> WriteBehindQueue:
+    """One background writer per save_key, so saves never block a rerun."""
+    return WriteBehindQueue(get_local_store(data_dir, save_key), flush_interval=0.1)
+
+_STORE = get_local_store(LOCAL_DATA_DIR, SAVE_KEY)
+_WB = get_write_behind(LOCAL_DATA_DIR, SAVE_KEY)
+_SYNC = None
+
 if CLOUD_ENABLED:
     SUPABASE_URL = st.secrets["SUPABASE_URL"].rstrip("/")
     SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-    SAVE_KEY = st.secrets["SAVE_KEY"]
 
-    _SB_HEADERS = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-    }
+    @st.cache_resource(show_spinner=False)
+    def get_supabase_client(url: str, key: str, save_key: str) -> SupabaseClient:
+        """One pooled client per process, shared by every Streamlit session."""
+        return SupabaseClient(url, key, save_key)
 
-    def cloud_load_state():
-        url = f"{SUPABASE_URL}/rest/v1/player_state"
-        params = {"save_key": f"eq.{SAVE_KEY}", "select": "xp_values,debt_values"}
-        r = requests.get(url, headers=_SB_HEADERS, params=params, timeout=15)
-        if r.status_code >= 400:
-            raise RuntimeError(f"Supabase load failed ({r.status_code}): {r.text}")
-        rows = r.json()
-        if not rows:
-            return None
-        return rows[0].get("xp_values", {}), rows[0].get("debt_values", {})
-
-    def cloud_save_state(xp_values: dict, debt_values: dict):
-        url = f"{SUPABASE_URL}/rest/v1/player_state"
-        payload = {"save_key": SAVE_KEY, "xp_values": xp_values, "debt_values": debt_values}
-        headers = {**_SB_HEADERS, "Prefer": "resolution=merge-duplicates,return=minimal"}
-        r = requests.post(url, headers=headers, json=payload, timeout=15)
-        if r.status_code >= 400:
-            raise RuntimeError(f"Supabase save failed ({r.status_code}): {r.text}")
-
-    def cloud_append_log(event_type: str, payload: dict, snapshot=None):
-        url = f"{SUPABASE_URL}/rest/v1/player_state_log"
-        row = {
-            "save_key": SAVE_KEY,
-            "event_type": event_type,
-            "payload": payload or {},
-            "snapshot": snapshot,
-        }
-        r = requests.post(url, headers=_SB_HEADERS, json=row, timeout=15)
-        if r.status_code >= 400:
-            raise RuntimeError(f"Supabase log append failed ({r.status_code}): {r.text}")
+    @st.cache_resource(show_spinner=False)
+    def get_sync_engine(url: str, key: str, save_key: str, data_dir: str) -> SyncEngine:
+        """Pushes the local store to Supabase; cloud_bootstrap() fills an empty local store once."""
+        return SyncEngine(get_local_store(data_dir, save_key), get_supabase_client(url, key, save_key))
 
-    def cloud_load_logs(limit=500):
-        url = f"{SUPABASE_URL}/rest/v1/player_state_log"
+    _SB = get_supabase_client(SUPABASE_URL, SUPABASE_KEY, SAVE_KEY)
+    _SYNC = get_sync_engine(SUPABASE_URL, SUPABASE_KEY, SAVE_KEY, LOCAL_DATA_DIR)
 
-        attempts = [
-            {
-                "params": {
-                    "save_key": f"eq.{SAVE_KEY}",
-                    "select": "id,event_type,payload",
-                    "order": "id.desc",
-                    "limit": str(limit),
-                }
-            },
-            {
-                "params": {
-                    "save_key": f"eq.{SAVE_KEY}",
-                    "select": "event_type,payload",
-                    "limit": str(limit),
-                }
-            },
-        ]
+def cloud_bootstrap():
+    """First run of a fresh local store: pull the cloud state; the log history follows in the background."""
+    if _SYNC is None:
+        return
+    try:
+        _SYNC.bootstrap()
+    except Exception:
+        pass  # offline: the engine retries before its first push
 
-        last_err = None
-        for a in attempts:
-            r = requests.get(url, headers=_SB_HEADERS, params=a["params"], timeout=15)
-            if r.status_code < 400:
-                return r.json()
-            last_err = r.text
+def cloud_load_state():
+    cloud_bootstrap()
+    return _STORE.load_state()
 
-        raise RuntimeError(f"Supabase log load failed: {last_err}")
+def cloud_save_state(xp_values: dict, debt_values: dict):
+    _STORE.save_state(xp_values, debt_values)
 
-else:
-    def cloud_load_state():
-        return None
+def cloud_append_log(event_type: str, payload: dict, snapshot=None):
+    _STORE.append_log(event_type, payload, snapshot=snapshot)
 
-    def cloud_save_state(xp_values, debt_values):
-        return None
+def cloud_append_logs(events: list):
+    """Batched form: [{"event_type", "payload", "snapshot"}, ...] in one write."""
+    _STORE.append_logs(events)
 
-    def cloud_append_log(event_type, payload, snapshot=None):
-        return None
+def cloud_load_logs(limit=500, before_id=None, after_id=None, filters=None):
+    return _STORE.load_logs(limit=limit, before_id=before_id, after_id=after_id, filters=filters)
 
-    def cloud_load_logs(limit=500):
-        return []
-
-def ensure_stats_in_session_from_meta():
-    meta = st.session_state.xp_values.get("__stats__", {}) if isinstance(st.session_state.xp_values, dict) else {}
-    if "stats" not in st.session_state:
-        st.session_state.stats = {k: v.copy() for k, v in DEFAULT_STATS.items()}
-
-    if isinstance(meta, dict) and meta:
-        for group, defaults in DEFAULT_STATS.items():
-            loaded_group = meta.get(group, {})
-            st.session_state.stats[group] = coerce_int_dict(loaded_group, defaults)
-
-def write_stats_to_meta_before_save():
-    if "stats" in st.session_state and isinstance(st.session_state.get("xp_values", {}), dict):
-        st.session_state.xp_values["__stats__"] = {
-            "Physical": st.session_state.stats.get("Physical", {}).copy(),
-            "Mental": st.session_state.stats.get("Mental", {}).copy(),
-            "Social": st.session_state.stats.get("Social", {}).copy(),
-            "Skill": st.session_state.stats.get("Skill", {}).copy(),
-        }
+LOG_PAGE_SIZE = 50
 
-    write_daily_quests_to_meta_before_save()
+def cloud_load_logs_cached(limit=50, before_id=None, filters=None):
+    """Cached page; appends are merged in by cloud_append_log(s) / the write-behind worker."""
+    return get_log_cache().get(SAVE_KEY, limit, before_id, cloud_load_logs, filters=filters)
 
-def save_all(event_type=None, payload=None, include_snapshot=False):
-    write_stats_to_meta_before_save()
+# write-behind variants used by save_all (return immediately)
+def cloud_queue_state(xp_values: dict, debt_values: dict, patch: dict = None):
+    _WB.submit_state(xp_values, debt_values, patch=patch, version=_STORE.next_version())
 
-    prev = get_prev_derived_state()
-    now = compute_derived_state_now()
+def cloud_queue_logs(events: list):
+    _WB.submit_logs(events)
 
-    # 1) append log first
-    if CLOUD_ENABLED and event_type:
-        snap = None
-        if include_snapshot:
-            snap = {
-                "xp_values": st.session_state.xp_values,
-                "debt_values": st.session_state.debt_values,
-            }
+def cloud_flush(timeout: float = 5.0) -> bool:
+    return _WB.flush(timeout)
 
-        try:
-            cloud_append_log(event_type, with_ts(payload), snapshot=snap)
-
-            if isinstance(prev, dict) and prev:
-                if str(now.get("title")) != str(prev.get("title")):
-                    cloud_append_log("title_unlocked", with_ts({"title": now.get("title")}), snapshot=None)
-
-                if int(now.get("level", 0)) > int(prev.get("level", 0)):
-                    cloud_append_log(
-                        "level_up",
-                        with_ts({"from": int(prev.get("level", 0)), "to": int(now.get("level", 0))}),
-                        snapshot=None,
-                    )
-        except Exception as e:
-            st.error(f"Cloud log failed: {e}")
+def cloud_sync_status() -> dict:
+    status = _WB.status()
+    status.update({"unsynced": 0, "online": None, "conflict": False, "backfilling": False})
+    if _SYNC is not None:
+        sync = _SYNC.status()
+        status["unsynced"] = sync["unsynced"]
+        status["online"] = sync["online"]
+        status["conflict"] = sync["conflict"]
+        status["backfilling"] = sync["backfilling"]
+        status["last_error"] = status["last_error"] or sync["last_error"]
+    return status
+
+def save_all(event_type=None, payload=None, include_snapshot=False, batch=None):
+    """
+    Queues the log events + state snapshot on the write-behind worker.
+    Returns immediately; failures surface as the sync status in the HUD.
+    `batch` = [(event_type, payload), ...] logs several events with the same single state write.
+    """
+    write_daily_quests_to_meta_before_save()
+
+    prev = get_prev_derived_state()
+    now = compute_derived_state_now()
 
     # store derived state in meta BEFORE saving
     set_prev_derived_state(now)
 
-    # 2) save snapshot (ONCE)
-    try:
-        cloud_save_state(st.session_state.xp_values, st.session_state.debt_values)
-    except Exception as e:
-        st.error(f"Cloud save failed: {e}")
+    # the dict view of the session's arrays, built once per save
+    xp_values, debt_values = st.session_state.player.to_dicts()
 
-def _preserve_meta_keys(d: dict) -> dict:
-    """Keep keys like __daily_quests__, __stats__, __last_derived__ etc."""
-    d = d or {}
-    return {k: v for k, v in d.items() if isinstance(k, str) and k.startswith("__")}
+    # 1) collect every log row this save produces, sent as ONE bulk insert
+    logged = ([(event_type, payload)] if event_type else []) + list(batch or [])
+    if logged:
+        snap = None
+        if include_snapshot:
+            snap = {"xp_values": xp_values, "debt_values": debt_values}
+
+        events = [{"event_type": et, "payload": with_ts(p), "snapshot": None} for et, p in logged]
+        # the snapshot is the state after the whole batch
+        events[-1]["snapshot"] = snap
+
+        if isinstance(prev, dict) and prev:
+            if str(now.get("title")) != str(prev.get("title")):
+                events.append({"event_type": "title_unlocked", "payload": with_ts({"title": now.get("title")}), "snapshot": None})
+
+            if int(now.get("level", 0)) > int(prev.get("level", 0)):
+                events.append(
+                    {
+                        "event_type": "level_up",
+                        "payload": with_ts({"from": int(prev.get("level", 0)), "to": int(now.get("level", 0))}),
+                        "snapshot": None,
+                    }
+                )
+
+        cloud_queue_logs(events)
+
+    # 2) save state (ONCE): only the partitions/keys that changed since the last save
+    parts = split_partitions(xp_values, debt_values)
+    patch = diff_partitions(st.session_state.get("_persisted_parts", {}), parts)
+    st.session_state._persisted_parts = parts
+    if patch:
+        cloud_queue_state(xp_values, debt_values, patch=patch)
 
 def reset_xp():
-    meta = _preserve_meta_keys(st.session_state.get("xp_values", {}))
-    st.session_state.xp_values = {**DEFAULT_XP_VALUES.copy(), **meta}
+    # meta keys (__daily_quests__, __stats__, __last_derived__ etc.) live beside the arrays
+    st.session_state.player.reset_xp()
 
     save_all(
         event_type="reset_xp",
@@ -1053,8 +726,7 @@ def reset_xp():
     st.rerun()
 
 def reset_debt():
-    meta = _preserve_meta_keys(st.session_state.get("debt_values", {}))
-    st.session_state.debt_values = {**DEFAULT_DEBT_VALUES.copy(), **meta}
+    st.session_state.player.reset_debt()
 
     save_all(
         event_type="reset_debt",
@@ -1064,14 +736,11 @@ def reset_debt():
     st.rerun()
 
 def reset_stats_group(group_key: str):
-    if "stats" not in st.session_state or not isinstance(st.session_state.stats, dict):
-        st.session_state.stats = {k: v.copy() for k, v in DEFAULT_STATS.items()}
-
     if group_key not in DEFAULT_STATS:
         st.error(f"Unknown stats group: {group_key}")
         return
 
-    st.session_state.stats[group_key] = DEFAULT_STATS[group_key].copy()
+    st.session_state.player.reset_stats(group_key)
 
     save_all(
         event_type="reset_stats",
@@ -1080,566 +749,244 @@ def reset_stats_group(group_key: str):
     )
     st.rerun()
 
+# ---------- STARTUP PREFETCH ----------
+# The welcome screen starts the state read and the newest Log page side by side;
+# CLOUD INIT below collects the state, and the Log view finds its first page in
+# the shared log cache. Sessions that skip the welcome screen load inline.
+@st.cache_resource(show_spinner=False)
+def get_prefetch_pool() -> ThreadPoolExecutor:
+    """Startup reads for every session; each session submits two short jobs."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="hud-prefetch")
+
+def load_initial_state():
+    # another session may still have writes in flight for this save_key
+    cloud_flush(timeout=5.0)
+    return cloud_load_state()
+
+def _prefetch_logs():
+    cloud_bootstrap()
+    return cloud_load_logs_cached(limit=LOG_PAGE_SIZE)
+
+def start_prefetch():
+    if "_prefetch_state" in st.session_state:
+        return
+    pool = get_prefetch_pool()
+    st.session_state._prefetch_state = pool.submit(load_initial_state)
+    pool.submit(_prefetch_logs)
+
+def take_initial_state():
+    """The prefetched state (waits for it if still in flight), or a fresh load."""
+    future = st.session_state.pop("_prefetch_state", None)
+    return future.result() if future is not None else load_initial_state()
+
+# ---------- WELCOME (runs while the prefetch is in flight) ----------
+if not st.session_state.welcomed:
+    welcome_screen()
+    st.stop()
+
 # ---------- CLOUD INIT ----------
-if "xp_values" not in st.session_state or "debt_values" not in st.session_state:
+if "player" not in st.session_state:
     try:
-        loaded = cloud_load_state()
+        loaded = take_initial_state()
     except Exception as e:
         st.warning(f"Cloud sync unavailable. Using local defaults for this session.\n\nDetails: {e}")
         loaded = None
 
     if loaded is None:
-        st.session_state.xp_values = DEFAULT_XP_VALUES.copy()
-        st.session_state.debt_values = DEFAULT_DEBT_VALUES.copy()
-        st.session_state.stats = {k: v.copy() for k, v in DEFAULT_STATS.items()}
+        if _SYNC is not None and not _SYNC.bootstrapped():
+            # fresh disk, cloud unreachable: these defaults are a placeholder that the
+            # cloud save replaces (and that is never pushed over it) once it answers
+            _SYNC.mark_defaults_only()
+            st.session_state._defaults_only = True
+            st.warning("Cloud sync unavailable. Using defaults until the cloud save loads; changes made before then are discarded.")
+        st.session_state.player = PlayerState()
         save_all()
     else:
+        # aligned to the category registry + coerced once here (old cloud state included)
         xp_loaded, debt_loaded = loaded
-        st.session_state.xp_values = coerce_and_align_keep_meta(xp_loaded, DEFAULT_XP_VALUES)
-        st.session_state.debt_values = coerce_and_align_keep_meta(debt_loaded, DEFAULT_DEBT_VALUES)
-        ensure_stats_in_session_from_meta()
-
-# Always align (prevents KeyError if old cloud state exists)
-st.session_state.xp_values = coerce_and_align_keep_meta(st.session_state.get("xp_values", {}), DEFAULT_XP_VALUES)
-st.session_state.debt_values = coerce_and_align_keep_meta(st.session_state.get("debt_values", {}), DEFAULT_DEBT_VALUES)
-ensure_stats_in_session_from_meta()
-
-# ---------- GLOBAL STYLES ----------
-st.markdown(
-    """
-    <style>
-    html, body { height: 100%; }
-    [data-testid="stApp"]{
-        background:
-            linear-gradient(180deg, #020412 0%, #0a0f28 60%, #121845 100%),
-            radial-gradient(circle at 80% 50%, rgba(0,255,255,0.18), transparent 55%),
-            repeating-linear-gradient(90deg, rgba(0,255,255,0.03) 0px, rgba(0,255,255,0.03) 1px, transparent 1px, transparent 40px),
-            repeating-linear-gradient(180deg, rgba(0,255,255,0.03) 0px, rgba(0,255,255,0.03) 1px, transparent 1px, transparent 40px);
-        background-blend-mode: normal, screen, normal, normal;
-        min-height: 100vh;
-        color: white;
-        font-family: sans-serif;
-    }
-    header, [data-testid="stHeader"], [data-testid="stToolbar"] { background: transparent !important; }
-
-    section.main > div.block-container{
-        padding-top: 6px !important;
-        padding-bottom: 22px !important;
-        padding-left: 10px !important;
-        padding-right: 10px !important;
-        margin: 0 auto !important;
-    }
-
-    .hud-title{
-        font-weight: 900;
-        font-size: clamp(28px, 4vw, 46px);
-        color: #fff;
-        text-shadow: 0 0 20px rgba(0,220,255,1), 0 0 40px rgba(0,180,255,0.7);
-        margin: 10px 0 16px 0;
-        text-align: left;
-    }
-
-    .hud-box, .progress-box{
-        width: 100%;
-        max-width: 420px;
-        padding: 16px 20px;
-        border-radius: 12px;
-        background: rgba(0,3,20,0.55);
-        border: 2px solid rgba(0,220,255,0.5);
-        box-shadow: 0 0 26px rgba(0,220,255,0.7), inset 0 0 16px rgba(0,220,255,0.25);
-        line-height: 1.7;
-        font-size: clamp(14px, 1.2vw, 18px);
-        margin-bottom: 14px;
-    }
-
-    .glow-bar{
-        width: 100%;
-        height: 22px;
-        border-radius: 999px;
-        background: rgba(0,0,0,0.45);
-        border: 1px solid rgba(0,220,255,0.35);
-        box-shadow: 0 0 14px rgba(0,220,255,0.45);
-        overflow: hidden;
-        position: relative;
-        margin-top: 10px;
-    }
-    .glow-bar-fill{
-        height: 100%;
-        border-radius: 999px;
-        background: linear-gradient(90deg, rgba(0,180,255,0.85), rgba(0,255,255,0.75));
-        box-shadow: 0 0 18px rgba(0,255,255,1), 0 0 34px rgba(0,180,255,0.9);
-        transition: width 0.25s ease-out;
-    }
-    .glow-bar-fill-red{
-        height: 100%;
-        border-radius: 999px;
-        background: linear-gradient(90deg, rgba(255,60,60,0.90), rgba(255,120,80,0.75));
-        box-shadow: 0 0 18px rgba(255,60,60,1), 0 0 34px rgba(255,120,80,0.7);
-        transition: width 0.25s ease-out;
-    }
-    .glow-bar-text{
-        position: absolute;
-        inset: 0;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-weight: 900;
-        font-size: 13px;
-        color: rgba(255,255,255,0.95);
-        text-shadow: 0 0 10px rgba(0,220,255,0.7);
-        pointer-events: none;
-    }
-    .glow-bar-text-red{
-        text-shadow: 0 0 10px rgba(255,80,80,0.65);
-    }
-
-    .bar-label{
-        margin-top: 10px;
-        font-weight: 900;
-        font-size: 13px;
-        letter-spacing: 0.3px;
-        opacity: 0.92;
-        text-shadow: 0 0 10px rgba(0,220,255,0.45);
-    }
-
-    .panel{
-        width: 100%;
-        max-width: 440px;
-        padding: 16px 20px;
-        border-radius: 12px;
-        background: rgba(0,3,20,0.60);
-        border: 2px solid rgba(0,220,255,0.55);
-        box-shadow: 0 0 26px rgba(0,220,255,0.7), inset 0 0 16px rgba(0,220,255,0.25);
-        margin-top: 16px;
-    }
-    .panel-title{
-        font-weight: 950;
-        font-size: 20px;
-        letter-spacing: 0.6px;
-        margin-bottom: 12px;
-        text-shadow: 0 0 14px rgba(0,220,255,0.7);
-    }
-
-    .xp-row{
-        display: flex;
-        justify-content: space-between;
-        gap: 14px;
-        padding: 6px 0;
-        border-bottom: 1px solid rgba(0,220,255,0.12);
-        font-size: 15px;
-    }
-    .xp-name{ opacity: 0.95; font-weight: 800; }
-    .xp-val{ opacity: 0.95; font-weight: 950; color: rgba(180,255,255,0.95); text-shadow: 0 0 10px rgba(0,220,255,0.35); }
-    .xp-val-debt{ opacity: 0.95; font-weight: 950; color: rgba(255,140,140,0.95); text-shadow: 0 0 10px rgba(255,80,80,0.35); }
-
-    .menu-header{
-        width: 100%;
-        max-width: 440px;
-        margin-top: 10px;
-        margin-bottom: 8px;
-        font-weight: 950;
-        font-size: 20px;
-        letter-spacing: 0.6px;
-        text-shadow: 0 0 14px rgba(0,220,255,0.7);
-    }
-
-    /* Make ALL widget labels white */
-    [data-testid="stWidgetLabel"] label,
-    [data-testid="stWidgetLabel"] > label,
-    label,
-    label *{
-        color: rgba(255,255,255,0.98) !important;
-        font-weight: 900 !important;
-        text-shadow: 0 0 10px rgba(0,220,255,0.45) !important;
-    }
-
-    /* Selectbox styling */
-    div[data-testid="stSelectbox"] div[role="combobox"]{
-        border-radius: 12px !important;
-        background: rgba(0,3,20,0.55) !important;
-        border: 2px solid rgba(0,220,255,0.55) !important;
-        box-shadow: 0 0 18px rgba(0,220,255,0.55),
-                    inset 0 0 12px rgba(0,220,255,0.20) !important;
-        color: #e8fbff !important;
-        min-height: 44px !important;
-    }
-    div[data-testid="stSelectbox"] div[role="combobox"] *{
-        color: #e8fbff !important;
-        font-weight: 900 !important;
-    }
-    /* click-only selectbox (hide typing) */
-    div[data-testid="stSelectbox"] input{
-        opacity: 0 !important;
-        height: 0px !important;
-        padding: 0 !important;
-        margin: 0 !important;
-        border: 0 !important;
-    }
-
-    /* Buttons */
-    div[data-testid="stButton"] > button{
-        width: 100%;
-        border-radius: 12px !important;
-        background: rgba(0,3,20,0.55) !important;
-        border: 2px solid rgba(0,220,255,0.55) !important;
-        box-shadow: 0 0 18px rgba(0,220,255,0.55),
-                    inset 0 0 12px rgba(0,220,255,0.20) !important;
-        color: #e8fbff !important;
-        font-weight: 950 !important;
-        letter-spacing: 0.5px;
-        padding: 10px 14px !important;
-        min-height: 44px !important;
-    }
-    div[data-testid="stButton"] > button:hover{
-        border: 2px solid rgba(0,255,255,0.85) !important;
-        box-shadow: 0 0 24px rgba(0,255,255,0.75),
-                    inset 0 0 14px rgba(0,255,255,0.25) !important;
-    }
-    div[data-testid="stButton"] > button:active{
-        transform: translateY(1px);
-    }
-
-    [data-testid="stVerticalBlockBorderWrapper"]{
-        border-radius: 12px !important;
-        background: rgba(0,3,20,0.60) !important;
-        border: 2px solid rgba(0,220,255,0.55) !important;
-        box-shadow: 0 0 26px rgba(0,220,255,0.7), inset 0 0 16px rgba(0,220,255,0.25) !important;
-        padding: 14px 16px !important;
-    }
-
-    /* Settings expander arrow -> black + bold-ish */
-    div[data-testid="stExpander"] summary svg {
-        stroke: #000 !important;
-        stroke-width: 3px !important;
-    }
-    div[data-testid="stExpander"] summary {
-        font-weight: 950 !important;
-    }
+        st.session_state.player = PlayerState.from_dicts(xp_loaded, debt_loaded)
+        # baseline for dirty tracking = what the cloud already holds
+        st.session_state._persisted_parts = split_partitions(xp_loaded, debt_loaded)
 
-    .dq-box{
-        width:22px;
-        height:22px;
-        border-radius:6px;
-        border:2px solid rgba(0,220,255,0.75);
-        box-shadow: 0 0 12px rgba(0,220,255,0.45);
-        flex: 0 0 auto;
-    }
-    .dq-box.done{
-        background: linear-gradient(180deg, rgba(0,255,255,0.85), rgba(0,180,255,0.70));
-    }
-    .dq-text{
-        flex: 1 1 auto;
-        font-weight: 900;
-        color: rgba(255,255,255,0.95);
-        text-shadow: 0 0 10px rgba(0,220,255,0.35);
-        line-height: 1.3;
-        font-size: 14px;
-    }
-
-    /* --- SETTINGS: compact layout, no overflow --- */
-    div[data-testid="stExpander"] div[data-testid="stHorizontalBlock"]{
-        gap: 10px !important;
-    }
-
-    div[data-testid="stExpander"] div[data-testid="stButton"]{
-        margin: 6px 0 !important;
-    }
-    div[data-testid="stExpander"] div[data-testid="stButton"] > button{
-        margin: 0 !important;
-        padding: 8px 10px !important;
-        min-height: 40px !important;
-        font-size: 13px !important;
-    }
-
-    section.main{
-        overflow-x: hidden !important;
-    }
-
-    /* HUD avatar circle */
-    .hud-avatar{
-        width:42px;
-        height:42px;
-        border-radius:999px;
-        border:2px solid rgba(0,220,255,0.55);
-        box-shadow: 0 0 18px rgba(0,220,255,0.55), inset 0 0 12px rgba(0,220,255,0.20);
-        background: rgba(0,3,20,0.55);
-        display:flex;
-        align-items:center;
-        justify-content:center;
-        color: rgba(180,255,255,0.95);
-        font-weight:950;
-        flex: 0 0 auto;
-    }
-
-    /* ---------- RULEBOOK STYLING ---------- */
-    .rulebook{
-        opacity: 0.92;
-        font-weight: 750;
-        line-height: 1.65;
-        font-size: 14px;
-    }
-
-    .rulebook ul{
-        margin: 6px 0 10px 18px;
-        padding: 0;
-    }
-    .rulebook li{
-        margin: 4px 0;
-    }
-
-    .rulebook-wrap{
-        display: flex;
-        flex-direction: column;
-        gap: 12px;
-    }
-
-    .rulebox{
-        border-radius: 14px;
-        background: rgba(0,3,20,0.52);
-        border: 1px solid rgba(0,220,255,0.28);
-        box-shadow: 0 0 18px rgba(0,220,255,0.22), inset 0 0 14px rgba(0,220,255,0.08);
-        padding: 14px 14px;
-    }
-
-    .rulebox-title{
-        font-weight: 950;
-        font-size: 16px;
-        letter-spacing: 0.4px;
-        color: rgba(180,255,255,0.95);
-        text-shadow: 0 0 12px rgba(0,220,255,0.35);
-        margin-bottom: 8px;
-    }
-
-    .rulebox-body{
-        opacity: 0.92;
-        font-weight: 750;
-        line-height: 1.65;
-        font-size: 14px;
-    }
-
-    .rulebox-subtitle{
-        margin-top: 10px;
-        font-weight: 950;
-        font-size: 14px;
-        letter-spacing: 0.35px;
-        color: rgba(255,255,255,0.96);
-        text-shadow: 0 0 10px rgba(0,220,255,0.25);
-    }
-
-    .rulebox-body code{
-        padding: 1px 6px;
-        border-radius: 8px;
-        border: 1px solid rgba(0,220,255,0.25);
-        background: rgba(0,3,20,0.55);
-        color: rgba(180,255,255,0.95);
-        font-weight: 900;
-    }
-
-    .rb-spacer{ height: 8px; }
-
-    @media (max-width: 600px){
-        .hud-title{
-            margin-top: 0px;
-            font-size: 34px !important;
-            text-align: center;
-            margin-bottom: 10px;
-        }
-        .hud-box, .progress-box, .panel{
-            max-width: 100% !important;
-            padding: 10px 12px !important;
-            font-size: 13px !important;
-            border-width: 1.4px !important;
-            margin-bottom: 10px !important;
-        }
-        .panel-title{
-            font-size: 15px !important;
-            margin-bottom: 6px !important;
-        }
-        .xp-row{
-            font-size: 13px !important;
-            padding: 4px 0 !important;
-            gap: 8px !important;
-        }
-        .glow-bar{
-            height: 16px !important;
-            margin-top: 5px !important;
-        }
-        div[data-testid="stButton"] > button{
-            font-size: 12px !important;
-            padding: 6px 8px !important;
-            min-height: 34px !important;
-        }
-        div[data-testid="stSelectbox"] div[role="combobox"]{
-            font-size: 12px !important;
-            min-height: 34px !important;
-            padding: 4px 8px !important;
-        }
-        div[data-testid="stSelectbox"] ul{
-            font-size: 12px !important;
-        }
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+def adopt_cloud_state():
+    """Swaps a placeholder-defaults session onto the cloud save once the sync engine has pulled it."""
+    if not st.session_state.get("_defaults_only") or _SYNC is None or _SYNC.defaults_only():
+        return
+    del st.session_state._defaults_only
+    loaded = _STORE.load_state()
+    if loaded is not None:
+        xp_loaded, debt_loaded = loaded
+        st.session_state.player = PlayerState.from_dicts(xp_loaded, debt_loaded)
+        st.session_state._persisted_parts = split_partitions(xp_loaded, debt_loaded)
+        st.session_state.pop("daily_quests", None)
 
 # ---------- XP TOTAL + LEVEL SYSTEM OUTPUT ----------
-xp_total = float(sum(st.session_state.xp_values[k] for k in DEFAULT_XP_VALUES.keys()))
-debt_total = float(sum(st.session_state.debt_values[k] for k in DEFAULT_DEBT_VALUES.keys()))
-
-debt_warning = (
-    ' <span style="color: rgba(255,90,90,0.95); font-weight: 950;">(Clear debt before gaining XP)</span>'
-    if debt_total > 0
-    else ""
-)
-
-# RULE: progression uses effective XP
-effective_xp = max(0.0, xp_total - debt_total)
-
-# Level + title are based on effective XP (rule)
-level, _xp_in_level_effective, _xp_required_effective = compute_level(effective_xp, MAX_LEVEL)
-title = title_for_level(level)
-
-# Raw level (for UI bars that should NOT move when debt changes)
-level_raw, _xp_in_level_raw_for_title, _xp_required_raw_for_title = compute_level(xp_total, MAX_LEVEL)
-
-title_next_raw = title_next_threshold(level_raw)
-title_pct = 0 if title_next_raw <= 0 else max(0, min(100, (level_raw / title_next_raw) * 100))
+# running totals kept in session (PlayerState.derived); nothing here re-sums categories
+def hud_card_html() -> str:
+    derived = st.session_state.player.derived
+    hud = derived.view()
+    return render_hud_card(
+        hud["title"],
+        hud["level"],
+        fmt_xp(derived.xp_total),
+        hud["xp_pct"],
+        fmt_xp(hud["xp_in_level_display"]),
+        fmt_xp(hud["xp_required_display"]),
+        hud["title_pct"],
+        hud["level_raw"],
+        hud["title_next_raw"],
+        hud["debt_pct"],
+        fmt_xp(derived.debt_total),
+        fmt_xp(DEBT_CAP),
+        derived.debt_total > 0,
+    )
 
-# XP Gain bar should NOT be affected by debt
-level_raw, _xin_raw_int, xp_required_raw = compute_level(xp_total, MAX_LEVEL)
+SYNC_LINE_REFRESH_S = 2.0
+
+def sync_status_html() -> str:
+    """Always lists the pending writes; highlighted only when writes failed, the cloud is offline or a save conflicts."""
+    sync = cloud_sync_status()
+    bad = sync.get("failed") or sync.get("online") is False or sync.get("conflict")
+    sync_cls = "sync-status sync-status-failed" if bad else "sync-status"
+    sync_tip = html.escape(str(sync.get("last_error") or ""), quote=True)
+    sync_parts = [f'{int(sync.get("pending", 0))} pending']
+    if _SYNC is not None:
+        sync_parts.append(f'{int(sync.get("unsynced", 0))} unsynced')
+    if sync.get("failed"):
+        sync_parts.append(f'{int(sync["failed"])} failed')
+    if sync.get("online") is False:
+        sync_parts.append("offline")
+    if sync.get("conflict"):
+        sync_parts.append("conflict")
+    if sync.get("backfilling"):
+        sync_parts.append("loading history")
+    return f'<div class="{sync_cls}" title="{sync_tip}">Cloud sync: {" · ".join(sync_parts)}</div>'
+
+# its own fragment on a timer: the counts an Apply leaves behind are redrawn once the writes land
+@st.fragment(run_every=SYNC_LINE_REFRESH_S)
+def sync_line():
+    st.markdown(sync_status_html(), unsafe_allow_html=True)
+
+LOG_VIEW_ROW_PX = 34
+LOG_VIEW_HEIGHT_PX = 520
+LOG_VIEW_OVERSCAN = 10
+
+# ---------- LOG LINE FORMATTERS ----------
+# One formatter per event_type: fn(ts, row) -> line text.
+# Rows carry only the typed log columns (supabase_client.LOG_LIST_COLUMNS), never payloads.
+def _fmt_stat_adjust(ts: str, r: dict) -> str:
+    group = r.get("stat_group") or ""
+    newv = r.get("value")
+    is_gain = r.get("mode") in ("Add", "Add 10")
+    gain_word = "Gain" if is_gain else "Loss"
+    if newv is not None:
+        return f"{ts} - {group} Stats {gain_word} ({int(newv)})"
+    return f"{ts} - {group} Stats {gain_word}"
+
+def _fmt_xp_adjust(ts: str, r: dict) -> str:
+    action = "XP Gain" if r.get("mode") == "Add" else "XP Minus"
+    return f"{ts} - {action} from {r.get('category') or ''} ({fmt_xp(r.get('xp_amount'))} XP)"
+
+def _fmt_debt_adjust(ts: str, r: dict) -> str:
+    action = "XP Debt" if r.get("mode") == "Add" else "Debt Minus"
+    return f"{ts} - {action} from {r.get('category') or ''} ({fmt_xp(r.get('xp_amount'))} XP)"
+
+def _fmt_level_up(ts: str, r: dict) -> str:
+    to = r.get("value")
+    if to is None:
+        return f"{ts} - Level Increase"
+    fr = int(to) - int(r.get("delta") or 0)
+    return f"{ts} - Level Increase from {fr} to {int(to)}"
+
+LOG_FORMATTERS = {
+    "stat_adjust": _fmt_stat_adjust,
+    "xp_adjust": _fmt_xp_adjust,
+    "debt_adjust": _fmt_debt_adjust,
+    "level_up": _fmt_level_up,
+    "title_unlocked": lambda ts, r: f"{ts} - New Title Unlocked ({r.get('category') or ''})",
+    "daily_quest_complete": lambda ts, r: f"{ts} - Daily Quest Completed ({r.get('category') or ''})",
+    "daily_quest_uncheck": lambda ts, r: f"{ts} - Daily Quest Unchecked ({r.get('category') or ''})",
+    "reset": lambda ts, r: f"{ts} - Reset",
+}
 
-xp_spent_before_level = 10.0 * (level_raw - 1) * level_raw / 2.0
-xp_in_level_display = max(0.0, float(xp_total) - xp_spent_before_level)
+# Log filter "Event type" choices -> the event_types each one covers
+LOG_EVENT_GROUPS = {
+    "XP": ["xp_adjust"],
+    "Debt": ["debt_adjust"],
+    "Stats": ["stat_adjust"],
+    "Level Up": ["level_up"],
+    "Titles": ["title_unlocked"],
+    "Daily Quests": ["daily_quest_complete", "daily_quest_uncheck", "daily_quests_rerolled"],
+    "Resets": ["reset", "reset_xp", "reset_debt", "reset_stats"],
+}
 
-xp_required_display = float(xp_required_raw)
-xp_in_level_display = min(xp_in_level_display, xp_required_display)
+def render_log_line(row: dict) -> str:
+    event_type = row.get("event_type", "") or ""
+    ts = fmt_log_dt(row.get("ts_utc"))
+    fmt = LOG_FORMATTERS.get(event_type)
+    if fmt is None:
+        return f"{ts} - {event_type}"
+    return fmt(ts, row)
 
-xp_pct = 0.0 if xp_required_display <= 0 else max(
-    0.0, min(100.0, (xp_in_level_display / xp_required_display) * 100.0)
+def cached_log_line(row: dict) -> str:
+    """
+    Log rows never change once written, so each id is formatted once per session.
+    Rows without an id (older cloud tables) are formatted every time.
+    """
+    row_id = row.get("id")
+    if row_id is None:
+        return render_log_line(row)
+
+    cache = st.session_state.setdefault("log_line_cache", {})
+    line = cache.get(row_id)
+    if line is None:
+        line = render_log_line(row)
+        cache[row_id] = line
+    return line
+
+# ---------- LOG VIEW (WINDOWED) ----------
+# Only the visible slice of Log entries (plus overscan) is sent to the browser;
+# the component reports its scroll offset back and asks for older pages at the end.
+log_view = components.declare_component(
+    "log_view",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "log_view"),
 )
 
-DEBT_CAP = 100.0
-debt_pct = 0 if DEBT_CAP <= 0 else max(0, min(100, (debt_total / DEBT_CAP) * 100))
-
 # ---------- MAIN LAYOUT ----------
 col_hud, col_panel = st.columns([2, 1], vertical_alignment="top")
 
 with col_hud:
     st.markdown('<div class="hud-title">PLAYER HUD</div>', unsafe_allow_html=True)
 
-    st.markdown(
-        f"""
-        <div class="hud-box" style="max-width: 520px;">
-
-        <!-- HEADER -->
-        <div style="display:flex; align-items:flex-start; gap:12px;">
-            <div style="flex:1 1 auto; min-width:0;">
-            <div style="font-weight:950; font-size:18px; letter-spacing:0.4px; color:rgba(255,255,255,0.98); line-height:1.2;">
-                Jackson Barkworth <span style="font-weight:800; color:rgba(180,255,255,0.92);">— {html.escape(title)}</span>
-            </div>
-            <div style="margin-top:4px; font-size:12.5px; color:rgba(255,255,255,0.70); font-weight:650; line-height:1.2;">
-                Region: United Kingdom
-            </div>
-            </div>
-            <div class="hud-avatar" style="margin-left:auto; align-self:flex-start;">JB</div>
-        </div>
-
-        <div style="height:12px;"></div>
-
-        <!-- LEVEL + XP ON SAME LINE (no duplicate novice/title) -->
-        <div style="display:flex; justify-content:space-between; align-items:center; margin-top:6px; font-size:16px; font-weight:950;">
-            <div>Level {level}</div>
-            <div style="color:rgba(180,255,255,0.95); text-shadow:0 0 10px rgba(0,220,255,0.35);">
-            XP {fmt_xp(xp_total)}
-            </div>
-        </div>
-
-        <!-- PROGRESSION BARS -->
-        <div class="bar-label">XP Gain</div>
-        <div class="glow-bar">
-            <div class="glow-bar-fill" style="width:{xp_pct}%;"></div>
-            <div class="glow-bar-text">{fmt_xp(xp_in_level_display)}/{fmt_xp(xp_required_display)}</div>
-        </div>
-
-        <div class="bar-label">Title Gain</div>
-        <div class="glow-bar">
-            <div class="glow-bar-fill" style="width:{title_pct}%;"></div>
-            <div class="glow-bar-text">{level_raw}/{title_next_raw}</div>
-        </div>
-
-        <div class="bar-label">XP Debt{debt_warning}</div>
-        <div class="glow-bar">
-            <div class="glow-bar-fill-red" style="width:{debt_pct}%;"></div>
-            <div class="glow-bar-text glow-bar-text-red">{fmt_xp(debt_total)}/{fmt_xp(DEBT_CAP)}</div>
-        </div>
-
-        <div style="height:14px;"></div>
+    # filled in by right_panel() (see there)
+    hud_slot = st.empty()
+    sync_line()
+
+# The right-hand panel is a fragment: menu picks, Adjust selections and Apply
+# clicks rerun only this function, not the gate / init / persistence code above.
+# It also draws the HUD card into the left column's slot, so it follows every
+# Apply; the card HTML is memoized on the displayed totals, so it is only rebuilt
+# when they change.
+def rerun_panel():
+    """Reruns just right_panel(); a full rerun when the panel is running as part of one."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
 
-        <!-- DIVIDER -->
-        <div style="
-            height:1px;
-            background: linear-gradient(90deg, rgba(0,220,255,0.05), rgba(0,220,255,0.35), rgba(0,220,255,0.05));
-            margin: 14px 0 12px 0;"></div>
-
-        <!-- DETAILS GRID (at the bottom) -->
-        <div style="display:grid; grid-template-columns: 1fr 1fr; gap:10px;">
-            <div>
-            <div style="font-size:12px; color:rgba(255,255,255,0.65); font-weight:650;">Age</div>
-            <div style="font-size:14px; font-weight:950; color:rgba(255,255,255,0.95);">22</div>
-            </div>
-            <div>
-            <div style="font-size:12px; color:rgba(255,255,255,0.65); font-weight:650;">DOB</div>
-            <div style="font-size:14px; font-weight:950; color:rgba(255,255,255,0.95);">06/11/2003</div>
-            </div>
-            <div>
-            <div style="font-size:12px; color:rgba(255,255,255,0.65); font-weight:650;">Height</div>
-            <div style="font-size:14px; font-weight:950; color:rgba(255,255,255,0.95);">5'9</div>
-            </div>
-            <div>
-            <div style="font-size:12px; color:rgba(255,255,255,0.65); font-weight:650;">Weight</div>
-            <div style="font-size:14px; font-weight:950; color:rgba(255,255,255,0.95);">14 Stone</div>
-            </div>
-        </div>
 
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+@st.fragment
+def right_panel():
+    adopt_cloud_state()
+    hud_slot.markdown(hud_card_html(), unsafe_allow_html=True)
 
-with col_panel:
     ensure_daily_quests_in_session_from_meta()
 
     dq = st.session_state.get("daily_quests", {}) or {}
     active = dq.get("active", {}) or {}
 
-    q1 = html.escape(str(active.get("Quest 1", "")) or "(missing quest)")
-    q2 = html.escape(str(active.get("Quest 2", "")) or "(missing quest)")
-    q3 = html.escape(str(active.get("Quest 3", "")) or "(missing quest)")
-
-    st.markdown(
-        f"""
-        <div class="panel" style="max-width: 440px;">
-          <div class="panel-title">Daily Quests</div>
-
-          <div class="xp-row">
-            <div class="xp-name">Quest 1</div>
-            <div class="xp-val">{q1}</div>
-          </div>
-
-          <div class="xp-row">
-            <div class="xp-name">Quest 2</div>
-            <div class="xp-val">{q2}</div>
-          </div>
-
-          <div class="xp-row" style="border-bottom: none;">
-            <div class="xp-name">Quest 3</div>
-            <div class="xp-val">{q3}</div>
-          </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    quests = tuple(str(active.get(f"Quest {n}", "")) or "(missing quest)" for n in (1, 2, 3))
+    st.markdown(render_daily_quests(quests), unsafe_allow_html=True)
 
     menu_options = [
         "XP Breakdown",
@@ -1663,35 +1010,13 @@ with col_panel:
         key="menu_select",
         label_visibility="collapsed",
     )
-    if picked != st.session_state.section:
-        st.session_state.section = picked
-        st.rerun()
-
-    section = st.session_state.section
+    st.session_state.section = picked
+    section = picked
 
     # -------- XP BREAKDOWN --------
     if section == "XP Breakdown":
-        xp_items = list(DEFAULT_XP_VALUES.keys())
-
-        rows_html = "\n".join(
-            f"""
-            <div class="xp-row">
-                <div class="xp-name">{item}</div>
-                <div class="xp-val">{fmt_xp(st.session_state.xp_values[item])} XP</div>
-            </div>
-            """
-            for item in xp_items
-        )
-
-        st.markdown(
-            f"""
-            <div class="panel">
-                <div class="panel-title">XP Breakdown</div>
-                {rows_html}
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
+        xp_rows = tuple((item, f"{fmt_xp(val)} XP") for item, val in zip(XP_REGISTRY.keys, st.session_state.player.xp))
+        st.markdown(render_panel("XP Breakdown", xp_rows), unsafe_allow_html=True)
 
         st.markdown('<div style="height:14px;"></div>', unsafe_allow_html=True)
         st.markdown('<div class="panel-title">Adjust XP</div>', unsafe_allow_html=True)
@@ -1705,12 +1030,14 @@ with col_panel:
             adjust_mode = st.selectbox("Mode", ["Add", "Minus"], key="adjust_mode")
 
         with c_time:
-            if adjust_cat in XP_PER_HOUR:
+            if adjust_cat in RULES.xp_per_hour:
                 time_choice = st.selectbox("Time", ["30 min", "1 hour"], key="xp_time_choice")
-            elif adjust_cat in XP_COMPLETION:
+            elif adjust_cat in RULES.xp_completion:
                 time_choice = st.selectbox("Time", ["Completion"], key="xp_time_choice")
-            elif adjust_cat in XP_STREAK:
-                time_choice = st.selectbox("Time", ["+1 (streak/day)"], key="xp_time_choice")
+            elif adjust_cat in RULES.xp_streak:
+                time_choice = st.selectbox(
+                    "Time", [f"+{fmt_xp(RULES.xp_streak[adjust_cat])} (streak/day)"], key="xp_time_choice"
+                )
             else:
                 time_choice = st.selectbox("Time", ["N/A"], key="xp_time_choice")
 
@@ -1718,20 +1045,16 @@ with col_panel:
             apply_clicked = st.button("Apply", key="apply_adjust")
 
         if apply_clicked:
-            base = float(xp_delta_from_choice(adjust_cat, time_choice))
+            base = float(RULES.xp_delta(adjust_cat, time_choice))
             leftover = None
+            debt_paid = {}
+            player = st.session_state.player
 
             if adjust_mode == "Minus":
-                st.session_state.xp_values[adjust_cat] = max(
-                    0.0,
-                    float(st.session_state.xp_values[adjust_cat]) - base
-                )
+                player.set_xp(adjust_cat, max(0.0, player.xp_value(adjust_cat) - base))
             else:
-                leftover = apply_xp_with_debt_payment(base)
-                st.session_state.xp_values[adjust_cat] = max(
-                    0.0,
-                    float(st.session_state.xp_values[adjust_cat]) + float(leftover)
-                )
+                leftover, debt_paid = apply_xp_with_debt_payment(base)
+                player.set_xp(adjust_cat, max(0.0, player.xp_value(adjust_cat) + float(leftover)))
 
             save_all(
                 event_type="xp_adjust",
@@ -1741,10 +1064,41 @@ with col_panel:
                     "time_choice": time_choice,
                     "base": base,
                     "leftover_after_debt": leftover,
+                    "debt_paid": debt_paid,
                 },
                 include_snapshot=False,
             )
-            st.rerun()
+            rerun_panel()
+
+        # bulk entry: many sessions -> one debt split, one state write, one log insert, one rerun
+        st.markdown('<div style="height:14px;"></div>', unsafe_allow_html=True)
+        st.markdown('<div class="panel-title">Bulk Entry</div>', unsafe_allow_html=True)
+
+        bulk_gen = st.session_state.get("xp_bulk_gen", 0)
+        bulk_rows = st.data_editor(
+            [{"Category": None, "Hours": 1.0, "Mode": "Add"}],
+            key=f"xp_bulk_{bulk_gen}",
+            num_rows="dynamic",
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "Category": st.column_config.SelectboxColumn("Category", options=list(XP_REGISTRY.keys)),
+                "Hours": st.column_config.NumberColumn(
+                    "Hours", min_value=0.0, max_value=XP_BULK_MAX_HOURS, step=0.25, default=1.0,
+                    help="Hourly categories only; completions and streaks count once.",
+                ),
+                "Mode": st.column_config.SelectboxColumn("Mode", options=["Add", "Minus"], default="Add"),
+            },
+        )
+
+        if st.button("Apply all", key="apply_xp_bulk"):
+            entries, errors = parse_xp_bulk_rows(bulk_rows)
+            if errors:
+                st.error("\n\n".join(errors))
+            elif entries:
+                save_all(batch=apply_xp_bulk(entries))
+                st.session_state.xp_bulk_gen = bulk_gen + 1
+                rerun_panel()
 
     # -------- XP WALL DEBT --------
     elif section == "XP Wall Debt":
@@ -1753,45 +1107,11 @@ with col_panel:
         normal_debt_items = [k for k in debt_items if k not in OATH_KEYS]
         oath_debt_items = [k for k in debt_items if k in OATH_KEYS]
 
-        rows_html = "\n".join(
-            f"""
-            <div class="xp-row">
-                <div class="xp-name">{item}</div>
-                <div class="xp-val-debt">{fmt_xp(st.session_state.debt_values.get(item, 0.0))} XP</div>
-            </div>
-            """
-            for item in normal_debt_items
-        )
-
-        st.markdown(
-            f"""
-            <div class="panel">
-                <div class="panel-title">XP Wall Debt</div>
-                {rows_html}
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
-
-        oath_rows_html = "\n".join(
-            f"""
-            <div class="xp-row">
-                <div class="xp-name">{item}</div>
-                <div class="xp-val-debt">{fmt_xp(st.session_state.debt_values.get(item, 0.0))} XP</div>
-            </div>
-            """
-            for item in oath_debt_items
-        )
+        debt_rows = tuple((item, f"{fmt_xp(st.session_state.player.debt_value(item))} XP") for item in normal_debt_items)
+        st.markdown(render_panel("XP Wall Debt", debt_rows, val_class="xp-val-debt"), unsafe_allow_html=True)
 
-        st.markdown(
-            f"""
-            <div class="panel">
-                <div class="panel-title">Oath Debt</div>
-                {oath_rows_html}
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
+        oath_rows = tuple((item, f"{fmt_xp(st.session_state.player.debt_value(item))} XP") for item in oath_debt_items)
+        st.markdown(render_panel("Oath Debt", oath_rows, val_class="xp-val-debt"), unsafe_allow_html=True)
 
         st.markdown('<div style="height:14px;"></div>', unsafe_allow_html=True)
         st.markdown('<div class="panel-title">Adjust Debt</div>', unsafe_allow_html=True)
@@ -1808,13 +1128,11 @@ with col_panel:
             debt_apply_clicked = st.button("Apply", key="apply_debt")
 
         if debt_apply_clicked:
-            base = float(DEBT_PENALTY.get(debt_cat, 0.0))
+            base = float(RULES.debt_penalty.get(debt_cat, 0.0))
             delta = base if debt_mode == "Add" else -base
 
-            st.session_state.debt_values[debt_cat] = max(
-                0.0,
-                float(st.session_state.debt_values.get(debt_cat, 0.0)) + float(delta)
-            )
+            player = st.session_state.player
+            player.set_debt(debt_cat, max(0.0, player.debt_value(debt_cat) + float(delta)))
 
             save_all(
                 event_type="debt_adjust",
@@ -1826,29 +1144,14 @@ with col_panel:
                 },
                 include_snapshot=False,
             )
-            st.rerun()
+            rerun_panel()
 
     # -------- STATS SECTIONS --------
     def render_stats_panel(title_text: str, group_key: str, widget_prefix: str):
-        stats_dict = st.session_state.stats.get(group_key, {}).copy()
-
-        rows_html = "\n".join(
-            f"""
-            <div class="xp-row">
-                <div class="xp-name">{code}</div>
-                <div class="xp-val">{int(val)}</div>
-            </div>
-            """
-            for code, val in stats_dict.items()
-        )
+        stat_items = st.session_state.player.stat_items(group_key)
 
         st.markdown(
-            f"""
-            <div class="panel">
-                <div class="panel-title">{title_text}</div>
-                {rows_html}
-            </div>
-            """,
+            render_panel(title_text, tuple((code, int(val)) for code, val in stat_items)),
             unsafe_allow_html=True,
         )
 
@@ -1858,7 +1161,7 @@ with col_panel:
         s_stat, s_mode, s_apply = st.columns([5, 2, 1.8])
 
         with s_stat:
-            pick = st.selectbox("Stat", list(stats_dict.keys()), key=f"{widget_prefix}_stat")
+            pick = st.selectbox("Stat", [code for code, _ in stat_items], key=f"{widget_prefix}_stat")
 
         with s_mode:
             mode = st.selectbox("Mode", ["Add", "Add 10", "Minus"], key=f"{widget_prefix}_mode")
@@ -1867,7 +1170,7 @@ with col_panel:
             go = st.button("Apply", key=f"{widget_prefix}_apply")
 
         if go:
-            cur = int(st.session_state.stats[group_key].get(pick, 1))
+            cur = int(st.session_state.player.stat_value(group_key, pick))
 
             if mode == "Add 10":
                 cur += 10
@@ -1877,7 +1180,7 @@ with col_panel:
                 cur -= 1
 
             cur = max(1, min(1000, cur))
-            st.session_state.stats[group_key][pick] = int(cur)
+            st.session_state.player.set_stat(group_key, pick, cur)
 
             save_all(
                 event_type="stat_adjust",
@@ -1889,7 +1192,7 @@ with col_panel:
                 },
                 include_snapshot=False,
             )
-            st.rerun()
+            rerun_panel()
 
     if section == "Physical Stats":
         render_stats_panel("Physical Stats", "Physical", "phys")
@@ -1914,98 +1217,90 @@ with col_panel:
             unsafe_allow_html=True,
         )
 
-        limit = st.selectbox("Show last", [50, 100, 200, 500, 1000], index=0, key="log_limit")
+        # filters are pushed down into the store query (indexed columns), not applied here
+        with st.expander("Filters", expanded=False):
+            f_groups = st.multiselect("Event type", list(LOG_EVENT_GROUPS.keys()), key="log_f_types")
+            f_col_cat, f_col_mode = st.columns(2)
+            with f_col_cat:
+                f_cat = st.selectbox(
+                    "Category",
+                    ["All"] + list(dict.fromkeys(list(DEFAULT_XP_VALUES.keys()) + list(DEFAULT_DEBT_VALUES.keys()))),
+                    key="log_f_cat",
+                )
+            with f_col_mode:
+                f_mode = st.selectbox("Mode", ["All", "Add", "Add 10", "Minus"], key="log_f_mode")
+            f_dates = st.date_input("Date range", value=(), key="log_f_dates")
+
+        def _utc_midnight(d) -> str:
+            return datetime(d.year, d.month, d.day, tzinfo=USER_TZ).astimezone(timezone.utc).isoformat()
+
+        f_dates = list(f_dates) if isinstance(f_dates, (list, tuple)) else [f_dates]
+        log_filters = {
+            "event_types": [t for g in f_groups for t in LOG_EVENT_GROUPS[g]],
+            "category": None if f_cat == "All" else f_cat,
+            "mode": None if f_mode == "All" else f_mode,
+            "since": _utc_midnight(f_dates[0]) if f_dates else None,
+            "until": _utc_midnight(f_dates[-1] + timedelta(days=1)) if f_dates else None,
+        }
+
+        # keyset pagination over cached pages: the newest page, then each older page
+        # the view has asked for, read below the last row already held (the newest page
+        # only ever holds the newest rows, so a stored cursor could leave a gap under it).
+        # An idle rerun is served entirely from the log cache.
+        if "log_pages" not in st.session_state:
+            st.session_state.log_pages = 0
+
+        # new filters start again from the newest page in a fresh (scrolled-to-top) view
+        filter_key = log_filter_key(log_filters)
+        if st.session_state.get("log_filter_key", None) != filter_key:
+            st.session_state.log_filter_key = filter_key
+            st.session_state.log_pages = 0
+            st.session_state.log_view_gen = st.session_state.get("log_view_gen", 0) + 1
+        view_key = f"log_view_{st.session_state.get('log_view_gen', 0)}"
+
+        # last scroll report from the windowed view; each `more` request is handled once
+        view_state = st.session_state.get(view_key) or {}
+        view_offset = max(0, int(view_state.get("offset", 0) or 0))
+        want_older = bool(view_state.get("more")) and view_state.get("seq") != st.session_state.get("log_view_seq")
+        st.session_state.log_view_seq = view_state.get("seq")
 
         logs = []
-        if CLOUD_ENABLED:
-            try:
-                logs = cloud_load_logs(limit=int(limit))
-            except Exception as e:
-                st.error(f"Could not load logs: {e}")
-                logs = []
-        else:
-            st.info("Cloud is disabled, so there are no logs to display.")
-
-        def render_log_line(event_type: str, payload: dict) -> str:
-            p = payload or {}
-            ts = fmt_log_dt_from_payload(p)
-
-            if event_type == "stat_adjust":
-                group = p.get("group", "")
-                mode = p.get("mode", "")
-                newv = p.get("new_value", None)
-                is_gain = mode in ("Add", "Add 10")
-                gain_word = "Gain" if is_gain else "Loss"
-                if newv is not None:
-                    return f"{ts} - {group} Stats {gain_word} ({int(newv)})"
-                return f"{ts} - {group} Stats {gain_word}"
-
-            if event_type == "xp_adjust":
-                cat = p.get("category", "")
-                mode = p.get("mode", "")
-                base = p.get("base", 0.0)
-                leftover = p.get("leftover_after_debt", None)
-                amt = leftover if leftover is not None else base
-                action = "XP Gain" if mode == "Add" else "XP Minus"
-                return f"{ts} - {action} from {cat} ({fmt_xp(amt)} XP)"
-
-            if event_type == "debt_adjust":
-                cat = p.get("category", "")
-                mode = p.get("mode", "")
-                base_pen = p.get("base_penalty", None)
-                delta = p.get("delta", 0.0)
-                amt = base_pen if base_pen is not None else abs(delta)
-                action = "XP Debt" if mode == "Add" else "Debt Minus"
-                return f"{ts} - {action} from {cat} ({fmt_xp(amt)} XP)"
-
-            if event_type == "level_up":
-                fr = p.get("from", "")
-                to = p.get("to", "")
-                return f"{ts} - Level Increase from {fr} to {to}"
-
-            if event_type == "title_unlocked":
-                t = p.get("title", "")
-                return f"{ts} - New Title Unlocked ({t})"
-
-            if event_type == "daily_quest_complete":
-                q = p.get("quest", "")
-                return f"{ts} - Daily Quest Completed ({q})"
-
-            if event_type == "daily_quest_uncheck":
-                q = p.get("quest", "")
-                return f"{ts} - Daily Quest Unchecked ({q})"
-
-            if event_type == "reset":
-                return f"{ts} - Reset"
-
-            return f"{ts} - {event_type}"
+        log_done = False
+        try:
+            # no flush here: queued events show up as the worker writes them (merge_new)
+            pages = st.session_state.log_pages + (1 if want_older else 0)
+            for n in range(pages + 1):
+                if n and (log_done or not logs):
+                    break
+                cursor = logs[-1]["id"] if n else None
+                page = cloud_load_logs_cached(limit=LOG_PAGE_SIZE, before_id=cursor, filters=log_filters)
+                logs.extend(page)
+                log_done = len(page) < LOG_PAGE_SIZE
+                st.session_state.log_pages = n
+        except Exception as e:
+            st.error(f"Could not load logs: {e}")
 
         if not logs:
-            st.info("No log entries yet.")
+            st.info("No log entries yet." if filter_key is None else "No log entries match these filters.")
         else:
-            lines = []
-            for row in logs:
-                event_type = row.get("event_type", "") or ""
-                payload = row.get("payload", {}) or {}
-                lines.append(render_log_line(event_type, payload))
-
-            rows_html = "\n".join(
-                f"""
-                <div class="xp-row">
-                    <div class="xp-name" style="font-weight:900;">{html.escape(line)}</div>
-                </div>
-                """
-                for line in lines
-            )
-
-            st.markdown(
-                f"""
-                <div class="panel">
-                    <div class="panel-title">Entries</div>
-                    {rows_html}
-                </div>
-                """,
-                unsafe_allow_html=True,
+            # format only the window around the reported offset; cost is flat in history size
+            visible = int(math.ceil(LOG_VIEW_HEIGHT_PX / float(LOG_VIEW_ROW_PX)))
+            offset = min(view_offset, max(0, len(logs) - visible))
+            start = max(0, offset - LOG_VIEW_OVERSCAN)
+            end = min(len(logs), offset + visible + LOG_VIEW_OVERSCAN)
+
+            lines = [cached_log_line(row) for row in logs[start:end]]
+
+            log_view(
+                rows=lines,
+                start=start,
+                total=len(logs),
+                has_more=not log_done,
+                row_height=LOG_VIEW_ROW_PX,
+                height=LOG_VIEW_HEIGHT_PX,
+                overscan=LOG_VIEW_OVERSCAN,
+                key=view_key,
+                default=None,
             )
 
     # -------- Tools / Rule Book --------
@@ -2066,6 +1361,10 @@ Coming soon!
 
         st.markdown("</div></div>", unsafe_allow_html=True)
 
+
+with col_panel:
+    right_panel()
+
 # ---------- SETTINGS ----------
 with st.expander("⚙️ Settings", expanded=False):
     if st.button("Randomise Daily Quests", key="reroll_daily_quests_btn"):
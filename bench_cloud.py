@@ -0,0 +1,190 @@
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from local_store import LocalStore, SyncEngine
+from postgrest_standin import PostgrestStandIn
+from supabase_client import SupabaseClient, diff_partitions, split_partitions
+from write_behind import WriteBehindQueue
+
+# ---------- CLOUD-PATH BENCHMARK ----------
+# Drives the real persistence code (SupabaseClient, WriteBehindQueue, LocalStore,
+# SyncEngine) against the in-process PostgREST stand-in and reports per-operation
+# latency percentiles and HTTP requests per operation.
+#
+#   python bench_cloud.py --latency 0.03 --jitter 0.01 -n 200
+
+SAVE_KEY = "bench"
+
+
+def _sample_state():
+    """Same shape and size as a real save: 23 XP keys, 30 debt keys, stats / quests / derived meta."""
+    xp = {f"XP Category {i}": 0.0 for i in range(23)}
+    debt = {f"Debt Category {i}": 0.0 for i in range(30)}
+    xp["__stats__"] = {
+        "Physical": {f"P{i}": 1 for i in range(9)},
+        "Mental": {f"M{i}": 1 for i in range(9)},
+        "Social": {f"S{i}": 1 for i in range(6)},
+        "Skill": {f"K{i}": 1 for i in range(4)},
+    }
+    xp["__daily_quests__"] = {
+        "date_utc": datetime.now(timezone.utc).date().isoformat(),
+        "active": {"Quest 1": "PUSH test", "Quest 2": "LOG drill", "Quest 3": "CHESS tactics"},
+        "completed": {"Quest 1": False, "Quest 2": False, "Quest 3": False},
+    }
+    xp["__last_derived__"] = {"xp_total": 0.0, "debt_total": 0.0, "effective_xp": 0.0, "level": 1, "title": "Novice"}
+    return xp, debt
+
+
+def _event(i: int, event_type: str = "xp_adjust") -> dict:
+    payload = {
+        "category": "XP Category 3",
+        "mode": "Add",
+        "time_choice": "1 hour",
+        "base": 3.0,
+        "leftover_after_debt": 3.0,
+        "_ts_utc": datetime.now(timezone.utc).isoformat(),
+        "n": i,
+    }
+    return {"event_type": event_type, "payload": payload, "snapshot": None}
+
+
+def percentile(sorted_vals: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(pct / 100.0 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+class Bench:
+    def __init__(self, standin: PostgrestStandIn, iterations: int):
+        self.standin = standin
+        self.iterations = int(iterations)
+        self.results = []
+
+    def run(self, name: str, fn, setup=None):
+        """Times fn(i) for each iteration; counts stand-in requests made while doing so."""
+        times = []
+        self.standin.reset_stats()
+        for i in range(self.iterations):
+            if setup is not None:
+                setup(i)
+            t0 = time.perf_counter()
+            fn(i)
+            times.append(time.perf_counter() - t0)
+        reqs = self.standin.request_count()
+        conns = self.standin.connections
+        times.sort()
+        self.results.append(
+            {
+                "op": name,
+                "p50": percentile(times, 50),
+                "p95": percentile(times, 95),
+                "p99": percentile(times, 99),
+                "reqs": reqs / float(self.iterations),
+                "conns": conns,
+            }
+        )
+
+    def report(self) -> str:
+        head = f"{'operation':<36} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/op':>7} {'conns':>6}"
+        lines = [head, "-" * len(head)]
+        for r in self.results:
+            lines.append(
+                f"{r['op']:<36} {r['p50'] * 1000:>9.2f} {r['p95'] * 1000:>9.2f} {r['p99'] * 1000:>9.2f}"
+                f" {r['reqs']:>7.2f} {r['conns']:>6}"
+            )
+        return "\n".join(lines)
+
+
+def run_benchmarks(iterations: int = 100, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                   log_rows: int = 1000) -> Bench:
+    standin = PostgrestStandIn(latency=latency, jitter=jitter, error_rate=error_rate, seed=1)
+    url = standin.start()
+    try:
+        bench = Bench(standin, iterations)
+        client = SupabaseClient(url, "bench-key", SAVE_KEY)
+        xp, debt = _sample_state()
+
+        # warm the pool + capability probes so they are not billed to the first op
+        client.save_state(xp, debt)
+        client.log_has_id()
+        client.log_has_columns()
+        client.append_logs([_event(i) for i in range(log_rows)])
+
+        bench.run("load_state", lambda i: client.load_state())
+        bench.run("save_state (full upsert)", lambda i: client.save_state(xp, debt))
+
+        def cold_save(i):
+            SupabaseClient(url, "bench-key", SAVE_KEY).save_state(xp, debt)
+
+        bench.run("save_state (new connection)", cold_save)
+
+        def patch(i):
+            client.patch_state({"xp": {"XP Category 3": float(i)}}, client.next_version())
+
+        bench.run("patch_state (1 key)", patch)
+        bench.run("append_log x3 (separate)", lambda i: [client.append_log(**_event(i)) for _ in range(3)])
+        bench.run("append_logs x3 (bulk)", lambda i: client.append_logs([_event(i) for _ in range(3)]))
+        bench.run("load_logs(50)", lambda i: client.load_logs(limit=50))
+        bench.run("load_logs(500)", lambda i: client.load_logs(limit=500))
+        bench.run("load_logs(500) (payloads)", lambda i: client.load_logs(limit=500, full=True))
+
+        # what one Apply click costs end to end through the app's save path
+        def save_all_direct(i):
+            client.append_logs([_event(i), _event(i, "level_up")])
+            client.patch_state({"xp": {"XP Category 3": float(i)}, "derived": {"xp_total": float(i)}}, client.next_version())
+
+        bench.run("save_all (direct, 2 rows)", save_all_direct)
+
+        wb = WriteBehindQueue(client, flush_interval=0.0)
+        persisted = {"parts": split_partitions(xp, debt)}
+
+        def save_all_enqueue(i):
+            # same work save_all does on the render thread: diff, then enqueue
+            xp["XP Category 3"] = float(i)
+            cur = split_partitions(xp, debt)
+            patch = diff_partitions(persisted["parts"], cur)
+            persisted["parts"] = cur
+            wb.submit_logs([_event(i), _event(i, "level_up")])
+            wb.submit_state(xp, debt, patch=patch, version=client.next_version())
+
+        bench.run("save_all (write-behind enqueue)", save_all_enqueue)
+        wb.flush(timeout=60)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            local = LocalStore(os.path.join(tmp, "bench.sqlite3"))
+            sync = SyncEngine(local, client, autostart=False)
+
+            def save_all_local(i):
+                local.append_logs([_event(i), _event(i, "level_up")])
+                local.patch_state({"xp": {"XP Category 3": float(i)}}, local.next_version())
+
+            bench.run("save_all (local sqlite)", save_all_local)
+            bench.run("sync push (1 click pending)", lambda i: sync.push_once(), setup=save_all_local)
+            bench.run("load_logs(500) (local sqlite)", lambda i: local.load_logs(limit=500))
+
+        return bench
+    finally:
+        standin.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the Supabase persistence paths against a local stand-in.")
+    ap.add_argument("-n", "--iterations", type=int, default=100)
+    ap.add_argument("--latency", type=float, default=0.02, help="seconds of simulated network latency per request")
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--log-rows", type=int, default=1000, help="log rows to seed before the log queries")
+    args = ap.parse_args()
+
+    bench = run_benchmarks(args.iterations, args.latency, args.jitter, args.error_rate, args.log_rows)
+    print(f"latency={args.latency * 1000:.0f}ms jitter={args.jitter * 1000:.0f}ms error_rate={args.error_rate} n={args.iterations}")
+    print(bench.report())
+
+
+if __name__ == "__main__":
+    main()
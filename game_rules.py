@@ -0,0 +1,615 @@
+import math
+from array import array
+from bisect import bisect_right
+
+# ---------- GAME RULES ----------
+# The pure rules behind the HUD: categories and their XP / debt values, debt
+# payment, levels and titles. No Streamlit here, so replay tools and worker
+# processes can import exactly what the app runs.
+
+# ---------- XP BREAKDOWN DEFAULTS (SOURCE OF TRUTH) ----------
+DEFAULT_XP_VALUES = {
+    "Admin Work": 0.0,
+    "Design Work": 0.0,
+    "Jiu Jitsu Training": 0.0,
+    "Gym Workout": 0.0,
+    "Italian Studying": 0.0,
+    "Italian Passive listening": 0.0,
+    "Chess - Rated Matches": 0.0,
+    "Chess - Study/ Analysis": 0.0,
+    "Reading": 0.0,
+    "New Skill Learning": 0.0,
+    "Personal Challenge Quest": 0.0,
+    "Recovery": 0.0,
+    "Creative Output": 0.0,
+    "General Life Task": 0.0,
+    "Quest 1": 0.0,
+    "Quest 2": 0.0,
+    "Quest 3": 0.0,
+    "Chess Streak": 0.0,
+    "Italian Streak": 0.0,
+    "Gym Streak": 0.0,
+    "Jiu Jitsu Streak": 0.0,
+    "Eating Healthy": 0.0,
+    "Meet Hydration target": 0.0,
+}
+
+# ---------- XP RULES (defaults; rules_loader applies data.json over them) ----------
+XP_PER_HOUR = {
+    "Admin Work": 0.5,
+    "Design Work": 1.0,
+    "Jiu Jitsu Training": 4.0,
+    "Gym Workout": 3.0,
+    "Italian Studying": 2.0,
+    "Italian Passive listening": 0.2,
+    "Chess - Rated Matches": 2.0,
+    "Chess - Study/ Analysis": 1.0,
+    "Reading": 1.5,
+    "New Skill Learning": 2.4,
+    "Personal Challenge Quest": 3.6,
+    "Recovery": 1.6,
+    "Creative Output": 2.0,
+    "General Life Task": 0.8,
+}
+XP_COMPLETION = {"Quest 1": 3.0, "Quest 2": 2.0, "Quest 3": 1.0}
+XP_STREAK = {
+    "Chess Streak": 1.0,
+    "Italian Streak": 1.0,
+    "Gym Streak": 1.0,
+    "Jiu Jitsu Streak": 1.0,
+    "Eating Healthy": 1.0,
+    "Meet Hydration target": 1.0,
+}
+
+# ---------- XP WALL DEBT DEFAULTS (SHORT NAMES, 3 WORDS MAX) ----------
+OATH_KEYS = [
+    "Oath: No Cheating",
+    "Oath: No Betrayal of Trust",
+    "Oath: No Stealing",
+    "Oath: No Harm Defenseless",
+    "Oath: No Malicious Exploit",
+    "Oath: Honor Commitments",
+    "Oath: Compete w/ Integrity",
+    "Oath: Accountability",
+    "Oath: No Sabotage Others",
+]
+
+DEFAULT_DEBT_VALUES = {
+    "Skip Training": 0.0,
+    "Junk Eating": 0.0,
+    "Drug Use": 0.0,
+    "Blackout Drunk": 0.0,
+    "Reckless Driving": 0.0,
+    "Start Fight": 0.0,
+    "Doomscrolling": 0.0,
+    "Miss Work": 0.0,
+    "Impulsive Spend": 0.0,
+    "Malicious Deceit": 0.0,
+    "Break Oath": 0.0,
+    "All Nighter": 0.0,
+    "Avoid Duty": 0.0,
+    "Ignore Injury": 0.0,
+    "Miss Hydration": 0.0,
+    "Sleep Collapse": 0.0,
+    "Ghost Obligation": 0.0,
+    "Ego Decisions": 0.0,
+    "No Logging": 0.0,
+    "Message Pile": 0.0,
+    "Quest Miss": 0.0,
+    # --- OATH DEBT ITEMS (each Add = +6 XP debt) ---
+    "Oath: No Cheating": 0.0,
+    "Oath: No Betrayal of Trust": 0.0,
+    "Oath: No Stealing": 0.0,
+    "Oath: No Harm Defenseless": 0.0,
+    "Oath: No Malicious Exploit": 0.0,
+    "Oath: Honor Commitments": 0.0,
+    "Oath: Compete w/ Integrity": 0.0,
+    "Oath: Accountability": 0.0,
+    "Oath: No Sabotage Others": 0.0,
+}
+
+DEBT_PENALTY = {
+    "Skip Training": 2.0,
+    "Junk Eating": 2.0,
+    "Drug Use": 5.0,
+    "Blackout Drunk": 3.0,
+    "Reckless Driving": 4.0,
+    "Start Fight": 3.0,
+    "Doomscrolling": 1.5,
+    "Miss Work": 4.0,
+    "Impulsive Spend": 2.5,
+    "Malicious Deceit": 2.0,
+    "Break Oath": 6.0,
+    "All Nighter": 2.0,
+    "Avoid Duty": 2.0,
+    "Ignore Injury": 2.5,
+    "Miss Hydration": 1.0,
+    "Sleep Collapse": 2.0,
+    "Ghost Obligation": 3.5,
+    "Ego Decisions": 2.0,
+    "No Logging": 1.0,
+    "Message Pile": 1.5,
+    "Quest Miss": 3.0,
+    # --- OATH PENALTIES (each Add = +6 XP debt) ---
+    "Oath: No Cheating": 6.0,
+    "Oath: No Betrayal of Trust": 6.0,
+    "Oath: No Stealing": 6.0,
+    "Oath: No Harm Defenseless": 6.0,
+    "Oath: No Malicious Exploit": 6.0,
+    "Oath: Honor Commitments": 6.0,
+    "Oath: Compete w/ Integrity": 6.0,
+    "Oath: Accountability": 6.0,
+    "Oath: No Sabotage Others": 6.0,
+}
+
+# ---------- STATS DEFAULTS ----------
+DEFAULT_PHYSICAL = {"PUSH": 1, "PULL": 1, "SPD": 1, "STM": 1, "DUR": 1, "BAL": 1, "FLX": 1, "RFLX": 1, "POW": 1}
+DEFAULT_MENTAL   = {"LRN": 1, "LOG": 1, "MEM": 1, "STRAT": 1, "FOCUS": 1, "CREAT": 1, "AWARE": 1, "JUDG": 1, "CALM": 1}
+DEFAULT_SOCIAL   = {"SOC": 1, "LEAD": 1, "NEG": 1, "COM": 1, "EMP": 1, "PRES": 1}
+DEFAULT_SKILL    = {"CHESS": 1, "ITALIAN": 1, "JIUJITSU": 1, "SKATE": 1}
+
+DEFAULT_STATS = {
+    "Physical": DEFAULT_PHYSICAL,
+    "Mental": DEFAULT_MENTAL,
+    "Social": DEFAULT_SOCIAL,
+    "Skill": DEFAULT_SKILL,
+}
+
+# ---------- CATEGORY REGISTRY ----------
+class CategoryRegistry:
+    """
+    Fixed key -> index map for one family of values (XP, debt or stats).
+    Values live in one flat array in key order; dicts only exist at the edges
+    (loading, saving, log payloads).
+    """
+
+    __slots__ = ("keys", "index", "typecode", "defaults", "lo", "hi")
+
+    def __init__(self, defaults: dict, typecode: str = "d", lo=None, hi=None):
+        self.keys = tuple(defaults.keys())
+        self.index = {k: i for i, k in enumerate(self.keys)}
+        self.typecode = typecode
+        self.defaults = array(typecode, defaults.values())
+        self.lo = lo
+        self.hi = hi
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def new(self) -> array:
+        return array(self.typecode, self.defaults)
+
+    def from_dict(self, values: dict) -> array:
+        """Coerces a loaded dict once: unknown keys are dropped, bad / missing ones get the default."""
+        out = self.new()
+        cast = float if self.typecode == "d" else int
+        for k, v in (values or {}).items():
+            i = self.index.get(k)
+            if i is None:
+                continue
+            try:
+                out[i] = cast(v)
+            except (TypeError, ValueError, OverflowError):
+                pass
+        if self.lo is not None or self.hi is not None:
+            self.clamp(out)
+        return out
+
+    def clamp(self, values: array):
+        lo = self.lo if self.lo is not None else -math.inf
+        hi = self.hi if self.hi is not None else math.inf
+        values[:] = array(self.typecode, (min(hi, max(lo, v)) for v in values))
+
+    def to_dict(self, values: array) -> dict:
+        return dict(zip(self.keys, values))
+
+XP_REGISTRY = CategoryRegistry(DEFAULT_XP_VALUES)
+DEBT_REGISTRY = CategoryRegistry(DEFAULT_DEBT_VALUES)
+STAT_MIN, STAT_MAX = 1, 1000
+STAT_REGISTRY = CategoryRegistry(
+    {(group, k): v for group, stats in DEFAULT_STATS.items() for k, v in stats.items()},
+    "i",
+    lo=STAT_MIN,
+    hi=STAT_MAX,
+)
+
+def _stat_groups() -> dict:
+    groups = {}
+    for i, (group, k) in enumerate(STAT_REGISTRY.keys):
+        start, names = groups.get(group, (i, ()))
+        groups[group] = (start, names + (k,))
+    return {g: (slice(start, start + len(names)), names) for g, (start, names) in groups.items()}
+
+# group -> (slice of STAT_REGISTRY, stat names in that slice)
+STAT_GROUPS = _stat_groups()
+
+# ---------- DEBT PAYMENT ----------
+# Debt math runs on integer micro-XP so a payment is split exactly: the
+# category payments always add up to what was paid, with no float remainder.
+# DerivedState keeps its running totals on the same grid.
+DEBT_SCALE = 1_000_000
+
+def _unit(v) -> int:
+    return round(float(v) * DEBT_SCALE)
+
+def _to_units(values) -> list:
+    return [max(0, _unit(v)) for v in values]
+
+def split_payment(debt_units: list, pay: int) -> list:
+    """
+    Splits `pay` units across debts in proportion to their size (largest remainder):
+    each category gets floor(d * pay / total), and the units still missing go to the
+    largest remainders (earliest category first on ties). No category pays more than it owes.
+    """
+    total = sum(debt_units)
+    pay = min(int(pay), total)
+    if pay <= 0:
+        return [0] * len(debt_units)
+
+    paid = [d * pay // total for d in debt_units]
+    short = pay - sum(paid)
+    if short:
+        by_remainder = sorted(range(len(debt_units)), key=lambda i: (-(debt_units[i] * pay % total), i))
+        for i in by_remainder[:short]:
+            paid[i] += 1
+    return paid
+
+def pay_debt_batch(debt: array, xp_gains) -> tuple:
+    """
+    Pays down XP Wall Debt first using earned XP (mutates `debt`, indexed by DEBT_REGISTRY).
+    The gains are summed and paid with one split_payment (plain integer loops over the
+    categories); they use up the payment in order, and each gain's part of it is split
+    across categories the same way.
+
+    Returns (leftover XP per gain, per gain an array of what each debt category was paid).
+    """
+    gain_units = _to_units(max(0.0, float(g)) for g in xp_gains)
+    debt_units = _to_units(debt)
+    paid = split_payment(debt_units, sum(gain_units))
+
+    leftovers = []
+    paid_by_gain = []
+    unassigned = list(paid)
+    remaining = sum(paid)
+    nothing = array("d", bytes(8 * len(paid)))  # shared by every gain that paid nothing
+    for g in gain_units:
+        take = min(g, remaining)
+        remaining -= take
+        if not take:
+            leftovers.append(g / DEBT_SCALE)
+            paid_by_gain.append(nothing)
+            continue
+        share = split_payment(unassigned, take)
+        unassigned = [u - p for u, p in zip(unassigned, share)]
+        leftovers.append((g - take) / DEBT_SCALE)
+        paid_by_gain.append(array("d", (p / DEBT_SCALE for p in share)))
+
+    if any(gain_units) and any(debt):
+        # written back on the micro-unit grid: a residual below one unit, which no
+        # split can reach, is cleared rather than leaving the player "in debt" for good
+        debt[:] = array("d", ((d - p) / DEBT_SCALE for d, p in zip(debt_units, paid)))
+    return leftovers, paid_by_gain
+
+def pay_debt(debt: array, xp_gain: float) -> float:
+    """Single-gain pay_debt_batch; returns leftover XP after debt is reduced."""
+    leftovers, _paid = pay_debt_batch(debt, (xp_gain,))
+    return leftovers[0]
+
+# ---------- BACKGROUND RULES: LEVEL + TITLE SYSTEM ----------
+MAX_LEVEL = 100
+TITLE_RANGES = [
+    ("Novice", 1, 5),
+    ("Trainee", 6, 10),
+    ("Adept", 11, 15),
+    ("Knight", 16, 20),
+    ("Champion", 21, 25),
+    ("Elite", 26, 30),
+    ("Legend", 31, 35),
+    ("Mythic", 36, 40),
+    ("Master", 41, 45),
+    ("Grandmaster", 46, 50),
+    ("Ascendant", 51, 55),
+    ("Exemplar", 56, 60),
+    ("Paragon", 61, 65),
+    ("Titan", 66, 70),
+    ("Sovereign", 71, 75),
+    ("Immortal-Seed", 76, 80),
+    ("Immortal", 81, 85),
+    ("Eternal-Seed", 86, 90),
+    ("Eternal", 91, 95),
+    ("World-Class", 96, 100),
+]
+
+def level_requirement(level: int) -> float:
+    return float(level * 10)
+
+def build_level_table(requirement=level_requirement, max_level: int = MAX_LEVEL) -> list:
+    """
+    cumulative[L] = XP needed to reach level L (index 0 unused, cumulative[1] == 0).
+    Any requirement curve works; compute_level inverts it with bisect.
+    """
+    table = [0.0, 0.0]
+    for level in range(1, max_level):
+        table.append(table[-1] + float(requirement(level)))
+    return table
+
+def _title_tables(max_level: int = MAX_LEVEL):
+    titles = ["Unranked"] * (max_level + 1)
+    next_thresholds = list(range(max_level + 1))
+    last_hi = TITLE_RANGES[-1][2]
+    for t, lo, hi in TITLE_RANGES:
+        for level in range(lo, min(hi, max_level) + 1):
+            titles[level] = t
+            next_thresholds[level] = hi + 1 if hi + 1 <= last_hi else hi
+    return titles, next_thresholds
+
+LEVEL_CUMULATIVE = build_level_table()
+TITLE_BY_LEVEL, TITLE_NEXT_BY_LEVEL = _title_tables()
+
+def title_for_level(level: int) -> str:
+    if 0 <= level <= MAX_LEVEL:
+        return TITLE_BY_LEVEL[level]
+    return "Unranked"
+
+def title_next_threshold(level: int) -> int:
+    if 0 <= level <= MAX_LEVEL:
+        return TITLE_NEXT_BY_LEVEL[level]
+    return level
+
+def compute_level(total_xp: float, max_level: int = MAX_LEVEL) -> tuple[int, float, float]:
+    """(level, xp into that level, xp the level requires); a bisect over LEVEL_CUMULATIVE."""
+    total_xp_int = max(0, int(math.floor(total_xp)))
+    table = LEVEL_CUMULATIVE if max_level <= MAX_LEVEL else build_level_table(level_requirement, max_level)
+    level = max(1, bisect_right(table, total_xp_int, 1, max(1, max_level) + 1) - 1)
+    return level, float(total_xp_int) - table[level], level_requirement(level)
+
+def levels_for_xp(xp_totals, max_level: int = MAX_LEVEL) -> array:
+    """compute_level's level for a whole series of XP totals at once (history charts, replays)."""
+    table = LEVEL_CUMULATIVE if max_level <= MAX_LEVEL else build_level_table(level_requirement, max_level)
+    hi = max(1, max_level) + 1
+    floor = math.floor
+    return array("i", (max(1, bisect_right(table, max(0, floor(x)), 1, hi) - 1) for x in xp_totals))
+
+# ---------- DERIVED STATE ----------
+DEBT_CAP = 100.0
+
+class DerivedState:
+    """
+    Running XP / debt totals plus everything the HUD derives from them.
+
+    Built by summing once (on load / reset); after that every XP or debt mutation
+    reports the old and new value, so keeping it current is O(1) however many
+    categories exist. The totals are integer micro-XP (DEBT_SCALE), so however
+    many updates came before they equal a fresh re-sum exactly, and a level
+    boundary never depends on float drift. Levels, title and bar percentages are
+    recomputed lazily, only after a total moved.
+    """
+
+    __slots__ = ("_xp_units", "_debt_units", "_view")
+
+    def __init__(self, xp: array = None, debt: array = None):
+        self.rebuild(xp if xp is not None else (), debt if debt is not None else ())
+
+    def rebuild(self, xp, debt):
+        """Re-sums from the value arrays (XP_REGISTRY / DEBT_REGISTRY order)."""
+        self._xp_units = sum(_unit(v) for v in xp)
+        self.rebuild_debt(debt)
+
+    def rebuild_debt(self, debt):
+        self._debt_units = sum(_unit(v) for v in debt)
+        self._view = None
+
+    # ---------- MUTATIONS ----------
+    def move_xp(self, old: float, new: float):
+        self._xp_units += _unit(new) - _unit(old)
+        self._view = None
+
+    def move_debt(self, old: float, new: float):
+        self._debt_units += _unit(new) - _unit(old)
+        self._view = None
+
+    # ---------- READS ----------
+    @property
+    def xp_total(self) -> float:
+        return self._xp_units / DEBT_SCALE
+
+    @property
+    def debt_total(self) -> float:
+        return self._debt_units / DEBT_SCALE
+
+    @property
+    def effective_xp(self) -> float:
+        # RULE: progression uses effective XP
+        return max(0, self._xp_units - self._debt_units) / DEBT_SCALE
+
+    def snapshot(self) -> dict:
+        """The __last_derived__ shape: totals, effective XP, level and title."""
+        v = self.view()
+        return {
+            "xp_total": float(self.xp_total),
+            "debt_total": float(self.debt_total),
+            "effective_xp": float(self.effective_xp),
+            "level": int(v["level"]),
+            "title": str(v["title"]),
+        }
+
+    def view(self) -> dict:
+        """Every number the HUD card shows (cached until a total changes)."""
+        if self._view is not None:
+            return self._view
+
+        xp_total, debt_total = self.xp_total, self.debt_total
+
+        # Level + title are based on effective XP (rule)
+        level, _xin, _req = compute_level(self.effective_xp, MAX_LEVEL)
+
+        # Raw level (for UI bars that should NOT move when debt changes)
+        level_raw, _xin_raw, xp_required_raw = compute_level(xp_total, MAX_LEVEL)
+        title_next_raw = title_next_threshold(level_raw)
+        title_pct = 0 if title_next_raw <= 0 else max(0, min(100, (level_raw / title_next_raw) * 100))
+
+        # XP Gain bar should NOT be affected by debt
+        xp_required_display = float(xp_required_raw)
+        xp_in_level_display = min(max(0.0, xp_total - LEVEL_CUMULATIVE[level_raw]), xp_required_display)
+        xp_pct = 0.0 if xp_required_display <= 0 else max(
+            0.0, min(100.0, (xp_in_level_display / xp_required_display) * 100.0)
+        )
+        debt_pct = 0 if DEBT_CAP <= 0 else max(0, min(100, (debt_total / DEBT_CAP) * 100))
+
+        self._view = {
+            "level": level,
+            "title": title_for_level(level),
+            "level_raw": level_raw,
+            "title_next_raw": title_next_raw,
+            "title_pct": title_pct,
+            "xp_in_level_display": xp_in_level_display,
+            "xp_required_display": xp_required_display,
+            "xp_pct": xp_pct,
+            "debt_pct": debt_pct,
+        }
+        return self._view
+
+def derived_state(xp_values: dict, debt_values: dict) -> dict:
+    """xp / debt totals, effective XP and the level + title it earns (the __last_derived__ shape)."""
+    return DerivedState(XP_REGISTRY.from_dict(xp_values), DEBT_REGISTRY.from_dict(debt_values)).snapshot()
+
+# ---------- PLAYER STATE ----------
+def _is_meta(k) -> bool:
+    return isinstance(k, str) and k.startswith("__")
+
+def stats_from_meta(stats: dict) -> array:
+    """The nested __stats__ meta ({group: {stat: value}}) as a STAT_REGISTRY array, clamped."""
+    flat = {}
+    if isinstance(stats, dict):
+        for group, values in stats.items():
+            if isinstance(values, dict):
+                flat.update({(group, k): v for k, v in values.items()})
+    return STAT_REGISTRY.from_dict(flat)
+
+class PlayerState:
+    """
+    One player's XP, debt and stats as flat arrays indexed by the registries, plus
+    the meta entries (daily quests, last derived, ...) persisted alongside xp_values.
+
+    Loaded dicts are coerced once in from_dicts(); to_dicts() rebuilds the persisted
+    shape only when saving. Every mutation keeps `derived` in step.
+    """
+
+    __slots__ = ("xp", "debt", "stats", "meta", "debt_meta", "derived")
+
+    def __init__(self, xp: array = None, debt: array = None, stats: array = None, meta: dict = None, debt_meta: dict = None):
+        self.xp = xp if xp is not None else XP_REGISTRY.new()
+        self.debt = debt if debt is not None else DEBT_REGISTRY.new()
+        self.stats = stats if stats is not None else STAT_REGISTRY.new()
+        self.meta = meta if meta is not None else {}
+        self.debt_meta = debt_meta if debt_meta is not None else {}
+        self.derived = DerivedState(self.xp, self.debt)
+
+    @classmethod
+    def from_dicts(cls, xp_values: dict, debt_values: dict):
+        xp_values = xp_values or {}
+        debt_values = debt_values or {}
+        return cls(
+            XP_REGISTRY.from_dict(xp_values),
+            DEBT_REGISTRY.from_dict(debt_values),
+            stats_from_meta(xp_values.get("__stats__")),
+            {k: v for k, v in xp_values.items() if _is_meta(k) and k != "__stats__"},
+            {k: v for k, v in debt_values.items() if _is_meta(k)},
+        )
+
+    def to_dicts(self) -> tuple:
+        """(xp_values, debt_values) as persisted: stats under __stats__, meta keys re-embedded."""
+        xp_values = XP_REGISTRY.to_dict(self.xp)
+        xp_values.update(self.meta)
+        xp_values["__stats__"] = self.stats_dict()
+        debt_values = DEBT_REGISTRY.to_dict(self.debt)
+        debt_values.update(self.debt_meta)
+        return xp_values, debt_values
+
+    def stats_dict(self) -> dict:
+        return {g: dict(zip(names, self.stats[sl])) for g, (sl, names) in STAT_GROUPS.items()}
+
+    # ---------- READS ----------
+    def xp_value(self, key: str) -> float:
+        return self.xp[XP_REGISTRY.index[key]]
+
+    def debt_value(self, key: str) -> float:
+        return self.debt[DEBT_REGISTRY.index[key]]
+
+    def stat_value(self, group: str, key: str) -> int:
+        return self.stats[STAT_REGISTRY.index[(group, key)]]
+
+    def stat_items(self, group: str) -> list:
+        sl, names = STAT_GROUPS[group]
+        return list(zip(names, self.stats[sl]))
+
+    # ---------- MUTATIONS ----------
+    def set_xp(self, key: str, value: float):
+        i = XP_REGISTRY.index[key]
+        value = float(value)
+        self.derived.move_xp(self.xp[i], value)
+        self.xp[i] = value
+
+    def set_debt(self, key: str, value: float):
+        i = DEBT_REGISTRY.index[key]
+        value = float(value)
+        self.derived.move_debt(self.debt[i], value)
+        self.debt[i] = value
+
+    def set_stat(self, group: str, key: str, value: int):
+        self.stats[STAT_REGISTRY.index[(group, key)]] = max(STAT_MIN, min(STAT_MAX, int(value)))
+
+    def pay_debt_batch(self, xp_gains) -> tuple:
+        """
+        game_rules.pay_debt_batch on this player's debt.
+        Returns (leftover XP per gain, per gain {debt category: XP paid} for categories it paid).
+        """
+        leftovers, paid_by_gain = pay_debt_batch(self.debt, xp_gains)
+        # a payment can touch every category (and clears sub-unit residue), so re-sum them
+        self.derived.rebuild_debt(self.debt)
+        keys = DEBT_REGISTRY.keys
+        return leftovers, [{k: v for k, v in zip(keys, p) if v} if any(p) else {} for p in paid_by_gain]
+
+    def pay_debt(self, xp_gain: float) -> tuple:
+        """(leftover XP, {debt category: XP paid}) for one gain."""
+        leftovers, paid = self.pay_debt_batch((xp_gain,))
+        return leftovers[0], paid[0]
+
+    def apply_xp_entries(self, entries) -> list:
+        """
+        Applies [(category, base XP, "Add" | "Minus"), ...] in order. Every Add is paid
+        through one pay_debt_batch. Returns (leftover, debt_paid) per entry
+        ((None, {}) for Minus), as the xp_adjust log payloads record them.
+        """
+        entries = list(entries)
+        gains = [base for _cat, base, mode in entries if mode != "Minus"]
+        leftovers, paid = self.pay_debt_batch(gains)
+        leftovers, paid = iter(leftovers), iter(paid)
+        results = []
+        for cat, base, mode in entries:
+            if mode == "Minus":
+                self.set_xp(cat, max(0.0, self.xp_value(cat) - float(base)))
+                results.append((None, {}))
+            else:
+                leftover, debt_paid = next(leftovers), next(paid)
+                self.set_xp(cat, max(0.0, self.xp_value(cat) + float(leftover)))
+                results.append((leftover, debt_paid))
+        return results
+
+    def reset_xp(self):
+        self.xp[:] = XP_REGISTRY.defaults
+        self.derived.rebuild(self.xp, self.debt)
+
+    def reset_debt(self):
+        self.debt[:] = DEBT_REGISTRY.defaults
+        self.derived.rebuild(self.xp, self.debt)
+
+    def reset_stats(self, group: str = None):
+        if group is None:
+            self.stats[:] = STAT_REGISTRY.defaults
+        else:
+            sl = STAT_GROUPS[group][0]
+            self.stats[sl] = STAT_REGISTRY.defaults[sl]
@@ -0,0 +1,210 @@
+import argparse
+import contextlib
+import csv
+import gzip
+import io
+import json
+import os
+
+from local_store import LocalStore, local_store_path
+from supabase_client import SupabaseClient
+
+# ---------- HISTORY EXPORT / RESTORE ----------
+# A full copy of one save_key: player_state plus every player_state_log row
+# (payload and snapshot), oldest-first.
+#
+#   python history_io.py export history.jsonl.gz --save-key local
+#   python history_io.py export history.csv.gz --save-key main --cloud
+#   python history_io.py restore history.jsonl.gz --save-key fresh
+#
+# The file is a stream of records: one {"type": "state"} record, then one
+# {"type": "log"} record per row. It is .jsonl (one JSON object per line) or
+# .csv (type,id,event_type,payload,snapshot with JSON cells), gzipped when the
+# name ends in .gz. Export reads the log in keyset pages and writes as it
+# goes. Keys are sorted and the gzip header carries no name or mtime, so the
+# same history always exports to the same bytes. `--cloud` uses Supabase
+# (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY from the environment) instead of
+# the local store.
+
+FORMAT = "player-hud-history"
+FORMAT_VERSION = 1
+CSV_FIELDS = ("type", "id", "event_type", "payload", "snapshot")
+
+
+def _dumps(v) -> str:
+    return json.dumps(v, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _open(path: str, mode: str, stack: contextlib.ExitStack, compressed: bool):
+    """Text stream for `path`; gzip with a fixed header (no name, mtime 0) when `compressed`."""
+    if not compressed:
+        return stack.enter_context(open(path, mode + "t", encoding="utf-8", newline=""))
+    raw = stack.enter_context(open(path, mode + "b"))
+    gz = stack.enter_context(gzip.GzipFile(filename="", mode=mode + "b", fileobj=raw, mtime=0))
+    return stack.enter_context(io.TextIOWrapper(gz, encoding="utf-8", newline=""))
+
+
+def _is_csv(path: str) -> bool:
+    return path[:-3].endswith(".csv") if path.endswith(".gz") else path.endswith(".csv")
+
+
+# ---------- RECORDS ----------
+def iter_records(store, batch_size: int = 5000):
+    """The state record, then every log row oldest-first (LocalStore or SupabaseClient)."""
+    loaded = store.load_state()
+    xp_values, debt_values = loaded if loaded else ({}, {})
+    yield {"type": "state", "format": FORMAT, "version": FORMAT_VERSION, "xp_values": xp_values, "debt_values": debt_values}
+    for ev in store.iter_log_events(batch_size=batch_size):
+        yield {
+            "type": "log",
+            "id": ev.get("id"),
+            "event_type": ev.get("event_type"),
+            "payload": ev.get("payload") or {},
+            "snapshot": ev.get("snapshot"),
+        }
+
+
+def write_records(records, path: str) -> int:
+    """Streams records to `path` (written to path.tmp, then renamed). Returns the log row count."""
+    tmp = path + ".tmp"
+    try:
+        with contextlib.ExitStack() as stack:
+            out = _open(tmp, "w", stack, path.endswith(".gz"))
+            rows = _write(records, out, _is_csv(path))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+    return rows
+
+
+def _write(records, out, as_csv: bool) -> int:
+    rows = 0
+    if as_csv:
+        w = csv.writer(out, lineterminator="\n")
+        w.writerow(CSV_FIELDS)
+        for rec in records:
+            if rec["type"] == "state":
+                state = {k: v for k, v in rec.items() if k != "type"}
+                w.writerow(["state", "", "", _dumps(state), ""])
+            else:
+                snap = rec.get("snapshot")
+                w.writerow(["log", rec["id"], rec["event_type"], _dumps(rec["payload"]), "" if snap is None else _dumps(snap)])
+                rows += 1
+    else:
+        for rec in records:
+            out.write(_dumps(rec) + "\n")
+            rows += rec["type"] == "log"
+    return rows
+
+
+def read_records(path: str):
+    """Inverse of write_records; yields records one at a time."""
+    with contextlib.ExitStack() as stack:
+        src = _open(path, "r", stack, path.endswith(".gz"))
+        if _is_csv(path):
+            for row in csv.DictReader(src):
+                if row["type"] == "state":
+                    yield {"type": "state", **json.loads(row["payload"])}
+                else:
+                    yield {
+                        "type": "log",
+                        "id": int(row["id"]) if row["id"] else None,
+                        "event_type": row["event_type"],
+                        "payload": json.loads(row["payload"]),
+                        "snapshot": json.loads(row["snapshot"]) if row["snapshot"] else None,
+                    }
+        else:
+            for line in src:
+                if line.strip():
+                    yield json.loads(line)
+
+
+# ---------- EXPORT / RESTORE ----------
+def export_history(store, path: str, batch_size: int = 5000) -> dict:
+    rows = write_records(iter_records(store, batch_size=batch_size), path)
+    return {"path": path, "log_rows": rows, "bytes": os.path.getsize(path)}
+
+
+def restore_history(store, path: str, batch_size: int = 5000, log_cache=None, save_key: str = None) -> dict:
+    """
+    Bulk-inserts an export into an EMPTY log (`batch_size` rows per append_logs), then writes
+    the state once. A LocalStore keeps each row's exported id, so restore + re-export gives
+    back the same bytes. Supabase ids are shared by every save_key, so there rows get new
+    ids in the same order. Replay checkpoints of a LocalStore and any LogCache pages for
+    `save_key` are dropped, since they describe what the log held before.
+
+    A LocalStore restore is local only: rows go in as synced and the state without an
+    outbox entry, so a SyncEngine on the same save_key never pushes the restored history
+    to Supabase (where it would duplicate what the cloud already holds). To put an
+    export into Supabase, restore it there with `--cloud`.
+    """
+    if store.load_logs(limit=1):
+        raise RuntimeError("restore needs an empty log for this save_key (restore into a new save_key)")
+
+    local = isinstance(store, LocalStore)
+    state = None
+    rows = 0
+    batch = []
+    for rec in read_records(path):
+        if rec.get("type") == "state":
+            if rec.get("format", FORMAT) != FORMAT or int(rec.get("version", 0)) > FORMAT_VERSION:
+                raise RuntimeError(f"{path}: not a {FORMAT} v{FORMAT_VERSION} export")
+            state = (rec.get("xp_values") or {}, rec.get("debt_values") or {})
+            continue
+        batch.append(
+            {"id": rec.get("id"), "event_type": rec["event_type"], "payload": rec["payload"], "snapshot": rec.get("snapshot")}
+        )
+        if len(batch) >= batch_size:
+            _append(store, batch, local)
+            rows += len(batch)
+            batch = []
+    if batch:
+        _append(store, batch, local)
+        rows += len(batch)
+
+    if state is not None and (state[0] or state[1]):
+        store.save_state(*state, **({"dirty": False} if local else {}))
+    if local:
+        store.clear_checkpoints()
+    if log_cache is not None:
+        log_cache.invalidate(save_key)
+    return {"path": path, "log_rows": rows, "state": state is not None}
+
+
+def _append(store, batch: list, local: bool):
+    if not local:
+        store.append_logs([{k: v for k, v in ev.items() if k != "id"} for ev in batch])
+    elif all(ev["id"] is not None for ev in batch):
+        store.append_logs(batch, synced=True, keep_ids=True)
+    else:
+        store.append_logs([{k: v for k, v in ev.items() if k != "id"} for ev in batch], synced=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export or restore a save_key's full player history.")
+    ap.add_argument("action", choices=["export", "restore"])
+    ap.add_argument("path", help="*.jsonl / *.csv, optionally .gz")
+    ap.add_argument("--save-key", default="local")
+    ap.add_argument("--data-dir", default=".hud_data", help="LOCAL_DATA_DIR of the app")
+    ap.add_argument("--cloud", action="store_true", help="use Supabase instead of the local store")
+    ap.add_argument("--batch-size", type=int, default=5000)
+    args = ap.parse_args()
+
+    if args.cloud:
+        store = SupabaseClient(
+            os.environ["SUPABASE_URL"].rstrip("/"), os.environ["SUPABASE_SERVICE_ROLE_KEY"], args.save_key
+        )
+    else:
+        store = LocalStore(local_store_path(args.data_dir, args.save_key))
+
+    if args.action == "export":
+        result = export_history(store, args.path, batch_size=args.batch_size)
+    else:
+        result = restore_history(store, args.path, batch_size=args.batch_size)
+    print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import html
+import re
+from functools import lru_cache
+from string import Template
+
+# ---------- HUD HTML TEMPLATES ----------
+# The HUD card and the right-hand panels as string.Template sources. Each one is
+# whitespace-minified and compiled once at import; the render_* functions are
+# memoized on the exact (already formatted) values they display, so a panel
+# whose numbers did not change is a cache hit. Everything here is pure and
+# shared by all sessions.
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_BETWEEN_TAGS_RE = re.compile(r">\s+<")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def minify_html(src: str) -> str:
+    """Drops comments and collapses whitespace (none is left between tags)."""
+    src = _COMMENT_RE.sub("", src)
+    src = _BETWEEN_TAGS_RE.sub("><", src)
+    return _SPACE_RE.sub(" ", src).strip()
+
+
+def compile_template(src: str) -> Template:
+    return Template(minify_html(src))
+
+
+def _esc(v) -> str:
+    return html.escape(str(v))
+
+
+def _style_attr(style: str) -> str:
+    return f' style="{style}"' if style else ""
+
+
+HUD_CARD = compile_template(
+    """
+    <div class="hud-box hud-card">
+
+    <!-- HEADER -->
+    <div class="hud-head">
+        <div class="hud-who">
+        <div class="hud-name">Jackson Barkworth <span>— $title</span></div>
+        <div class="hud-region">Region: United Kingdom</div>
+        </div>
+        <div class="hud-avatar">JB</div>
+    </div>
+
+    <!-- LEVEL + XP ON SAME LINE (no duplicate novice/title) -->
+    <div class="hud-level-row">
+        <div>Level $level</div>
+        <div class="hud-xp">XP $xp_total</div>
+    </div>
+
+    <!-- PROGRESSION BARS -->
+    <div class="bar-label">XP Gain</div>
+    <div class="glow-bar">
+        <div class="glow-bar-fill" style="width:$xp_pct%;"></div>
+        <div class="glow-bar-text">$xp_in_level/$xp_required</div>
+    </div>
+
+    <div class="bar-label">Title Gain</div>
+    <div class="glow-bar">
+        <div class="glow-bar-fill" style="width:$title_pct%;"></div>
+        <div class="glow-bar-text">$level_raw/$title_next_raw</div>
+    </div>
+
+    <div class="bar-label">XP Debt$debt_warning</div>
+    <div class="glow-bar">
+        <div class="glow-bar-fill-red" style="width:$debt_pct%;"></div>
+        <div class="glow-bar-text glow-bar-text-red">$debt_total/$debt_cap</div>
+    </div>
+
+    <!-- DETAILS GRID (at the bottom) -->
+    <div class="hud-divider"></div>
+    <div class="hud-details">
+        <div><div class="hud-detail-k">Age</div><div class="hud-detail-v">22</div></div>
+        <div><div class="hud-detail-k">DOB</div><div class="hud-detail-v">06/11/2003</div></div>
+        <div><div class="hud-detail-k">Height</div><div class="hud-detail-v">5'9</div></div>
+        <div><div class="hud-detail-k">Weight</div><div class="hud-detail-v">14 Stone</div></div>
+    </div>
+
+    </div>
+    """
+)
+
+DEBT_WARNING = ' <span class="hud-debt-warning">(Clear debt before gaining XP)</span>'
+
+PANEL = compile_template(
+    """
+    <div class="panel">
+        <div class="panel-title">$title</div>$rows</div>
+    """
+)
+
+ROW = compile_template(
+    """
+    <div class="xp-row"$style>
+        <div class="xp-name">$name</div>
+        <div class="$val_class">$value</div>
+    </div>
+    """
+)
+
+
+# ---------- RENDERERS (memoized on displayed values) ----------
+@lru_cache(maxsize=256)
+def render_hud_card(
+    title: str,
+    level: int,
+    xp_total: str,
+    xp_pct: float,
+    xp_in_level: str,
+    xp_required: str,
+    title_pct: float,
+    level_raw: int,
+    title_next_raw: int,
+    debt_pct: float,
+    debt_total: str,
+    debt_cap: str,
+    in_debt: bool,
+) -> str:
+    return HUD_CARD.substitute(
+        title=_esc(title),
+        level=level,
+        xp_total=xp_total,
+        xp_pct=xp_pct,
+        xp_in_level=xp_in_level,
+        xp_required=xp_required,
+        title_pct=title_pct,
+        level_raw=level_raw,
+        title_next_raw=title_next_raw,
+        debt_warning=DEBT_WARNING if in_debt else "",
+        debt_pct=debt_pct,
+        debt_total=debt_total,
+        debt_cap=debt_cap,
+    )
+
+
+@lru_cache(maxsize=512)
+def render_panel(title: str, rows: tuple, val_class: str = "xp-val", last_row_style: str = "") -> str:
+    """A .panel of name/value .xp-row lines; `rows` is ((name, displayed value), ...)."""
+    last = len(rows) - 1
+    body = "".join(
+        ROW.substitute(
+            style=_style_attr(last_row_style if i == last else ""),
+            name=_esc(name),
+            val_class=val_class,
+            value=_esc(value),
+        )
+        for i, (name, value) in enumerate(rows)
+    )
+    return PANEL.substitute(title=_esc(title), rows=body)
+
+
+def render_daily_quests(quests: tuple) -> str:
+    return render_panel(
+        "Daily Quests",
+        tuple((f"Quest {i}", q) for i, q in enumerate(quests, 1)),
+        last_row_style="border-bottom: none;",
+    )
@@ -0,0 +1,284 @@
+import argparse
+import csv
+import heapq
+import json
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from game_rules import XP_PER_HOUR, PlayerState
+from local_store import LocalStore, local_store_path
+from rules_loader import DEFAULT_RULES_PATH, RulesLoader
+
+# ---------- ACTIVITY HISTORY IMPORT ----------
+# Streams a logs.csv-style history (date,task,hours,xp_per_hour,xp_earned,notes)
+# into a save_key's LocalStore: rows are applied oldest-first through the debt
+# rules, written as batched xp_adjust log inserts, and the state is saved once.
+#
+#   python import_logs.py logs.csv --save-key local
+#   python import_logs.py history.csv --save-key local --dry-run --errors bad_rows.csv
+#
+# XP comes from the app's hourly rate for the matched category (data.json via
+# rules_loader); the file's own xp_per_hour / xp_earned columns are not trusted.
+# Imported rows carry their activity time as _ts_utc, and get log ids after every
+# existing row even when that time is older (replay.py's as-of scan selects by
+# _ts_utc, not by position). Run it while the app is stopped: open sessions keep
+# their own copy of the state (and cached Log pages) until they reload. With
+# Supabase configured, the app's SyncEngine pushes the imported rows on its next run.
+
+REQUIRED_COLUMNS = ("date", "task", "hours")
+MAX_HOURS = 24.0
+DATE_FORMATS = ("%d.%m.%Y", "%d/%m/%Y", "%d.%m.%Y %H:%M", "%d/%m/%Y %H:%M")
+
+
+def _norm(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(s).lower()).strip()
+
+
+_TASKS = {_norm(k): k for k in XP_PER_HOUR}
+
+
+def match_task(task: str):
+    """XP_PER_HOUR category for a free-text task: exact (case / punctuation-insensitive) or a unique prefix."""
+    key = _norm(task)
+    if not key:
+        return None
+    if key in _TASKS:
+        return _TASKS[key]
+    hits = [cat for norm, cat in _TASKS.items() if norm.startswith(key)]
+    return hits[0] if len(hits) == 1 else None
+
+
+def parse_when(s: str, tz) -> datetime:
+    s = (s or "").strip()
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        dt = None
+        for fmt in DATE_FORMATS:
+            try:
+                dt = datetime.strptime(s, fmt)
+                break
+            except ValueError:
+                continue
+        if dt is None:
+            raise ValueError(f"unreadable date {s!r}")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=tz)
+    return dt.astimezone(timezone.utc)
+
+
+def parse_row(row: dict, tz) -> tuple:
+    """(ts_utc, category, hours, note) for one CSV row; raises ValueError naming what is wrong."""
+    ts = parse_when(row.get("date"), tz)
+    task = (row.get("task") or "").strip()
+    cat = match_task(task)
+    if cat is None:
+        raise ValueError(f"unknown task {task!r}")
+    try:
+        hours = float((row.get("hours") or "").strip())
+    except ValueError:
+        raise ValueError(f"hours {row.get('hours')!r} is not a number") from None
+    if not (0 < hours <= MAX_HOURS):
+        raise ValueError(f"hours {hours:g} outside 0-{MAX_HOURS:g}")
+    return ts.isoformat(), cat, hours, (row.get("notes") or "").strip()
+
+
+# ---------- CHRONOLOGICAL STREAM ----------
+def _read_run(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield tuple(json.loads(line))
+
+
+def iter_chronological(path: str, tz, report: dict, chunk_rows: int = 20000, tmp_dir: str = None):
+    """
+    Yields (ts_utc, line, category, hours, note) oldest-first, reading `chunk_rows` rows at a time.
+    Each chunk is sorted and spilled to a temp file; the runs are then merged lazily, so memory
+    stays flat however large the file is. Malformed rows are counted in `report` and skipped.
+    """
+    runs = []
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f, restkey="extra")
+            fields = [_norm(c) for c in reader.fieldnames or []]
+            missing = [c for c in REQUIRED_COLUMNS if c not in fields]
+            if missing:
+                raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+            reader.fieldnames = fields
+
+            chunk = []
+            for row in reader:
+                report["rows"] += 1
+                try:
+                    chunk.append((*parse_row(row, tz), reader.line_num))
+                except ValueError as e:
+                    _malformed(report, reader.line_num, str(e), row)
+                if len(chunk) >= chunk_rows:
+                    runs.append(_spill(chunk, tmp, len(runs)))
+                    chunk = []
+
+        chunk.sort(key=_order)
+        if runs:
+            if chunk:
+                runs.append(_spill(chunk, tmp, len(runs)))
+            merged = heapq.merge(*(_read_run(r) for r in runs), key=_order)
+        else:
+            merged = iter(chunk)
+
+        for ts, cat, hours, note, line in merged:
+            yield ts, line, cat, hours, note
+
+
+def _order(item):
+    return item[0], item[4]  # (ts_utc, file line): ties keep file order
+
+
+def _spill(chunk: list, tmp: str, n: int) -> str:
+    chunk.sort(key=_order)
+    path = os.path.join(tmp, f"run{n}.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(item) + "\n" for item in chunk)
+    return path
+
+
+def _malformed(report: dict, line: int, reason: str, row: dict):
+    report["malformed"] += 1
+    if len(report["errors"]) < report["max_errors"]:
+        report["errors"].append({"line": line, "error": reason})
+    if report.get("error_writer") is not None:
+        report["error_writer"].writerow([line, reason, json.dumps(row, sort_keys=True)])
+
+
+# ---------- IMPORT ----------
+def _progress_events(prev: dict, now: dict, ts: str) -> list:
+    """The title_unlocked / level_up rows save_all would add for this change."""
+    if not isinstance(prev, dict) or not prev:
+        return []
+    events = []
+    if str(now.get("title")) != str(prev.get("title")):
+        events.append({"event_type": "title_unlocked", "payload": {"title": now.get("title"), "_ts_utc": ts}, "snapshot": None})
+    if int(now.get("level", 0)) > int(prev.get("level", 0)):
+        events.append(
+            {
+                "event_type": "level_up",
+                "payload": {"from": int(prev.get("level", 0)), "to": int(now.get("level", 0)), "_ts_utc": ts},
+                "snapshot": None,
+            }
+        )
+    return events
+
+
+def import_activity_csv(
+    store: LocalStore,
+    path: str,
+    tz=ZoneInfo("Europe/London"),
+    batch_size: int = 1000,
+    chunk_rows: int = 20000,
+    dry_run: bool = False,
+    max_errors: int = 50,
+    errors_path: str = None,
+    rules=None,
+) -> dict:
+    """
+    Imports one activity CSV into `store`. Every `batch_size` rows are paid through one
+    pay_debt_batch and written as one append_logs; the state is saved once at the end.
+    Returns a report: rows read, imported, malformed (first `max_errors` listed), XP totals.
+    `rules` defaults to the tables compiled from data.json.
+    """
+    rules = rules if rules is not None else RulesLoader().get()
+    loaded = store.load_state()
+    player = PlayerState.from_dicts(*loaded) if loaded else PlayerState()
+    prev = player.meta.get("__last_derived__") or player.derived.snapshot()
+    source = os.path.basename(path)
+
+    report = {"rows": 0, "imported": 0, "malformed": 0, "errors": [], "max_errors": int(max_errors)}
+    err_file = open(errors_path, "w", newline="", encoding="utf-8") if errors_path else None
+    if err_file is not None:
+        report["error_writer"] = csv.writer(err_file)
+        report["error_writer"].writerow(["line", "error", "row"])
+
+    def flush(batch):
+        bases = [rules.xp_for_hours(cat, hours) for _ts, _l, cat, hours, _n in batch]
+        results = player.apply_xp_entries((item[2], base, "Add") for item, base in zip(batch, bases))
+        events = [
+            {
+                "event_type": "xp_adjust",
+                "payload": {
+                    "category": cat,
+                    "mode": "Add",
+                    "time_choice": f"{hours:g} h",
+                    "base": base,
+                    "leftover_after_debt": leftover,
+                    "debt_paid": debt_paid,
+                    "note": note,
+                    "source": f"{source}:{line}",
+                    "_ts_utc": ts,
+                },
+                "snapshot": None,
+            }
+            for (ts, line, cat, hours, note), base, (leftover, debt_paid) in zip(batch, bases, results)
+        ]
+        if not dry_run:
+            store.append_logs(events)
+        report["imported"] += len(batch)
+
+    try:
+        batch = []
+        for item in iter_chronological(path, tz, report, chunk_rows=chunk_rows):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        report.pop("error_writer", None)
+        if err_file is not None:
+            err_file.close()
+
+    now = player.derived.snapshot()
+    report.update({"xp_total": now["xp_total"], "debt_total": now["debt_total"], "level": now["level"]})
+    if dry_run or not report["imported"]:
+        return report
+
+    progress = _progress_events(prev, now, datetime.now(timezone.utc).isoformat())
+    if progress:
+        store.append_logs(progress)
+    player.meta["__last_derived__"] = now
+    store.save_state(*player.to_dicts())
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Import a logs.csv activity history into the local store.")
+    ap.add_argument("csv_path")
+    ap.add_argument("--data-dir", default=".hud_data", help="LOCAL_DATA_DIR of the app")
+    ap.add_argument("--save-key", default="local")
+    ap.add_argument("--tz", default="Europe/London", help="time zone of dates without an offset")
+    ap.add_argument("--batch-size", type=int, default=1000, help="rows per debt split / log insert")
+    ap.add_argument("--chunk-rows", type=int, default=20000, help="rows held in memory while sorting")
+    ap.add_argument("--dry-run", action="store_true", help="validate and total up, write nothing")
+    ap.add_argument("--errors", default=None, help="write every malformed row to this CSV")
+    ap.add_argument("--rules", default=DEFAULT_RULES_PATH, help="rules file with the XP rates (data.json)")
+    args = ap.parse_args()
+
+    store = LocalStore(local_store_path(args.data_dir, args.save_key))
+    report = import_activity_csv(
+        store,
+        args.csv_path,
+        tz=ZoneInfo(args.tz),
+        batch_size=args.batch_size,
+        chunk_rows=args.chunk_rows,
+        dry_run=args.dry_run,
+        errors_path=args.errors,
+        rules=RulesLoader(args.rules).get(),
+    )
+    report.pop("max_errors", None)
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,699 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from supabase_client import (
+    LOG_HOT_COLUMNS,
+    LOG_LIST_COLUMNS,
+    StaleWriteError,
+    VersionClock,
+    join_partitions,
+    log_hot_fields,
+    merge_patches,
+    split_partitions,
+)
+
+# ---------- LOCAL SQLITE STORE ----------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state_part (
+    part TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state_outbox (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    patch TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    full INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    snapshot TEXT,
+    synced INTEGER NOT NULL DEFAULT 0,
+    category TEXT,
+    mode TEXT,
+    delta REAL,
+    xp_amount REAL,
+    ts_utc TEXT,
+    stat_group TEXT,
+    stat TEXT,
+    value INTEGER
+);
+CREATE INDEX IF NOT EXISTS log_unsynced ON log (id) WHERE synced = 0;
+CREATE TABLE IF NOT EXISTS meta (
+    k TEXT PRIMARY KEY,
+    v TEXT
+);
+CREATE TABLE IF NOT EXISTS replay_checkpoint (
+    log_id INTEGER PRIMARY KEY,
+    max_ts TEXT,
+    state TEXT NOT NULL
+);
+"""
+
+# typed hot columns added after the first release (same set as migrations/002)
+_LOG_HOT_TYPES = {
+    "category": "TEXT",
+    "mode": "TEXT",
+    "delta": "REAL",
+    "xp_amount": "REAL",
+    "ts_utc": "TEXT",
+    "stat_group": "TEXT",
+    "stat": "TEXT",
+    "value": "INTEGER",
+}
+
+# filtered Log pages walk one of these newest-first instead of the whole table
+_LOG_FILTER_INDEXES = """
+CREATE INDEX IF NOT EXISTS log_event_type ON log (event_type, id);
+CREATE INDEX IF NOT EXISTS log_category ON log (category, id);
+CREATE INDEX IF NOT EXISTS log_ts_utc ON log (ts_utc);
+"""
+
+
+def local_store_path(data_dir: str, save_key: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", str(save_key)) or "default"
+    return os.path.join(data_dir, f"{safe}.sqlite3")
+
+
+class LocalStore:
+    """
+    On-disk store for one save_key (one SQLite file, WAL mode).
+
+    Same interface as SupabaseClient (load_state / save_state / patch_state /
+    append_logs / load_logs), so it can sit behind the write-behind queue.
+    Every write also lands in an outbox (state) or stays `synced = 0` (log)
+    until SyncEngine has pushed it to Supabase.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._migrate_log_columns()
+        self._db.executescript(_LOG_FILTER_INDEXES)
+
+        self._clock = VersionClock()
+        self.on_change = None  # set by SyncEngine; called after writes that need pushing
+        self.on_logs_appended = None  # called with the new rows (ids ascending) after every log insert
+        self.on_logs_reset = None  # called after rows are removed (cached pages are stale)
+        row = self._db.execute("SELECT version FROM state_outbox WHERE id = 1").fetchone()
+        self._clock.observe(row[0] if row else self._get_meta("version"))
+
+    def _migrate_log_columns(self):
+        """Adds + backfills the hot log columns on a file created before they existed."""
+        have = {row[1] for row in self._db.execute("PRAGMA table_info(log)")}
+        missing = [c for c in LOG_HOT_COLUMNS if c not in have]
+        if not missing:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            for c in missing:
+                self._db.execute(f"ALTER TABLE log ADD COLUMN {c} {_LOG_HOT_TYPES[c]}")
+            rows = self._db.execute("SELECT id, event_type, payload FROM log").fetchall()
+            self._db.executemany(
+                f"UPDATE log SET {', '.join(f'{c} = ?' for c in LOG_HOT_COLUMNS)} WHERE id = ?",
+                [
+                    (*log_hot_fields(et, json.loads(p)).values(), i)
+                    for i, et, p in rows
+                ],
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    # ---------- META ----------
+    def _get_meta(self, k: str, default=None):
+        row = self._db.execute("SELECT v FROM meta WHERE k = ?", (k,)).fetchone()
+        return row[0] if row else default
+
+    def get_meta(self, k: str, default=None):
+        with self._lock:
+            return self._get_meta(k, default)
+
+    def set_meta(self, k: str, v):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta (k, v) VALUES (?, ?)", (k, str(v)))
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    # ---------- STATE ----------
+    def state_has_parts(self) -> bool:
+        return True
+
+    def next_version(self) -> int:
+        return self._clock.next()
+
+    def _read_parts(self) -> dict:
+        return {part: json.loads(data) for part, data in self._db.execute("SELECT part, data FROM state_part")}
+
+    def _write_parts(self, parts: dict):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO state_part (part, data) VALUES (?, ?)",
+            [(part, json.dumps(values)) for part, values in parts.items()],
+        )
+
+    def load_state(self):
+        with self._lock:
+            parts = self._read_parts()
+        if not parts:
+            return None
+        return join_partitions(parts)
+
+    def save_state(self, xp_values: dict, debt_values: dict, dirty: bool = True):
+        """Full write. `dirty=False` is used when the data came FROM the cloud (nothing to push)."""
+        parts = split_partitions(xp_values, debt_values)
+        version = self._clock.next()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM state_part")
+                self._write_parts(parts)
+                self._db.execute("INSERT OR REPLACE INTO meta (k, v) VALUES ('version', ?)", (str(version),))
+                if dirty:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO state_outbox (id, patch, version, full) VALUES (1, '{}', ?, 1)",
+                        (version,),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        if dirty:
+            self._changed()
+
+    def patch_state(self, patch: dict, version: int):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = int(self._get_meta("version", 0) or 0)
+                if cur >= int(version):
+                    raise StaleWriteError(f"Stale write rejected (v{version}, local at v{cur})")
+
+                parts = self._read_parts()
+                for part, values in (patch or {}).items():
+                    parts.setdefault(part, {}).update(values)
+                self._write_parts({part: parts[part] for part in patch or {}})
+                self._db.execute("INSERT OR REPLACE INTO meta (k, v) VALUES ('version', ?)", (str(int(version)),))
+
+                row = self._db.execute("SELECT patch, full FROM state_outbox WHERE id = 1").fetchone()
+                pending = json.loads(row[0]) if row else {}
+                full = int(row[1]) if row else 0
+                self._db.execute(
+                    "INSERT OR REPLACE INTO state_outbox (id, patch, version, full) VALUES (1, ?, ?, ?)",
+                    (json.dumps(merge_patches(pending, patch)), int(version), full),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        self._clock.observe(version)
+        self._changed()
+
+    def take_state_outbox(self):
+        """Returns (patch, version, full) waiting to be pushed, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT patch, version, full FROM state_outbox WHERE id = 1").fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), int(row[1]), bool(row[2])
+
+    def rebase_state(self, xp_values: dict, debt_values: dict) -> dict:
+        """
+        Replaces the local state with the cloud's (xp_values, debt_values), except for the
+        keys still waiting in the outbox, which keep their local value. Returns that
+        outbox patch (what still has to be pushed on top of the cloud state).
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT patch FROM state_outbox WHERE id = 1").fetchone()
+                pending = json.loads(row[0]) if row else {}
+                local = self._read_parts()
+                parts = split_partitions(xp_values, debt_values)
+                for part, values in pending.items():
+                    parts.setdefault(part, {}).update({k: local.get(part, {}).get(k, v) for k, v in values.items()})
+                self._db.execute("DELETE FROM state_part")
+                self._write_parts(parts)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return {part: {k: parts[part][k] for k in values} for part, values in pending.items()}
+
+    def clear_state_outbox(self, version: int):
+        """Drops the outbox only if nothing newer was written while it was being pushed."""
+        with self._lock:
+            self._db.execute("DELETE FROM state_outbox WHERE id = 1 AND version = ?", (int(version),))
+
+    # ---------- LOG ----------
+    def append_log(self, event_type: str, payload: dict, snapshot=None):
+        self.append_logs([{"event_type": event_type, "payload": payload, "snapshot": snapshot}])
+
+    def append_logs(self, events: list, synced: bool = False, keep_ids: bool = False):
+        """`keep_ids` inserts each event under its own "id" (restoring an export) instead of the next ones."""
+        events = list(events or [])
+        listed = [log_hot_fields(ev.get("event_type") or "", ev.get("payload")) for ev in events]
+        rows = [
+            (
+                *((int(ev["id"]),) if keep_ids else ()),
+                ev.get("event_type") or "",
+                json.dumps(ev.get("payload") or {}),
+                json.dumps(ev.get("snapshot")) if ev.get("snapshot") is not None else None,
+                1 if synced else 0,
+                *(hot[c] for c in LOG_HOT_COLUMNS),
+            )
+            for ev, hot in zip(events, listed)
+        ]
+        if not rows:
+            return []
+        cols = (("id",) if keep_ids else ()) + ("event_type", "payload", "snapshot", "synced") + LOG_HOT_COLUMNS
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    f"INSERT INTO log ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})", rows
+                )
+                # one writer inside one transaction: AUTOINCREMENT ids are consecutive
+                last = int(self._db.execute("SELECT last_insert_rowid()").fetchone()[0])
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+        ids = [row[0] for row in rows] if keep_ids else list(range(last - len(rows) + 1, last + 1))
+        if keep_ids:
+            # rows under their own ids can land below the newest ones: cached pages are stale
+            if self.on_logs_reset is not None:
+                self.on_logs_reset()
+        elif self.on_logs_appended is not None:
+            self.on_logs_appended(
+                [
+                    {"id": i, "event_type": ev.get("event_type") or "", **hot}
+                    for i, ev, hot in zip(ids, events, listed)
+                ]
+            )
+        if not synced:
+            self._changed()
+        return ids
+
+    def load_logs(
+        self,
+        limit: int = 500,
+        before_id: int = None,
+        after_id: int = None,
+        full: bool = False,
+        filters: dict = None,
+    ):
+        """
+        Newest-first page; `before_id` / `after_id` are keyset cursors on the primary key.
+        Rows hold only LOG_LIST_COLUMNS; `full=True` returns id, event_type, payload instead.
+        `filters` (see supabase_client.log_row_matches) become WHERE clauses.
+        """
+        f = filters or {}
+        where, args = [], []
+        if f.get("event_types"):
+            where.append(f"event_type IN ({', '.join('?' * len(f['event_types']))})")
+            args.extend(f["event_types"])
+        if f.get("category"):
+            where.append("category = ?")
+            args.append(f["category"])
+        if f.get("mode"):
+            where.append("mode = ?")
+            args.append(f["mode"])
+        if f.get("since"):
+            where.append("ts_utc >= ?")
+            args.append(f["since"])
+        if f.get("until"):
+            where.append("ts_utc < ?")
+            args.append(f["until"])
+        if before_id is not None:
+            where.append("id < ?")
+            args.append(int(before_id))
+        if after_id is not None:
+            where.append("id > ?")
+            args.append(int(after_id))
+        cols = ("id", "event_type", "payload") if full else LOG_LIST_COLUMNS
+        sql = f"SELECT {', '.join(cols)} FROM log"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+
+        with self._lock:
+            rows = self._db.execute(sql, (*args, int(limit))).fetchall()
+        if full:
+            return [{"id": i, "event_type": et, "payload": json.loads(p)} for i, et, p in rows]
+        return [dict(zip(cols, row)) for row in rows]
+
+    def iter_log_events(self, after_id: int = None, batch_size: int = 1000):
+        """Every log row oldest-first (id, event_type, payload, snapshot), read in keyset batches."""
+        last = int(after_id or 0)
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT id, event_type, payload, snapshot FROM log WHERE id > ? ORDER BY id LIMIT ?",
+                    (last, int(batch_size)),
+                ).fetchall()
+            for i, et, p, snap in rows:
+                yield {
+                    "id": i,
+                    "event_type": et,
+                    "payload": json.loads(p),
+                    "snapshot": json.loads(snap) if snap is not None else None,
+                }
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    def has_logs(self) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM log LIMIT 1").fetchone() is not None
+
+    def last_log_id(self, upto: int = None) -> int:
+        """Highest log id (at or below `upto`), 0 if there is none."""
+        sql, args = "SELECT MAX(id) FROM log", ()
+        if upto is not None:
+            sql, args = sql + " WHERE id <= ?", (int(upto),)
+        with self._lock:
+            return int(self._db.execute(sql, args).fetchone()[0] or 0)
+
+    def reserve_log_ids(self, upto: int) -> bool:
+        """
+        On an empty log, moves the id sequence past `upto` so ids 1..upto stay free for
+        history inserted later under its own ids. False (nothing reserved) if the log has rows.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self._db.execute("SELECT 1 FROM log LIMIT 1").fetchone() is not None:
+                    self._db.execute("ROLLBACK")
+                    return False
+                seq = self._db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'log'").fetchone()
+                if seq is None:
+                    self._db.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('log', ?)", (int(upto),))
+                elif int(seq[0]) < int(upto):
+                    self._db.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'log'", (int(upto),))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return True
+
+    def unsynced_logs(self, limit: int = 500) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, event_type, payload, snapshot FROM log WHERE synced = 0 ORDER BY id LIMIT ?",
+                (int(limit),),
+            ).fetchall()
+        return [
+            {
+                "id": i,
+                "event_type": et,
+                "payload": json.loads(p),
+                "snapshot": json.loads(snap) if snap is not None else None,
+            }
+            for i, et, p, snap in rows
+        ]
+
+    def unsynced_count(self) -> int:
+        with self._lock:
+            return int(self._db.execute("SELECT COUNT(*) FROM log WHERE synced = 0").fetchone()[0])
+
+    def mark_logs_synced(self, ids: list):
+        with self._lock:
+            self._db.executemany("UPDATE log SET synced = 1 WHERE id = ?", [(int(i),) for i in ids])
+
+    def discard_unsynced(self):
+        """Drops every log row and state write not pushed yet (and the replay checkpoints built on them)."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM log WHERE synced = 0")
+                self._db.execute("DELETE FROM state_outbox")
+                self._db.execute("DELETE FROM replay_checkpoint")
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        if self.on_logs_reset is not None:
+            self.on_logs_reset()
+
+    # ---------- REPLAY CHECKPOINTS ----------
+    def save_checkpoint(self, log_id: int, max_ts, state: dict):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO replay_checkpoint (log_id, max_ts, state) VALUES (?, ?, ?)",
+                (int(log_id), max_ts, json.dumps(state)),
+            )
+
+    def latest_checkpoint(self, as_of: str = None):
+        """
+        Newest checkpoint whose events all happened at or before `as_of` (any, if None).
+        Returns (log_id, max_ts, state) or None.
+        """
+        sql = "SELECT log_id, max_ts, state FROM replay_checkpoint"
+        args = ()
+        if as_of is not None:
+            sql += " WHERE max_ts IS NULL OR max_ts <= ?"
+            args = (as_of,)
+        sql += " ORDER BY log_id DESC LIMIT 1"
+        with self._lock:
+            row = self._db.execute(sql, args).fetchone()
+        if not row:
+            return None
+        return int(row[0]), row[1], json.loads(row[2])
+
+    def clear_checkpoints(self):
+        with self._lock:
+            self._db.execute("DELETE FROM replay_checkpoint")
+
+
+# ---------- SYNC ENGINE ----------
+class SyncEngine:
+    """
+    Pushes what LocalStore has not synced yet to the remote (SupabaseClient):
+    log rows in batches (one bulk insert each), then the pending state outbox as
+    one key-level patch (or a full upsert on an unmigrated table). A patch the
+    cloud rejects as stale is rebased onto the cloud state and sent again; the
+    outbox is only cleared once a write has gone through.
+
+    Runs on a daemon thread every `interval` seconds, or as soon as the local
+    store reports a write. Before the first push it bootstraps: an empty local
+    store takes the cloud state, so a fresh disk does not start from defaults,
+    and the cloud log history is then copied down in the background, one keyset
+    page per insert (resumed after a restart). A store that already has state when first bootstrapped keeps it
+    (local wins) and pushes it up, unless it is marked "defaults_only" (seeded
+    while the cloud was unreachable): then the cloud state replaces it and
+    whatever was written on top of the defaults is dropped, never pushed.
+    Nothing is pushed before a bootstrap has succeeded.
+    """
+
+    def __init__(
+        self,
+        local: LocalStore,
+        remote,
+        interval: float = 5.0,
+        batch_size: int = 500,
+        debounce: float = 0.25,
+        autostart: bool = True,
+        conflict_retries: int = 3,
+    ):
+        self.local = local
+        self.remote = remote
+        self.interval = float(interval)
+        self.debounce = float(debounce)
+        self.batch_size = int(batch_size)
+        self.conflict_retries = int(conflict_retries)
+
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._boot_lock = threading.Lock()
+        self._online = None
+        self._last_error = None
+        self._conflict = False
+        self._backfill = None
+
+        self._thread = None
+        if autostart:
+            local.on_change = self.kick
+            self._thread = threading.Thread(target=self._run, name="sync-engine", daemon=True)
+            self._thread.start()
+
+    def kick(self):
+        self._wake.set()
+
+    def status(self) -> dict:
+        with self._lock:
+            online, err, conflict = self._online, self._last_error, self._conflict
+        outbox = self.local.take_state_outbox()
+        return {
+            "unsynced": self.local.unsynced_count() + (1 if outbox else 0),
+            "online": online,
+            "conflict": conflict,
+            "backfilling": self.backfilling(),
+            "last_error": err,
+        }
+
+    # ---------- BOOTSTRAP ----------
+    def bootstrapped(self) -> bool:
+        return self.local.get_meta("bootstrapped") == "1"
+
+    def mark_defaults_only(self):
+        """The app is about to seed defaults because the cloud could not be read."""
+        self.local.set_meta("defaults_only", "1")
+
+    def defaults_only(self) -> bool:
+        return self.local.get_meta("defaults_only") == "1"
+
+    def backfilling(self) -> bool:
+        """True while the cloud log history is still being copied into the local store."""
+        return int(self.local.get_meta("backfill_to", 0) or 0) > 0
+
+    def bootstrap(self):
+        """
+        Idempotent and serialized (the push thread and the app's startup prefetch may both
+        call it). Costs at most the slowest of two single requests: the cloud state and
+        the newest cloud log id, read side by side. The history below that id is left to
+        a background backfill, so bootstrap returns as soon as the state is local. Only an
+        id-less (legacy) log table is still read here, in its one unpaged request.
+        """
+        with self._boot_lock:
+            if self.bootstrapped():
+                self._start_backfill()
+                return
+
+            placeholder = self.defaults_only()
+            need_state = placeholder or self.local.load_state() is None
+            need_logs = placeholder or not self.local.has_logs()
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="sync-bootstrap") as pool:
+                state_f = pool.submit(self.remote.load_state) if need_state else None
+                head_f = pool.submit(self._cloud_log_head) if need_logs else None
+            loaded = state_f.result() if state_f is not None else None
+            head = head_f.result() if head_f is not None else None
+
+            if placeholder and loaded is not None:
+                # local progress was built on placeholder defaults: the cloud save wins
+                self.local.discard_unsynced()
+
+            if loaded is not None:
+                self.local.save_state(*loaded, dirty=False)
+
+            if isinstance(head, list):
+                if head and not self.local.has_logs():
+                    self.local.append_logs(head, synced=True)
+            elif head and self.local.reserve_log_ids(head):
+                # cloud rows keep their ids, below anything written locally from now on
+                self.local.set_meta("backfill_to", head)
+
+            self.local.set_meta("defaults_only", "0")
+            self.local.set_meta("bootstrapped", "1")
+        self._start_backfill()
+
+    def _cloud_log_head(self):
+        """Newest cloud log id (0 for an empty log), or the whole log on a table without ids."""
+        if not self.remote.log_has_id():
+            return [
+                {"event_type": r.get("event_type"), "payload": r.get("payload")}
+                for r in self.remote.load_logs(limit=None, full=True)
+            ]
+        rows = self.remote.load_logs(limit=1, full=True)
+        return int(rows[0]["id"]) if rows else 0
+
+    def _start_backfill(self):
+        if not self.backfilling():
+            return
+        with self._lock:
+            if self._backfill is not None and self._backfill.is_alive():
+                return
+            self._backfill = threading.Thread(target=self._backfill_logs, name="sync-backfill", daemon=True)
+            self._backfill.start()
+
+    def _backfill_logs(self):
+        """
+        Copies the cloud log up to the id seen at bootstrap, oldest-first: one
+        append_logs(page, synced=True) per keyset page, so memory stays at one page.
+        Rows above that id were pushed from here and are already local.
+        """
+        upto = int(self.local.get_meta("backfill_to", 0) or 0)
+        try:
+            rows = self.remote.iter_log_events(after_id=self.local.last_log_id(upto), batch_size=self.batch_size)
+            while True:
+                page = [r for r in islice(rows, self.batch_size) if int(r["id"]) <= upto]
+                if page:
+                    self.local.append_logs(page, synced=True, keep_ids=True)
+                if len(page) < self.batch_size:
+                    break
+            self.local.set_meta("backfill_to", 0)
+        except Exception:
+            pass  # offline: the next bootstrap() call resumes after the last copied row
+
+    # ---------- PUSH ----------
+    def push_once(self):
+        self.bootstrap()
+
+        while True:
+            batch = self.local.unsynced_logs(self.batch_size)
+            if not batch:
+                break
+            self.remote.append_logs(batch)
+            self.local.mark_logs_synced([ev["id"] for ev in batch])
+
+        outbox = self.local.take_state_outbox()
+        if outbox:
+            patch, version, full = outbox
+            if full or not self.remote.state_has_parts():
+                self.remote.save_state(*self.local.load_state())
+            else:
+                self._push_patch(patch, version)
+            self.local.clear_state_outbox(version)
+
+    def _push_patch(self, patch: dict, version: int):
+        """
+        A stale patch is a conflict, not an obsolete write: another device or process got a
+        newer version in, but the patch only names keys this store changed. So re-read the
+        cloud, rebase the local state onto it (keys still in the outbox keep their local
+        value) and send the patch again under a version above the cloud's. After
+        `conflict_retries` lost races it gives up and raises; the outbox is kept.
+        """
+        for _attempt in range(self.conflict_retries + 1):
+            try:
+                self.remote.patch_state(patch, version)
+                return
+            except StaleWriteError:
+                cloud = self.remote.load_state()  # also moves the remote clock past the cloud version
+                if cloud is not None:
+                    patch = self.local.rebase_state(*cloud)
+                version = self.remote.next_version()
+        raise StaleWriteError(f"player_state conflict: patch still stale after {self.conflict_retries} rebases")
+
+    def _run(self):
+        while True:
+            try:
+                self.push_once()
+                with self._lock:
+                    self._online, self._last_error, self._conflict = True, None, False
+            except StaleWriteError as e:
+                # reachable, but the state outbox keeps losing to other writers: kept, shown
+                with self._lock:
+                    self._online, self._last_error, self._conflict = True, str(e), True
+            except Exception as e:
+                with self._lock:
+                    self._online, self._last_error = False, str(e)
+
+            if self._wake.wait(self.interval) and self.debounce > 0:
+                time.sleep(self.debounce)  # let a burst of clicks land before pushing
+            self._wake.clear()
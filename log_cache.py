@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+from supabase_client import log_filter_key, log_row_matches
+
+# ---------- LOG PAGE CACHE ----------
+class LogCache:
+    """
+    Process-wide cache of Log pages, keyed by (save_key, limit, before_id, filters).
+
+    before_id=None is the newest page. Appended rows are merged into it as they
+    are written (merge_new) and it is cut back to `limit` rows, so it always
+    holds exactly the newest page instead of being refetched. The rows cut off
+    are pushed down into the cached older pages, each re-keyed under its new
+    cursor, so a write never turns the older pages into misses (or leaves them
+    behind under dead keys). Everything also expires after `ttl` seconds as a
+    fallback for writes this process did not see: an expired newest page only
+    asks for rows newer than the ones it holds.
+
+    At most `max_pages` pages are kept; the least recently used one goes first.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_pages: int = 256):
+        self.ttl = float(ttl)
+        self.max_pages = int(max_pages)
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()  # key -> (rows newest-first, fetched_at), least recently used first
+
+    def get(self, save_key: str, limit: int, before_id, fetch, filters: dict = None) -> list:
+        """
+        `fetch(limit=, before_id=, after_id=, filters=)` is only called on a miss or
+        after expiry. Each filter combination is its own set of pages.
+        """
+        key = (save_key, int(limit), before_id, log_filter_key(filters))
+        now = time.monotonic()
+        with self._lock:
+            hit = self._pages.get(key)
+            if hit is not None:
+                self._pages.move_to_end(key)
+        if hit is not None and now - hit[1] < self.ttl:
+            return hit[0]
+
+        if hit is not None and before_id is None and hit[0] and "id" in hit[0][0]:
+            newer = fetch(limit=limit, before_id=None, after_id=hit[0][0]["id"], filters=filters)
+            if len(newer) < limit:
+                with self._lock:
+                    if key in self._pages:
+                        self._push_down(key, newer, now)
+                        return self._pages[key][0]
+            rows = (newer + hit[0])[:limit]  # a full page of newer rows: the older pages no longer join up
+        else:
+            rows = fetch(limit=limit, before_id=before_id, after_id=None, filters=filters)
+
+        with self._lock:
+            self._pages[key] = (rows, now)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return rows
+
+    def merge_new(self, save_key: str, rows: list):
+        """
+        Prepends freshly written rows (ascending ids) to every cached newest page for
+        save_key, keeping only the rows each page's filters match, up to the page's limit.
+        """
+        if not rows:
+            return
+        fresh = list(reversed(rows))
+        with self._lock:
+            for key, (held, fetched_at) in list(self._pages.items()):
+                if key[0] != save_key or key[2] is not None:
+                    continue
+                filters = dict(key[3] or ())
+                top = held[0]["id"] if held and "id" in held[0] else None
+                add = [r for r in fresh if (top is None or r["id"] > top) and log_row_matches(r, filters)]
+                if add:
+                    self._push_down(key, add, fetched_at)
+
+    def _push_down(self, key, add: list, fetched_at: float):
+        """
+        Prepends `add` to the page at `key` and carries what falls off its end into the
+        next cached page (the one keyed by this page's old last id), which moves to the
+        key of the new last id; and so on down the chain. Caller holds the lock.
+        """
+        held = self._pages[key][0]
+        while True:
+            rows = add + held
+            page, add = rows[: key[1]], rows[key[1]:]
+            self._pages[key] = (page, fetched_at)
+            if not add or not held or "id" not in held[-1]:
+                return
+            below = self._pages.pop((key[0], key[1], held[-1]["id"], key[3]), None)
+            if below is None:
+                return  # not cached: it is fetched under its new cursor when asked for
+            key = (key[0], key[1], page[-1]["id"], key[3])
+            held, fetched_at = below
+
+    def invalidate(self, save_key: str = None):
+        with self._lock:
+            if save_key is None:
+                self._pages.clear()
+            else:
+                for key in [k for k in self._pages if k[0] == save_key]:
+                    del self._pages[key]
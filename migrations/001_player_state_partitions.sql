@@ -0,0 +1,54 @@
+-- Split player_state into separately persisted partitions + a version for stale-write detection.
+--
+-- Before: stats / daily quests / last derived state were meta keys stuffed inside xp_values
+--         (__stats__, __daily_quests__, __last_derived__) and every save re-sent the whole blob.
+-- After:  xp_values / debt_values hold only real categories, the rest get their own columns,
+--         and the app sends key-level patches through player_state_patch().
+
+alter table player_state add column if not exists stats   jsonb  not null default '{}'::jsonb;
+alter table player_state add column if not exists quests  jsonb  not null default '{}'::jsonb;
+alter table player_state add column if not exists derived jsonb  not null default '{}'::jsonb;
+alter table player_state add column if not exists version bigint not null default 0;
+
+-- move existing meta keys out of xp_values
+update player_state
+set
+    stats   = coalesce(xp_values -> '__stats__', stats),
+    quests  = coalesce(xp_values -> '__daily_quests__', quests),
+    derived = coalesce(xp_values -> '__last_derived__', derived),
+    xp_values = xp_values - '__stats__' - '__daily_quests__' - '__last_derived__'
+where xp_values ?| array['__stats__', '__daily_quests__', '__last_derived__'];
+
+-- Merge a key-level patch {"xp": {...}, "debt": {...}, "stats": {...}, "quests": {...}, "derived": {...}}
+-- into the row, but only if p_version is newer than what is stored.
+-- Returns {"applied": bool, "version": <stored version after the call>}.
+create or replace function player_state_patch(p_save_key text, p_version bigint, p_patch jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    cur bigint;
+begin
+    insert into player_state (save_key, xp_values, debt_values)
+    values (p_save_key, '{}'::jsonb, '{}'::jsonb)
+    on conflict (save_key) do nothing;
+
+    select version into cur from player_state where save_key = p_save_key for update;
+
+    if cur >= p_version then
+        return jsonb_build_object('applied', false, 'version', cur);
+    end if;
+
+    update player_state
+    set
+        xp_values   = coalesce(xp_values, '{}'::jsonb)   || coalesce(p_patch -> 'xp', '{}'::jsonb),
+        debt_values = coalesce(debt_values, '{}'::jsonb) || coalesce(p_patch -> 'debt', '{}'::jsonb),
+        stats       = stats   || coalesce(p_patch -> 'stats', '{}'::jsonb),
+        quests      = quests  || coalesce(p_patch -> 'quests', '{}'::jsonb),
+        derived     = derived || coalesce(p_patch -> 'derived', '{}'::jsonb),
+        version     = p_version
+    where save_key = p_save_key;
+
+    return jsonb_build_object('applied', true, 'version', p_version);
+end;
+$$;
@@ -0,0 +1,47 @@
+-- Typed, indexed hot columns on player_state_log.
+--
+-- Before: the Log page selected every row's payload jsonb (rows can also carry a full
+--         state snapshot) only to read a handful of fields from it.
+-- After:  those fields are real columns (written by the app on insert, backfilled here),
+--         Log queries select only them, and (save_key, id desc) serves the keyset pages.
+--
+-- Column meaning (same as supabase_client.log_hot_fields):
+--   category    XP / debt category, quest name or unlocked title
+--   xp_amount   XP shown for the row (leftover after debt, or the debt penalty)
+--   delta       signed change (XP +/-, debt delta, levels gained)
+--   value       integer the row ends at (stat new_value, level reached)
+
+alter table player_state_log add column if not exists category   text;
+alter table player_state_log add column if not exists mode       text;
+alter table player_state_log add column if not exists delta      double precision;
+alter table player_state_log add column if not exists xp_amount  double precision;
+alter table player_state_log add column if not exists ts_utc     timestamptz;
+alter table player_state_log add column if not exists stat_group text;
+alter table player_state_log add column if not exists stat       text;
+alter table player_state_log add column if not exists value      integer;
+
+update player_state_log
+set
+    category   = coalesce(payload ->> 'category', payload ->> 'quest', payload ->> 'title'),
+    mode       = payload ->> 'mode',
+    ts_utc     = (payload ->> '_ts_utc')::timestamptz,
+    stat_group = payload ->> 'group',
+    stat       = payload ->> 'stat',
+    xp_amount  = case event_type
+        when 'xp_adjust'   then coalesce((payload ->> 'leftover_after_debt')::float8, (payload ->> 'base')::float8, 0)
+        when 'debt_adjust' then coalesce((payload ->> 'base_penalty')::float8, abs(coalesce((payload ->> 'delta')::float8, 0)))
+    end,
+    delta      = case event_type
+        when 'xp_adjust'   then (case when payload ->> 'mode' = 'Minus' then -1 else 1 end)
+                                * coalesce((payload ->> 'leftover_after_debt')::float8, (payload ->> 'base')::float8, 0)
+        when 'debt_adjust' then coalesce((payload ->> 'delta')::float8, 0)
+        when 'level_up'    then (payload ->> 'to')::float8 - (payload ->> 'from')::float8
+    end,
+    value      = case event_type
+        when 'stat_adjust' then (payload ->> 'new_value')::numeric::int
+        when 'level_up'    then (payload ->> 'to')::numeric::int
+    end
+where ts_utc is null;
+
+-- keyset pages: where save_key = $1 [and id < $2] order by id desc limit $3
+create index if not exists player_state_log_save_key_id on player_state_log (save_key, id desc);
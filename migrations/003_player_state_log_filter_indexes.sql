@@ -0,0 +1,10 @@
+-- Indexes behind the Log page filters (event type, category, date range).
+--
+-- Filtered pages are keyset queries like
+--   where save_key = $1 and category = $2 [and id < $3] order by id desc limit $4
+-- so each one walks only the matching rows instead of the save_key's whole history.
+-- Mode is low-cardinality and is only ever combined with one of these.
+
+create index if not exists player_state_log_event_type on player_state_log (save_key, event_type, id desc);
+create index if not exists player_state_log_category   on player_state_log (save_key, category, id desc);
+create index if not exists player_state_log_ts_utc     on player_state_log (save_key, ts_utc);
@@ -0,0 +1,370 @@
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from supabase_client import LOG_HOT_COLUMNS, log_hot_fields
+
+# ---------- POSTGREST STAND-IN ----------
+# A small in-memory imitation of the Supabase REST endpoints this app uses,
+# so the cloud paths can be exercised and measured without the live service.
+#
+# Supported:
+#   GET  /rest/v1/<table>?col=eq.x&col=lt.5&select=a,b&order=id.desc&limit=N
+#   POST /rest/v1/<table>        (object or JSON array; Prefer: resolution=merge-duplicates upserts)
+#   POST /rest/v1/rpc/player_state_patch   (migrations/001)
+#   player_state_log hot columns           (migrations/002)
+
+STATE_COLUMNS = ["save_key", "xp_values", "debt_values"]
+PARTITION_COLUMNS = ["stats", "quests", "derived", "version"]
+LOG_COLUMNS = ["id", "save_key", "event_type", "payload", "snapshot", "created_at"]
+LOG_HOT = list(LOG_HOT_COLUMNS)  # migrations/002
+
+_OPS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+}
+
+
+class StandInError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _coerce(raw: str, like):
+    """Query-string values are text; compare them as the column's type."""
+    if isinstance(like, bool):
+        return raw.lower() == "true"
+    if isinstance(like, int):
+        return int(raw)
+    if isinstance(like, float):
+        return float(raw)
+    return raw
+
+
+def _match(row: dict, filters: list) -> bool:
+    for col, op, raw in filters:
+        v = row.get(col)
+        if op == "is":
+            if raw == "null" and v is not None:
+                return False
+            continue
+        if op == "in":
+            wanted = [x.strip().strip('"') for x in raw.strip("()").split(",")]
+            if v is None or v not in [_coerce(w, v) for w in wanted]:
+                return False
+            continue
+        if v is None:
+            return False
+        if not _OPS[op](v, _coerce(raw, v)):
+            return False
+    return True
+
+
+class PostgrestStandIn:
+    """
+    In-process HTTP server speaking enough PostgREST for player_state / player_state_log.
+
+    latency / jitter   seconds added to every request (uniform jitter on top)
+    error_rate         probability of answering 503 instead of doing the work
+    partitioned        migrations/001 applied (partition columns + version + patch RPC)
+    log_has_id         player_state_log exposes `id` (older tables did not)
+    log_columns        migrations/002 applied (typed hot columns on player_state_log)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        partitioned: bool = True,
+        log_has_id: bool = True,
+        log_columns: bool = True,
+        seed=None,
+    ):
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.error_rate = float(error_rate)
+        self.partitioned = bool(partitioned)
+        self.log_has_id = bool(log_has_id)
+        self.log_columns = bool(log_columns)
+        self._rng = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self.state = {}
+        self.log = []
+        self._next_id = 1
+
+        self.requests = {}
+        self.connections = 0
+
+        self._server = None
+        self._thread = None
+
+    # ---------- LIFECYCLE ----------
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts serving on a daemon thread; returns the base URL to use as SUPABASE_URL."""
+        handler = type("_Handler", (_Handler,), {"standin": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="postgrest-standin", daemon=True)
+        self._thread.start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------- STATS ----------
+    def reset_stats(self):
+        with self._lock:
+            self.requests = {}
+            self.connections = 0
+
+    def request_count(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def _count(self, key: str):
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def _count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    # ---------- SCHEMA ----------
+    def columns(self, table: str) -> list:
+        if table == "player_state":
+            return STATE_COLUMNS + (PARTITION_COLUMNS if self.partitioned else [])
+        if table == "player_state_log":
+            cols = LOG_COLUMNS + (LOG_HOT if self.log_columns else [])
+            return cols if self.log_has_id else [c for c in cols if c != "id"]
+        raise StandInError(404, f'relation "public.{table}" does not exist')
+
+    def migrate_log_columns(self):
+        """Applies migrations/002 to a running stand-in: adds the hot columns and backfills them."""
+        with self._lock:
+            self.log_columns = True
+            for row in self.log:
+                row.update(log_hot_fields(row.get("event_type") or "", row.get("payload")))
+
+    def _check_columns(self, table: str, cols):
+        known = self.columns(table)
+        for c in cols:
+            if c not in known:
+                raise StandInError(400, f"column {table}.{c} does not exist")
+
+    # ---------- REQUEST HANDLING ----------
+    def _inject(self):
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            raise StandInError(503, "injected failure")
+
+    def handle_get(self, table: str, query: list):
+        self._inject()
+        cols = self.columns(table)
+
+        select, order, limit, filters = None, None, None, []
+        for k, v in query:
+            if k == "select":
+                select = [c.strip() for c in v.split(",") if c.strip()]
+            elif k == "order":
+                order = v
+            elif k == "limit":
+                limit = int(v)
+            else:
+                op, _, raw = v.partition(".")
+                if op not in _OPS and op not in ("in", "is"):
+                    raise StandInError(400, f"unknown operator {op}")
+                filters.append((k, op, raw))
+
+        self._check_columns(table, [c for c in (select or []) if c != "*"])
+        self._check_columns(table, [f[0] for f in filters])
+
+        with self._lock:
+            rows = list(self.state.values()) if table == "player_state" else list(self.log)
+            rows = [r for r in rows if _match(r, filters)]
+
+        if order:
+            for part in reversed(order.split(",")):
+                col, _, direction = part.partition(".")
+                self._check_columns(table, [col])
+                rows.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=direction.startswith("desc"))
+        if limit is not None:
+            rows = rows[:limit]
+
+        out_cols = cols if not select or select == ["*"] else select
+        return 200, [{c: r.get(c) for c in out_cols} for r in rows]
+
+    def handle_post(self, table: str, body, prefer: str):
+        self._inject()
+
+        if table == "rpc/player_state_patch":
+            if not self.partitioned:
+                raise StandInError(404, "function player_state_patch does not exist")
+            return 200, self._rpc_patch(body)
+
+        rows = body if isinstance(body, list) else [body]
+        cols = self.columns(table)
+        for r in rows:
+            self._check_columns(table, [c for c in r.keys()])
+        upsert = "resolution=merge-duplicates" in (prefer or "")
+
+        with self._lock:
+            if table == "player_state":
+                for r in rows:
+                    key = r.get("save_key")
+                    if key in self.state and not upsert:
+                        raise StandInError(409, "duplicate key value violates unique constraint")
+                    base = self.state.get(key) or self._empty_state(key)
+                    base.update(r)
+                    self.state[key] = base
+            else:
+                now = datetime.now(timezone.utc).isoformat()
+                for r in rows:
+                    row = {c: None for c in cols}
+                    row.update(r)
+                    row["created_at"] = now
+                    if "id" in cols:
+                        row["id"] = self._next_id
+                    self._next_id += 1
+                    self.log.append(row)
+
+        if "return=representation" in (prefer or ""):
+            return 201, rows
+        return 201, None
+
+    def _empty_state(self, key: str) -> dict:
+        row = {"save_key": key, "xp_values": {}, "debt_values": {}}
+        if self.partitioned:
+            row.update({"stats": {}, "quests": {}, "derived": {}, "version": 0})
+        return row
+
+    def _rpc_patch(self, body: dict) -> dict:
+        key = body.get("p_save_key")
+        version = int(body.get("p_version") or 0)
+        patch = body.get("p_patch") or {}
+        with self._lock:
+            row = self.state.setdefault(key, self._empty_state(key))
+            if int(row.get("version") or 0) >= version:
+                return {"applied": False, "version": row.get("version")}
+            col = {"xp": "xp_values", "debt": "debt_values"}
+            for part, values in patch.items():
+                target = col.get(part, part)
+                row[target] = {**(row.get(target) or {}), **values}
+            row["version"] = version
+        return {"applied": True, "version": version}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    standin = None
+
+    def setup(self):
+        super().setup()
+        # headers and body go out in separate writes; without this Nagle adds ~40ms per reply
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.standin._count_connection()
+
+    def log_message(self, *args):
+        pass
+
+    def _table(self) -> str:
+        path = urlparse(self.path).path
+        prefix = "/rest/v1/"
+        if not path.startswith(prefix):
+            raise StandInError(404, "not found")
+        return path[len(prefix):]
+
+    def _reply(self, status: int, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, fn):
+        try:
+            status, body = fn()
+        except StandInError as e:
+            status, body = e.status, {"message": e.message}
+        except Exception as e:
+            status, body = 500, {"message": str(e)}
+        self._reply(status, body)
+
+    def do_GET(self):
+        def go():
+            table = self._table()
+            self.standin._count(f"GET {table}")
+            return self.standin.handle_get(table, parse_qsl(urlparse(self.path).query, keep_blank_values=True))
+
+        self._dispatch(go)
+
+    def do_POST(self):
+        def go():
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            table = self._table()
+            self.standin._count(f"POST {table}")
+            return self.standin.handle_post(table, json.loads(raw or b"null"), self.headers.get("Prefer", ""))
+
+        self._dispatch(go)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the PostgREST stand-in (point SUPABASE_URL at it).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=54321)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to each request")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra uniform random seconds")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503")
+    ap.add_argument("--legacy", action="store_true", help="schema without migrations/001 and 002")
+    args = ap.parse_args()
+
+    standin = PostgrestStandIn(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        partitioned=not args.legacy,
+        log_columns=not args.legacy,
+    )
+    url = standin.start(args.host, args.port)
+    print(f"PostgREST stand-in listening on {url}  (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from game_rules import DEBT_REGISTRY, DEFAULT_DEBT_VALUES, DEFAULT_STATS, DEFAULT_XP_VALUES, XP_REGISTRY, PlayerState
+from local_store import LocalStore, local_store_path
+
+# ---------- EVENT-SOURCING REPLAY ----------
+# Rebuilds XP / debt / stats state by folding player_state_log events (as mirrored
+# in the local SQLite store) through the same rules the app applies live.
+#
+#   python replay.py --save-key local --verify
+#   python replay.py --save-key local --as-of 2026-03-31T23:59:59+00:00
+#   python replay.py --save-key a --save-key b --workers 2
+#
+# Events are folded in log id (write) order. Timestamps do not have to follow it:
+# concurrent sessions drift a little, and import_logs.py appends backdated rows
+# after everything already logged. So an as-of replay reads the whole log and
+# skips events stamped after the cut-off rather than stopping at the first one.
+
+
+def _parse_ts(s):
+    if not s or not isinstance(s, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _from_checkpoint(saved: dict) -> PlayerState:
+    return PlayerState.from_dicts(saved.get("xp_values"), saved.get("debt_values"))
+
+
+def state_view(player: PlayerState) -> dict:
+    """{"xp", "debt", "stats"} dicts of a replayed state (CLI / JSON output)."""
+    return {
+        "xp": XP_REGISTRY.to_dict(player.xp),
+        "debt": DEBT_REGISTRY.to_dict(player.debt),
+        "stats": player.stats_dict(),
+    }
+
+
+def _apply_snapshot(player: PlayerState, snap: dict):
+    """Snapshots (written with resets) hold the whole state right after the event."""
+    xp = snap.get("xp_values") or {}
+    restored = PlayerState.from_dicts(xp, snap.get("debt_values"))
+    player.xp[:] = restored.xp
+    player.debt[:] = restored.debt
+    if isinstance(xp.get("__stats__"), dict):
+        player.stats[:] = restored.stats
+    player.derived.rebuild(player.xp, player.debt)
+
+
+def apply_event(player: PlayerState, event: dict):
+    """Folds one log row into the state (in place), mirroring the app's Apply / Reset handlers."""
+    et = event.get("event_type")
+    p = event.get("payload") or {}
+    snap = event.get("snapshot")
+    if isinstance(snap, dict) and snap:
+        _apply_snapshot(player, snap)
+        return
+
+    if et == "xp_adjust":
+        cat = p.get("category")
+        if cat not in XP_REGISTRY:
+            return
+        base = float(p.get("base") or 0.0)
+        if p.get("mode") == "Minus":
+            player.set_xp(cat, max(0.0, player.xp_value(cat) - base))
+        elif isinstance(p.get("debt_paid"), dict):
+            # rows written since the exact split record what was paid (bulk entries
+            # share one split), so fold those facts instead of re-splitting per row
+            for k, v in p["debt_paid"].items():
+                if k in DEBT_REGISTRY:
+                    player.set_debt(k, max(0.0, player.debt_value(k) - float(v)))
+            leftover = float(p.get("leftover_after_debt") or 0.0)
+            player.set_xp(cat, max(0.0, player.xp_value(cat) + leftover))
+        else:
+            leftover, _paid = player.pay_debt(base)
+            player.set_xp(cat, max(0.0, player.xp_value(cat) + float(leftover)))
+
+    elif et == "debt_adjust":
+        cat = p.get("category")
+        if cat not in DEBT_REGISTRY:
+            return
+        player.set_debt(cat, max(0.0, player.debt_value(cat) + float(p.get("delta") or 0.0)))
+
+    elif et == "stat_adjust":
+        group, stat = p.get("group"), p.get("stat")
+        if group in DEFAULT_STATS and stat in DEFAULT_STATS[group] and p.get("new_value") is not None:
+            player.set_stat(group, stat, int(p["new_value"]))
+
+    elif et == "reset_xp":
+        player.reset_xp()
+    elif et == "reset_debt":
+        player.reset_debt()
+    elif et == "reset_stats":
+        group = p.get("group")
+        if group in DEFAULT_STATS:
+            player.reset_stats(group)
+    elif et == "reset":
+        player.reset_xp()
+        player.reset_debt()
+        player.reset_stats()
+
+
+class ReplayEngine:
+    """
+    Replays one save_key's log from its LocalStore.
+
+    A full replay (no as_of / since) writes a checkpoint every `checkpoint_every`
+    events; later replays start from the newest usable checkpoint instead of id 0.
+    A checkpoint is usable for "as of T" when every event folded into it is <= T.
+    """
+
+    def __init__(self, store: LocalStore, checkpoint_every: int = 500):
+        self.store = store
+        self.checkpoint_every = int(checkpoint_every)
+
+    def state_at(self, as_of: str = None, since: str = None) -> dict:
+        """
+        State after every event at or before `as_of` (latest if None). `since` replays a
+        season: start from defaults and ignore events before it (no checkpoints used).
+        """
+        cut = _parse_ts(as_of)
+        start = _parse_ts(since)
+        full = cut is None and start is None
+
+        cp = self.store.latest_checkpoint(cut.isoformat() if cut else None) if start is None else None
+        last_id, max_ts, saved = cp if cp else (0, None, None)
+        player = _from_checkpoint(saved) if saved else PlayerState()
+        max_dt = _parse_ts(max_ts)
+        folded = 0
+        since_cp = 0
+
+        for ev in self.store.iter_log_events(after_id=last_id):
+            ts = _parse_ts((ev.get("payload") or {}).get("_ts_utc"))
+            if cut is not None and ts is not None and ts > cut:
+                continue
+            if start is not None and (ts is None or ts < start):
+                continue
+
+            apply_event(player, ev)
+            folded += 1
+            last_id = ev["id"]
+            if ts is not None and (max_dt is None or ts > max_dt):
+                max_dt = ts
+
+            since_cp += 1
+            if full and since_cp >= self.checkpoint_every:
+                xp_values, debt_values = player.to_dicts()
+                self.store.save_checkpoint(
+                    last_id,
+                    max_dt.isoformat() if max_dt else None,
+                    {"xp_values": xp_values, "debt_values": debt_values},
+                )
+                since_cp = 0
+
+        # re-sum so the result does not depend on which checkpoint the fold started from
+        player.derived.rebuild(player.xp, player.debt)
+        return {
+            "state": state_view(player),
+            "derived": player.derived.snapshot(),
+            "last_id": last_id,
+            "events_folded": folded,
+            "from_checkpoint": cp[0] if cp else None,
+        }
+
+    def verify(self, stored=None, tolerance: float = 1e-6) -> dict:
+        """
+        Compares stored player_state (the store's own, or `stored` = (xp_values, debt_values)
+        e.g. from SupabaseClient.load_state()) with a full replay of the log.
+        """
+        replayed = self.state_at()
+        stored = stored if stored is not None else self.store.load_state()
+        xp_values, debt_values = stored if stored else ({}, {})
+
+        mismatches = []
+        for part, values, defaults in (
+            ("xp", xp_values, DEFAULT_XP_VALUES),
+            ("debt", debt_values, DEFAULT_DEBT_VALUES),
+        ):
+            for k in defaults:
+                have = float(values.get(k, defaults[k]) or 0.0)
+                want = float(replayed["state"][part][k])
+                if abs(have - want) > tolerance:
+                    mismatches.append({"part": part, "key": k, "stored": have, "replayed": want})
+
+        stats = xp_values.get("__stats__") if isinstance(xp_values.get("__stats__"), dict) else {}
+        for group, defaults in DEFAULT_STATS.items():
+            for k, dv in defaults.items():
+                have = int((stats.get(group) or {}).get(k, dv))
+                want = int(replayed["state"]["stats"][group].get(k, dv))
+                if have != want:
+                    mismatches.append({"part": "stats", "key": f"{group}.{k}", "stored": have, "replayed": want})
+
+        return {"ok": not mismatches, "mismatches": mismatches, "last_id": replayed["last_id"]}
+
+
+# ---------- PROCESS POOL ----------
+def replay_job(job: dict) -> dict:
+    """
+    One independent replay, run in a worker process:
+      {"data_dir", "save_key", "as_of"?, "since"?, "verify"?, "checkpoint_every"?}
+    """
+    path = local_store_path(job["data_dir"], job["save_key"])
+    engine = ReplayEngine(LocalStore(path), checkpoint_every=job.get("checkpoint_every", 500))
+    out = {"save_key": job["save_key"], "as_of": job.get("as_of"), "since": job.get("since")}
+    if job.get("verify"):
+        out["verify"] = engine.verify()
+    else:
+        out.update(engine.state_at(as_of=job.get("as_of"), since=job.get("since")))
+    return out
+
+
+def replay_many(jobs: list, max_workers: int = None) -> list:
+    """Runs independent save_key / season replays in parallel; results in job order."""
+    jobs = list(jobs)
+    if len(jobs) <= 1:
+        return [replay_job(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(replay_job, jobs))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rebuild player state from the event log.")
+    ap.add_argument("--data-dir", default=".hud_data", help="LOCAL_DATA_DIR of the app")
+    ap.add_argument("--save-key", action="append", required=True, help="repeat to replay several in parallel")
+    ap.add_argument("--as-of", default=None, help="ISO timestamp; state after every event up to it")
+    ap.add_argument("--since", default=None, help="ISO timestamp; replay a season starting from defaults")
+    ap.add_argument("--verify", action="store_true", help="compare stored player_state with a full replay")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    jobs = [
+        {"data_dir": args.data_dir, "save_key": k, "as_of": args.as_of, "since": args.since, "verify": args.verify}
+        for k in args.save_key
+    ]
+    for result in replay_many(jobs, args.workers):
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+from types import MappingProxyType
+
+from game_rules import DEBT_PENALTY, DEFAULT_DEBT_VALUES, XP_COMPLETION, XP_PER_HOUR, XP_STREAK
+
+# ---------- RULE TABLES (data.json) ----------
+# XP rates and debt penalties compiled from a rules file (data.json by default)
+# into read-only tables. One RulesLoader per process hands the same tables to
+# every session and recompiles only when the file's mtime changes, so rates can
+# be tuned without a redeploy.
+#
+# Read from the file (anything missing keeps the game_rules default):
+#   xp_rates                     {category: XP per hour}
+#   rules.streak_bonus_per_day   XP for each "... Streak" category
+#   rules.healthy_eating_xp      XP for "Eating Healthy"
+#   xp_completion / debt_penalty {category: XP} (optional)
+# Categories themselves are fixed (the registries); unknown names are ignored.
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.json")
+
+
+class RuleTables:
+    """Immutable rate tables plus the lookups the app needs from them."""
+
+    __slots__ = ("xp_per_hour", "xp_completion", "xp_streak", "debt_penalty", "source", "ignored")
+
+    def __init__(self, xp_per_hour: dict, xp_completion: dict, xp_streak: dict, debt_penalty: dict, source=None, ignored=()):
+        set_ = object.__setattr__
+        set_(self, "xp_per_hour", MappingProxyType(dict(xp_per_hour)))
+        set_(self, "xp_completion", MappingProxyType(dict(xp_completion)))
+        set_(self, "xp_streak", MappingProxyType(dict(xp_streak)))
+        set_(self, "debt_penalty", MappingProxyType(dict(debt_penalty)))
+        set_(self, "source", source)
+        set_(self, "ignored", tuple(ignored))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuleTables is read-only")
+
+    def xp_delta(self, category: str, choice: str) -> float:
+        """XP for one Adjust XP choice ("30 min" / "1 hour" for hourly categories)."""
+        if category in self.xp_per_hour:
+            return self.xp_per_hour[category] * {"30 min": 0.5, "1 hour": 1.0}.get(choice, 0.0)
+        if category in self.xp_completion:
+            return self.xp_completion[category]
+        if category in self.xp_streak:
+            return self.xp_streak[category]
+        return 0.0
+
+    def xp_for_hours(self, category: str, hours: float) -> float:
+        """Bulk entry: hourly categories scale with hours; completions / streaks count once."""
+        if category in self.xp_per_hour:
+            return self.xp_per_hour[category] * max(0.0, float(hours))
+        return self.xp_delta(category, "")
+
+
+def _rates(overrides, defaults: dict, valid, ignored: list) -> dict:
+    out = dict(defaults)
+    if not isinstance(overrides, dict):
+        return out
+    for k, v in overrides.items():
+        if k not in valid:
+            ignored.append(k)
+            continue
+        out[k] = float(v)
+    return out
+
+
+def compile_rules(data: dict, source: str = None) -> RuleTables:
+    """data.json contents -> RuleTables; raises ValueError / TypeError on a non-numeric rate."""
+    data = data if isinstance(data, dict) else {}
+    rules = data.get("rules") if isinstance(data.get("rules"), dict) else {}
+    ignored = []
+
+    xp_per_hour = _rates(data.get("xp_rates"), XP_PER_HOUR, XP_PER_HOUR, ignored)
+    xp_completion = _rates(data.get("xp_completion"), XP_COMPLETION, XP_COMPLETION, ignored)
+
+    xp_streak = dict(XP_STREAK)
+    if rules.get("streak_bonus_per_day") is not None:
+        bonus = float(rules["streak_bonus_per_day"])
+        xp_streak.update({k: bonus for k in XP_STREAK if k.endswith(" Streak")})
+    if rules.get("healthy_eating_xp") is not None:
+        xp_streak["Eating Healthy"] = float(rules["healthy_eating_xp"])
+
+    debt_penalty = _rates(data.get("debt_penalty"), DEBT_PENALTY, DEFAULT_DEBT_VALUES, ignored)
+    return RuleTables(xp_per_hour, xp_completion, xp_streak, debt_penalty, source=source, ignored=ignored)
+
+
+DEFAULT_RULES = compile_rules({})
+
+
+class RulesLoader:
+    """
+    get() returns the compiled tables for `path`, recompiling only after the file's mtime
+    (or size) changes. A missing file means DEFAULT_RULES; a broken edit keeps the last
+    good tables and is reported through `last_error`.
+    """
+
+    def __init__(self, path: str = DEFAULT_RULES_PATH):
+        self.path = path
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._tables = DEFAULT_RULES
+
+    def get(self) -> RuleTables:
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return self._tables
+
+        with self._lock:
+            if stamp != self._stamp:
+                self._reload(stamp)
+        return self._tables
+
+    def _reload(self, stamp):
+        if stamp is None:
+            self._tables, self.last_error = DEFAULT_RULES, None
+        else:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._tables = compile_rules(json.load(f), source=self.path)
+                self.last_error = None
+            except (OSError, ValueError, TypeError) as e:
+                self.last_error = f"{self.path}: {e}"
+        self._stamp = stamp
@@ -0,0 +1,429 @@
+import copy
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ---------- SUPABASE (POSTGREST) CLIENT ----------
+STATE_TABLE = "player_state"
+LOG_TABLE = "player_state_log"
+PATCH_RPC = "player_state_patch"
+
+# ---------- STATE PARTITIONS ----------
+# In session, stats / quests / derived live as meta keys inside xp_values.
+# On the wire (after migrations/001) each one is its own player_state column.
+META_PARTITIONS = {
+    "stats": "__stats__",
+    "quests": "__daily_quests__",
+    "derived": "__last_derived__",
+}
+
+
+class StaleWriteError(RuntimeError):
+    """The server already holds a newer player_state version than the patch."""
+
+
+def split_partitions(xp_values: dict, debt_values: dict) -> dict:
+    xp_values = xp_values or {}
+    debt_values = debt_values or {}
+    parts = {
+        "xp": {k: v for k, v in xp_values.items() if not str(k).startswith("__")},
+        "debt": {k: v for k, v in debt_values.items() if not str(k).startswith("__")},
+    }
+    for part, meta_key in META_PARTITIONS.items():
+        v = xp_values.get(meta_key)
+        parts[part] = copy.deepcopy(v) if isinstance(v, dict) else {}
+    return parts
+
+
+def join_partitions(parts: dict):
+    """Inverse of split_partitions: returns (xp_values, debt_values) with meta keys re-embedded."""
+    xp_values = dict(parts.get("xp") or {})
+    debt_values = dict(parts.get("debt") or {})
+    for part, meta_key in META_PARTITIONS.items():
+        v = parts.get(part)
+        if isinstance(v, dict) and v:
+            xp_values[meta_key] = v
+    return xp_values, debt_values
+
+
+def diff_partitions(prev: dict, cur: dict) -> dict:
+    """
+    Key-level patch: for each partition, only the top-level keys whose value changed.
+    Partitions with no changes are left out entirely.
+    """
+    prev = prev or {}
+    patch = {}
+    for part, values in (cur or {}).items():
+        old = prev.get(part) or {}
+        changed = {k: v for k, v in values.items() if k not in old or old[k] != v}
+        if changed:
+            patch[part] = changed
+    return patch
+
+
+class VersionClock:
+    """
+    Monotonic player_state version source (microsecond clock, never below anything
+    observed or issued), so patches from any writer order correctly and late or
+    out-of-order ones can be rejected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def observe(self, version: int):
+        with self._lock:
+            self._version = max(self._version, int(version or 0))
+
+    def next(self) -> int:
+        with self._lock:
+            self._version = max(self._version + 1, time.time_ns() // 1000)
+            return self._version
+
+
+def merge_patches(base: dict, newer: dict) -> dict:
+    out = {part: dict(values) for part, values in (base or {}).items()}
+    for part, values in (newer or {}).items():
+        out.setdefault(part, {}).update(values)
+    return out
+
+
+# ---------- LOG HOT COLUMNS ----------
+# After migrations/002 the fields the Log page reads are typed player_state_log
+# columns, so a Log query never has to ship payload / snapshot blobs.
+LOG_HOT_COLUMNS = ("category", "mode", "delta", "xp_amount", "ts_utc", "stat_group", "stat", "value")
+LOG_LIST_COLUMNS = ("id", "event_type") + LOG_HOT_COLUMNS
+
+
+def _num(v, cast=float):
+    try:
+        return cast(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def log_hot_fields(event_type: str, payload: dict) -> dict:
+    """
+    Column values for one log row, derived from its payload (mirrors the backfill in
+    migrations/002):
+      category    XP / debt category, quest name or unlocked title
+      xp_amount   XP shown for the row (leftover after debt, or the debt penalty)
+      delta       signed change (XP +/-, debt delta, levels gained)
+      value       integer the row ends at (stat new_value, level reached)
+    """
+    p = payload or {}
+    out = dict.fromkeys(LOG_HOT_COLUMNS)
+    out["ts_utc"] = p.get("_ts_utc")
+    out["mode"] = p.get("mode")
+    out["stat_group"] = p.get("group")
+    out["stat"] = p.get("stat")
+    for k in ("category", "quest", "title"):
+        if p.get(k) is not None:
+            out["category"] = str(p.get(k))
+            break
+
+    if event_type == "xp_adjust":
+        amt = _num(p.get("leftover_after_debt"))
+        if amt is None:
+            amt = _num(p.get("base"), float) or 0.0
+        out["xp_amount"] = amt
+        out["delta"] = -amt if p.get("mode") == "Minus" else amt
+    elif event_type == "debt_adjust":
+        delta = _num(p.get("delta")) or 0.0
+        pen = _num(p.get("base_penalty"))
+        out["delta"] = delta
+        out["xp_amount"] = pen if pen is not None else abs(delta)
+    elif event_type == "stat_adjust":
+        out["value"] = _num(p.get("new_value"), int)
+    elif event_type == "level_up":
+        fr, to = _num(p.get("from"), int), _num(p.get("to"), int)
+        out["value"] = to
+        if fr is not None and to is not None:
+            out["delta"] = float(to - fr)
+    return out
+
+
+def log_list_row(row: dict) -> dict:
+    """Projects a full log row (with payload) onto the LOG_LIST_COLUMNS shape."""
+    out = {"id": row["id"]} if "id" in row else {}
+    out["event_type"] = row.get("event_type") or ""
+    out.update(log_hot_fields(out["event_type"], row.get("payload")))
+    return out
+
+
+# ---------- LOG FILTERS ----------
+# {"event_types": [...], "category": str, "mode": str, "since": iso, "until": iso}
+# Every key is optional; since is inclusive, until exclusive. Timestamps are UTC ISO
+# strings as written by the app, so they compare correctly as text.
+def log_filter_key(filters: dict):
+    """Hashable, order-independent form of a filter dict (None when nothing is filtered)."""
+    items = []
+    for k, v in sorted((filters or {}).items()):
+        if v is None or v == "" or v == []:
+            continue
+        items.append((k, tuple(sorted(v)) if isinstance(v, (list, tuple, set)) else v))
+    return tuple(items) or None
+
+
+def log_row_matches(row: dict, filters: dict) -> bool:
+    f = filters or {}
+    if f.get("event_types") and row.get("event_type") not in f["event_types"]:
+        return False
+    if f.get("category") and row.get("category") != f["category"]:
+        return False
+    if f.get("mode") and row.get("mode") != f["mode"]:
+        return False
+    ts = row.get("ts_utc")
+    if f.get("since") and (ts is None or ts < f["since"]):
+        return False
+    if f.get("until") and (ts is None or ts >= f["until"]):
+        return False
+    return True
+
+
+def log_filter_params(filters: dict) -> list:
+    """PostgREST query params for a filter dict (needs migrations/002 columns)."""
+    f = filters or {}
+    params = []
+    if f.get("event_types"):
+        params.append(("event_type", "in.(" + ",".join(f'"{t}"' for t in f["event_types"]) + ")"))
+    if f.get("category"):
+        params.append(("category", f"eq.{f['category']}"))
+    if f.get("mode"):
+        params.append(("mode", f"eq.{f['mode']}"))
+    if f.get("since"):
+        params.append(("ts_utc", f"gte.{f['since']}"))
+    if f.get("until"):
+        params.append(("ts_utc", f"lt.{f['until']}"))
+    return params
+
+
+class SupabaseClient:
+    """
+    Talks to the Supabase REST API for one save_key.
+
+    Owns a single pooled keep-alive requests.Session, so every call after the
+    first reuses an open TCP+TLS connection instead of handshaking again.
+    Table capabilities (e.g. whether player_state_log has an `id` column) are
+    probed once and remembered for the lifetime of the client.
+    """
+
+    def __init__(self, url: str, key: str, save_key: str, timeout: float = 15, pool_size: int = 8):
+        self.rest_url = f"{url.rstrip('/')}/rest/v1"
+        self.save_key = save_key
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0, pool_block=False)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Content-Type": "application/json",
+                "Connection": "keep-alive",
+            }
+        )
+
+        self._caps_lock = threading.Lock()
+        self._log_has_id = None
+        self._log_has_columns = None
+        self._state_has_parts = None
+        self._clock = VersionClock()
+
+    # ---------- LOW LEVEL ----------
+    def _get(self, table: str, params):
+        return self.session.get(f"{self.rest_url}/{table}", params=params, timeout=self.timeout)
+
+    def _post(self, table: str, body, prefer: str = None):
+        headers = {"Prefer": prefer} if prefer else None
+        return self.session.post(f"{self.rest_url}/{table}", headers=headers, json=body, timeout=self.timeout)
+
+    # ---------- CAPABILITIES ----------
+    def _probe(self, attr: str, table: str, column: str) -> bool:
+        """
+        Whether `table` exposes `column`, probed once per client. Only definitive answers
+        are cached: 2xx -> True, 400 / 404 (PostgREST's missing column / missing table) ->
+        False. Anything else (5xx, 401, 429, ...) raises and the next call probes again.
+        """
+        cached = getattr(self, attr)
+        if cached is not None:
+            return cached
+
+        with self._caps_lock:
+            if getattr(self, attr) is None:
+                params = {"save_key": f"eq.{self.save_key}", "select": column, "limit": "1"}
+                r = self._get(table, params)
+                if r.status_code < 300:
+                    setattr(self, attr, True)
+                elif r.status_code in (400, 404):
+                    setattr(self, attr, False)
+                else:
+                    raise RuntimeError(f"Supabase probe of {table}.{column} failed ({r.status_code}): {r.text}")
+        return getattr(self, attr)
+
+    def log_has_id(self) -> bool:
+        """True if player_state_log exposes an `id` column we can order by."""
+        return self._probe("_log_has_id", LOG_TABLE, "id")
+
+    def log_has_columns(self) -> bool:
+        """True once migrations/002 is applied (typed hot columns on player_state_log)."""
+        return self._probe("_log_has_columns", LOG_TABLE, "ts_utc")
+
+    def state_has_parts(self) -> bool:
+        """True once migrations/001 is applied (partition columns + version + patch RPC)."""
+        return self._probe("_state_has_parts", STATE_TABLE, "version")
+
+    # ---------- STATE ----------
+    def next_version(self) -> int:
+        return self._clock.next()
+
+    def load_state(self):
+        params = {"save_key": f"eq.{self.save_key}", "select": "*"}
+        r = self._get(STATE_TABLE, params)
+        if r.status_code >= 400:
+            raise RuntimeError(f"Supabase load failed ({r.status_code}): {r.text}")
+        rows = r.json()
+        if not rows:
+            return None
+        row = rows[0]
+
+        self._clock.observe(row.get("version"))
+
+        # partition columns win; fall back to meta keys still embedded in legacy xp_values
+        parts = split_partitions(row.get("xp_values") or {}, row.get("debt_values") or {})
+        for part in META_PARTITIONS:
+            if isinstance(row.get(part), dict) and row.get(part):
+                parts[part] = row[part]
+        return join_partitions(parts)
+
+    def save_state(self, xp_values: dict, debt_values: dict):
+        """Full upsert. On a partitioned table every column is rewritten and the version bumped."""
+        payload = {"save_key": self.save_key, "xp_values": xp_values, "debt_values": debt_values}
+        if self.state_has_parts():
+            parts = split_partitions(xp_values, debt_values)
+            payload = {"save_key": self.save_key, "xp_values": parts.pop("xp"), "debt_values": parts.pop("debt")}
+            payload.update(parts)
+            payload["version"] = self.next_version()
+        r = self._post(STATE_TABLE, payload, prefer="resolution=merge-duplicates,return=minimal")
+        if r.status_code >= 400:
+            raise RuntimeError(f"Supabase save failed ({r.status_code}): {r.text}")
+
+    def patch_state(self, patch: dict, version: int):
+        """
+        Key-level update through the player_state_patch RPC: only the keys in `patch`
+        are merged into their partition columns. Raises StaleWriteError if the
+        stored version is already >= `version`.
+        """
+        body = {"p_save_key": self.save_key, "p_version": int(version), "p_patch": patch or {}}
+        r = self._post(f"rpc/{PATCH_RPC}", body)
+        if r.status_code >= 400:
+            raise RuntimeError(f"Supabase patch failed ({r.status_code}): {r.text}")
+        res = r.json() or {}
+        if not res.get("applied", False):
+            raise StaleWriteError(f"Stale write rejected (v{version}, server at v{res.get('version')})")
+
+    # ---------- LOG ----------
+    def append_log(self, event_type: str, payload: dict, snapshot=None):
+        self.append_logs([{"event_type": event_type, "payload": payload, "snapshot": snapshot}])
+
+    def append_logs(self, events: list):
+        """
+        Inserts several log rows in ONE request (PostgREST accepts a JSON array).
+        Rows are inserted in list order, so ids follow the order given.
+        """
+        rows = [
+            {
+                "save_key": self.save_key,
+                "event_type": ev.get("event_type"),
+                "payload": ev.get("payload") or {},
+                "snapshot": ev.get("snapshot"),
+            }
+            for ev in (events or [])
+        ]
+        if not rows:
+            return
+        if self.log_has_columns():
+            for row in rows:
+                row.update(log_hot_fields(row["event_type"], row["payload"]))
+        r = self._post(LOG_TABLE, rows, prefer="return=minimal")
+        if r.status_code >= 400:
+            raise RuntimeError(f"Supabase log append failed ({r.status_code}): {r.text}")
+
+    def load_logs(
+        self,
+        limit: int = 500,
+        before_id: int = None,
+        after_id: int = None,
+        full: bool = False,
+        filters: dict = None,
+    ):
+        """
+        Newest-first page of log rows (every row if `limit` is None). `before_id` /
+        `after_id` are keyset cursors (id < before_id, id > after_id), so paging never
+        re-reads rows already held.
+        Tables without an id column can only return the plain newest-N window; asking
+        them for a cursor raises rather than silently returning that window again.
+
+        Rows come back in the LOG_LIST_COLUMNS shape; on a migrated table only those
+        columns are selected. `full=True` returns event_type + payload instead (for
+        copying history elsewhere). Snapshots are never selected.
+
+        `filters` (see log_row_matches) are applied by PostgREST, not here.
+        """
+        has_id = self.log_has_id()
+        if not has_id and (before_id is not None or after_id is not None):
+            raise RuntimeError("Supabase log paging (before_id / after_id) needs the id column on player_state_log")
+        if log_filter_key(filters) is not None and not self.log_has_columns():
+            raise RuntimeError("Supabase log filters need migrations/002 (typed log columns)")
+        if full or not self.log_has_columns():
+            select = "event_type,payload"
+        else:
+            select = ",".join(LOG_LIST_COLUMNS)
+        if has_id and not select.startswith("id,"):
+            select = "id," + select
+
+        params = [("save_key", f"eq.{self.save_key}"), ("select", select)]
+        if limit is not None:
+            params.append(("limit", str(int(limit))))
+        if has_id:
+            params.append(("order", "id.desc"))
+            if before_id is not None:
+                params.append(("id", f"lt.{int(before_id)}"))
+            if after_id is not None:
+                params.append(("id", f"gt.{int(after_id)}"))
+        params += log_filter_params(filters)
+
+        r = self._get(LOG_TABLE, params)
+        if r.status_code >= 400:
+            raise RuntimeError(f"Supabase log load failed ({r.status_code}): {r.text}")
+        rows = r.json()
+        if full or "payload" not in select:
+            return rows
+        return [log_list_row(row) for row in rows]
+
+    def iter_log_events(self, after_id: int = None, batch_size: int = 1000):
+        """Every log row oldest-first (id, event_type, payload, snapshot), read in keyset pages."""
+        if not self.log_has_id():
+            raise RuntimeError("Supabase log export needs the id column on player_state_log")
+        last = int(after_id or 0)
+        while True:
+            params = [
+                ("save_key", f"eq.{self.save_key}"),
+                ("select", "id,event_type,payload,snapshot"),
+                ("order", "id.asc"),
+                ("id", f"gt.{last}"),
+                ("limit", str(int(batch_size))),
+            ]
+            r = self._get(LOG_TABLE, params)
+            if r.status_code >= 400:
+                raise RuntimeError(f"Supabase log export failed ({r.status_code}): {r.text}")
+            rows = r.json()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]["id"]
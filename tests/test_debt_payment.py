@@ -0,0 +1,53 @@
+import random
+from array import array
+
+from game_rules import DEBT_REGISTRY, DEBT_SCALE, PlayerState, pay_debt_batch, split_payment
+
+
+def _units(values):
+    return [round(v * DEBT_SCALE) for v in values]
+
+
+def test_split_payment_adds_up_exactly():
+    rng = random.Random(7)
+    for _ in range(2000):
+        debts = [rng.choice((0, rng.randrange(1, 10**8))) for _ in range(rng.randrange(1, 12))]
+        pay = rng.randrange(0, sum(debts) * 2 + 2)
+        paid = split_payment(debts, pay)
+        assert sum(paid) == min(pay, sum(debts))
+        assert all(0 <= p <= d for p, d in zip(paid, debts))
+
+
+def test_split_payment_is_proportional_with_largest_remainder():
+    assert split_payment([1, 1, 1], 2) == [1, 1, 0]
+    assert split_payment([3, 1], 2) == [2, 0]
+    assert split_payment([0, 5], 3) == [0, 3]
+    assert split_payment([], 3) == []
+
+
+def test_pay_debt_batch_conserves_every_unit():
+    rng = random.Random(11)
+    for _ in range(300):
+        debt = array("d", (rng.choice((0.0, round(rng.uniform(0, 40), 6))) for _ in range(len(DEBT_REGISTRY))))
+        gains = [round(rng.uniform(0, 15), 6) for _ in range(rng.randrange(1, 8))]
+        before = _units(debt)
+        leftovers, paid_by_gain = pay_debt_batch(debt, gains)
+
+        paid = [sum(_units(p)) for p in paid_by_gain]
+        for g, left, p in zip(_units(gains), _units(leftovers), paid):
+            assert left + p == g
+        per_category = [sum(col) for col in zip(*(_units(p) for p in paid_by_gain))]
+        assert [b - a for b, a in zip(before, _units(debt))] == per_category
+        assert sum(paid) == min(sum(_units(gains)), sum(before))
+
+
+def test_player_pay_debt_batch_keeps_totals_in_step():
+    player = PlayerState()
+    keys = list(DEBT_REGISTRY.keys)
+    player.set_debt(keys[0], 3.3)
+    player.set_debt(keys[1], 1.1)
+    leftovers, paid = player.pay_debt_batch([1.0, 5.0])
+    assert leftovers == [0.0, 1.6]
+    assert round(sum(paid[0].values()) + sum(paid[1].values()), 6) == 4.4
+    assert player.derived.debt_total == 0.0
+    assert sum(player.debt) == 0.0
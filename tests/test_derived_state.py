@@ -0,0 +1,22 @@
+import random
+
+from game_rules import DEBT_REGISTRY, XP_REGISTRY, DerivedState, PlayerState
+
+
+def test_running_totals_match_a_fresh_sum():
+    rng = random.Random(5)
+    player = PlayerState()
+    xp_keys, debt_keys = list(XP_REGISTRY.keys), list(DEBT_REGISTRY.keys)
+    for _ in range(20000):
+        op = rng.random()
+        if op < 0.45:
+            player.set_xp(rng.choice(xp_keys), rng.choice((0.1, 0.2, 0.3, 1 / 3, rng.uniform(0, 50))))
+        elif op < 0.8:
+            player.set_debt(rng.choice(debt_keys), rng.choice((0.0, 0.1, 0.7, rng.uniform(0, 20))))
+        else:
+            player.pay_debt_batch([rng.uniform(0, 5) for _ in range(3)])
+
+    fresh = DerivedState(player.xp, player.debt)
+    assert player.derived.xp_total == fresh.xp_total
+    assert player.derived.debt_total == fresh.debt_total
+    assert player.derived.view() == fresh.view()
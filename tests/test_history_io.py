@@ -0,0 +1,55 @@
+import pytest
+
+from history_io import export_history, restore_history
+from local_store import LocalStore
+
+
+def _store(tmp_path, name):
+    return LocalStore(str(tmp_path / f"{name}.sqlite3"))
+
+
+def _seed(store):
+    store.save_state({"Reading": 2.5, "__stats__": {"physical": {"PUSH": 3}}}, {"XP Wall": 1.0})
+    events = [
+        {"id": i, "event_type": "xp_adjust", "payload": {"category": "Reading", "base": i, "note": 'é, "q"'}, "snapshot": None}
+        for i in (1, 2, 5, 6, 7)  # gaps survive the round trip
+    ]
+    events.append({"id": 8, "event_type": "reset_xp", "payload": {}, "snapshot": {"xp_values": {"Reading": 0.0}, "debt_values": {}}})
+    store.append_logs(events, keep_ids=True)
+
+
+@pytest.mark.parametrize("name", ["h.jsonl", "h.jsonl.gz", "h.csv", "h.csv.gz"])
+def test_export_restore_export_is_byte_identical(tmp_path, name):
+    src = _store(tmp_path, "src")
+    _seed(src)
+    first = tmp_path / ("1" + name)
+    second = tmp_path / ("2" + name)
+    assert export_history(src, str(first))["log_rows"] == 6
+
+    dst = _store(tmp_path, "dst")
+    assert restore_history(dst, str(first)) == {"path": str(first), "log_rows": 6, "state": True}
+    export_history(dst, str(second))
+    assert first.read_bytes() == second.read_bytes()
+    assert [ev["id"] for ev in dst.iter_log_events()] == [1, 2, 5, 6, 7, 8]
+
+
+def test_local_restore_is_not_pushed(tmp_path):
+    src = _store(tmp_path, "src")
+    _seed(src)
+    path = tmp_path / "h.jsonl.gz"
+    export_history(src, str(path))
+
+    dst = _store(tmp_path, "dst")
+    restore_history(dst, str(path))
+    assert dst.unsynced_count() == 0
+    assert dst.take_state_outbox() is None
+    assert dst.load_state() == src.load_state()
+
+
+def test_restore_refuses_a_log_that_has_rows(tmp_path):
+    src = _store(tmp_path, "src")
+    _seed(src)
+    path = tmp_path / "h.jsonl"
+    export_history(src, str(path))
+    with pytest.raises(RuntimeError, match="empty log"):
+        restore_history(src, str(path))
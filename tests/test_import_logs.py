@@ -0,0 +1,61 @@
+import csv
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from import_logs import import_activity_csv
+from local_store import LocalStore
+
+ROWS = [
+    ("02.01.2026", "Reading", "1", "ok, second"),
+    ("01.01.2026", "reading", "0.5", "ok, first (older date, later line)"),
+    ("31.02.2026", "Reading", "1", "bad date"),
+    ("03.01.2026", "Nap", "1", "unknown task"),
+    ("03.01.2026", "Gym Workout", "lots", "hours not a number"),
+    ("03.01.2026", "Gym Workout", "30", "too many hours"),
+    ("2026-01-03T09:00:00Z", "Gym", "2", "ok, prefix match"),
+]
+
+
+def _csv(path, rows=ROWS, header=("date", "task", "hours", "xp_per_hour", "xp_earned", "notes")):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        for date, task, hours, note in rows:
+            w.writerow([date, task, hours, "", "", note])
+    return str(path)
+
+
+def test_malformed_rows_are_reported_and_skipped(tmp_path):
+    store = LocalStore(str(tmp_path / "x.sqlite3"))
+    errors = tmp_path / "errors.csv"
+    report = import_activity_csv(store, _csv(tmp_path / "in.csv"), tz=ZoneInfo("UTC"), errors_path=str(errors), batch_size=2)
+
+    assert (report["rows"], report["imported"], report["malformed"]) == (7, 3, 4)
+    assert [e["line"] for e in report["errors"]] == [4, 5, 6, 7]
+    assert "unknown task 'Nap'" in report["errors"][1]["error"]
+    with open(errors, newline="", encoding="utf-8") as f:
+        assert [row[0] for row in csv.reader(f)] == ["line", "4", "5", "6", "7"]
+
+    events = [ev for ev in store.iter_log_events() if ev["event_type"] == "xp_adjust"]
+    assert [ev["payload"]["note"] for ev in events] == [
+        "ok, first (older date, later line)",
+        "ok, second",
+        "ok, prefix match",
+    ]
+    assert store.load_state() is not None
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    store = LocalStore(str(tmp_path / "x.sqlite3"))
+    report = import_activity_csv(store, _csv(tmp_path / "in.csv"), tz=ZoneInfo("UTC"), dry_run=True)
+    assert report["imported"] == 3
+    assert not store.has_logs() and store.load_state() is None
+
+
+def test_missing_columns_are_rejected(tmp_path):
+    store = LocalStore(str(tmp_path / "x.sqlite3"))
+    path = tmp_path / "in.csv"
+    path.write_text("when,task\n01.01.2026,Reading\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="missing column"):
+        import_activity_csv(store, str(path))
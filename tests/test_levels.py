@@ -0,0 +1,32 @@
+import math
+import random
+
+from game_rules import MAX_LEVEL, compute_level, level_requirement, levels_for_xp
+
+
+def _loop_level(total_xp, max_level=MAX_LEVEL):
+    """The level loop compute_level replaced."""
+    remaining = float(max(0, int(math.floor(total_xp))))
+    level = 1
+    while level < max_level:
+        req = level_requirement(level)
+        if remaining >= req:
+            remaining -= req
+            level += 1
+        else:
+            break
+    return level, remaining, level_requirement(level)
+
+
+def test_compute_level_matches_the_loop():
+    rng = random.Random(3)
+    cases = [-5, 0, 0.5, 9.99, 10, 29.9, 30, 49_500, 49_499.5, 10**7]
+    cases += [rng.uniform(0, 60_000) for _ in range(5000)]
+    for xp in cases:
+        for max_level in (MAX_LEVEL, 1, 20, 150):
+            assert compute_level(xp, max_level) == _loop_level(xp, max_level)
+
+
+def test_levels_for_xp_matches_compute_level():
+    xs = [0, 10, 10.5, 123.4, 5000, 10**6]
+    assert list(levels_for_xp(xs)) == [compute_level(x)[0] for x in xs]
@@ -0,0 +1,89 @@
+from log_cache import LogCache
+
+
+class FakeLog:
+    """Newest-first keyset reads over ids 1..n, counting every fetch."""
+
+    def __init__(self, n):
+        self.rows = [{"id": i, "event_type": "xp_adjust", "category": "Reading"} for i in range(1, n + 1)]
+        self.fetches = []
+
+    def add(self, k):
+        start = len(self.rows) + 1
+        new = [{"id": i, "event_type": "xp_adjust", "category": "Reading"} for i in range(start, start + k)]
+        self.rows.extend(new)
+        return new
+
+    def __call__(self, limit, before_id=None, after_id=None, filters=None):
+        self.fetches.append((limit, before_id, after_id))
+        rows = [r for r in reversed(self.rows) if (before_id is None or r["id"] < before_id) and (after_id is None or r["id"] > after_id)]
+        return rows[:limit]
+
+
+def _chain(cache, fetch, limit=10, pages=3):
+    out, cursor = [], None
+    for _ in range(pages):
+        page = cache.get("k", limit, cursor, fetch)
+        out += page
+        if len(page) < limit:
+            break
+        cursor = page[-1]["id"]
+    return [r["id"] for r in out]
+
+
+def test_hits_are_served_without_fetching():
+    log = FakeLog(50)
+    cache = LogCache(ttl=60)
+    assert _chain(cache, log) == list(range(50, 20, -1))
+    log.fetches.clear()
+    assert _chain(cache, log) == list(range(50, 20, -1))
+    assert log.fetches == []
+
+
+def test_merge_new_pushes_rows_down_through_older_pages():
+    log = FakeLog(50)
+    cache = LogCache(ttl=60)
+    _chain(cache, log)
+    cache.merge_new("k", log.add(4))
+    log.fetches.clear()
+    assert _chain(cache, log) == list(range(54, 24, -1))
+    assert log.fetches == []  # every page (re-keyed under its new cursor) is still a hit
+    assert len(cache._pages) == 3
+
+
+def test_expired_newest_page_only_reads_newer_rows():
+    log = FakeLog(30)
+    cache = LogCache(ttl=0)
+    cache.get("k", 10, None, log)
+    log.add(2)
+    log.fetches.clear()
+    assert [r["id"] for r in cache.get("k", 10, None, log)] == list(range(32, 22, -1))
+    assert log.fetches == [(10, None, 30)]
+
+
+def test_least_recently_used_page_is_evicted():
+    log = FakeLog(100)
+    cache = LogCache(ttl=60, max_pages=2)
+    cache.get("k", 10, None, log)
+    cache.get("k", 10, 50, log)
+    cache.get("k", 10, None, log)  # touch the newest page
+    cache.get("k", 10, 40, log)
+    assert [key[2] for key in cache._pages] == [None, 40]
+
+
+def test_merge_new_respects_page_filters():
+    log = FakeLog(5)
+    cache = LogCache(ttl=60)
+    gym = {"category": "Gym Workout"}
+    cache.get("k", 10, None, lambda **kw: [], filters=gym)
+    cache.merge_new("k", [{"id": 6, "event_type": "xp_adjust", "category": "Reading"}, {"id": 7, "event_type": "xp_adjust", "category": "Gym Workout"}])
+    assert [r["id"] for r in cache.get("k", 10, None, log, filters=gym)] == [7]
+
+
+def test_invalidate_drops_only_that_save_key():
+    log = FakeLog(5)
+    cache = LogCache(ttl=60)
+    cache.get("a", 10, None, log)
+    cache.get("b", 10, None, log)
+    cache.invalidate("a")
+    assert [key[0] for key in cache._pages] == ["b"]
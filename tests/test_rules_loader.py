@@ -0,0 +1,50 @@
+import json
+import os
+
+from game_rules import XP_PER_HOUR
+from rules_loader import DEFAULT_RULES, RulesLoader
+
+CATEGORY = next(iter(XP_PER_HOUR))
+
+
+def _write(path, data, mtime_ns):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reloads_only_when_the_file_changes(tmp_path):
+    path = tmp_path / "data.json"
+    _write(path, {"xp_rates": {CATEGORY: 2.0}}, 10**18)
+    loader = RulesLoader(str(path))
+
+    first = loader.get()
+    assert first.xp_per_hour[CATEGORY] == 2.0
+    assert loader.get() is first  # same mtime: the compiled tables are reused
+
+    _write(path, {"xp_rates": {CATEGORY: 3.0}}, 10**18 + 10**9)
+    assert loader.get().xp_per_hour[CATEGORY] == 3.0
+
+
+def test_broken_edit_keeps_the_last_good_tables(tmp_path):
+    path = tmp_path / "data.json"
+    _write(path, {"xp_rates": {CATEGORY: 2.0}}, 10**18)
+    loader = RulesLoader(str(path))
+    good = loader.get()
+
+    path.write_text("{not json", encoding="utf-8")
+    os.utime(path, ns=(10**18 + 10**9, 10**18 + 10**9))
+    assert loader.get() is good
+    assert loader.last_error
+
+    _write(path, {"rules": {"healthy_eating_xp": 4}}, 10**18 + 2 * 10**9)
+    assert loader.get().xp_streak["Eating Healthy"] == 4.0
+    assert loader.last_error is None
+
+
+def test_missing_file_means_defaults(tmp_path):
+    loader = RulesLoader(str(tmp_path / "missing.json"))
+    assert loader.get() is DEFAULT_RULES
+
+
+def test_shipped_data_json_keeps_eating_healthy_at_one():
+    assert RulesLoader().get().xp_streak["Eating Healthy"] == 1.0
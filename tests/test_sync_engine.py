@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from game_rules import PlayerState
+from local_store import LocalStore, SyncEngine
+from postgrest_standin import PostgrestStandIn
+from supabase_client import StaleWriteError, SupabaseClient
+
+
+@pytest.fixture
+def server():
+    srv = PostgrestStandIn()
+    srv.start()
+    yield srv
+    srv.stop()
+
+
+def _client(server):
+    return SupabaseClient(server.url, "key", "s1")
+
+
+def _wait_backfill(engine, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while engine.backfilling():
+        assert time.monotonic() < deadline, "backfill did not finish"
+        time.sleep(0.01)
+
+
+def test_bootstrap_returns_with_the_state_and_backfills_the_log(server, tmp_path):
+    cloud = _client(server)
+    cloud.save_state({"Reading": 3.0}, {})
+    cloud.append_logs([{"event_type": "xp_adjust", "payload": {"n": i}} for i in range(1234)])
+
+    store = LocalStore(str(tmp_path / "x.sqlite3"))
+    engine = SyncEngine(store, cloud, batch_size=100, autostart=False)
+    engine.bootstrap()
+    assert store.load_state()[0]["Reading"] == 3.0
+
+    store.append_log("xp_adjust", {"n": "local"})  # written while the history is still arriving
+    _wait_backfill(engine)
+    events = list(store.iter_log_events())
+    assert [ev["payload"]["n"] for ev in events] == list(range(1234)) + ["local"]
+    assert store.unsynced_count() == 1
+
+    engine.push_once()
+    assert len(server.log) == 1235 and store.unsynced_count() == 0
+
+
+def test_stale_patch_is_rebased_onto_the_cloud(server, tmp_path):
+    cloud = _client(server)
+    cloud.save_state(*PlayerState().to_dicts())
+    store = LocalStore(str(tmp_path / "x.sqlite3"))
+    engine = SyncEngine(store, cloud, autostart=False)
+    engine.bootstrap()
+
+    store.patch_state({"xp": {"Reading": 5.0}}, store.next_version())
+    other = _client(server)  # another device gets a newer version in first
+    other.load_state()
+    other.patch_state({"xp": {"Gym Workout": 7.0}}, other.next_version() + 10**9)
+
+    engine.push_once()
+    assert store.take_state_outbox() is None
+    for xp_values, _debt in (cloud.load_state(), store.load_state()):
+        assert (xp_values["Reading"], xp_values["Gym Workout"]) == (5.0, 7.0)
+
+
+def test_lost_conflict_keeps_the_outbox(server, tmp_path):
+    cloud = _client(server)
+    cloud.save_state(*PlayerState().to_dicts())
+    store = LocalStore(str(tmp_path / "x.sqlite3"))
+    engine = SyncEngine(store, cloud, autostart=False, conflict_retries=0)
+    engine.bootstrap()
+
+    store.patch_state({"xp": {"Reading": 5.0}}, store.next_version())
+    other = _client(server)
+    other.load_state()
+    other.patch_state({"xp": {"Gym Workout": 7.0}}, other.next_version() + 10**15)
+
+    with pytest.raises(StaleWriteError):
+        engine.push_once()
+    patch, _version, _full = store.take_state_outbox()
+    assert patch == {"xp": {"Reading": 5.0}}
+    assert store.load_state()[0]["Gym Workout"] == 7.0
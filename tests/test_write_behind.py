@@ -0,0 +1,72 @@
+import threading
+
+from write_behind import WriteBehindQueue
+
+
+class FlakyClient:
+    """Records what was written; raises while `down` is set."""
+
+    def __init__(self):
+        self.down = False
+        self.logs = []
+        self.states = []
+        self.lock = threading.Lock()
+
+    def _check(self):
+        if self.down:
+            raise RuntimeError("offline")
+
+    def append_logs(self, events):
+        self._check()
+        with self.lock:
+            self.logs.extend(ev["payload"]["n"] for ev in events)
+
+    def save_state(self, xp_values, debt_values):
+        self._check()
+        with self.lock:
+            self.states.append(dict(xp_values))
+
+    def state_has_parts(self):
+        return False
+
+    def patch_state(self, patch, version):
+        raise AssertionError("not partitioned")
+
+
+def _queue(client):
+    return WriteBehindQueue(client, flush_interval=0, retries=1, retry_interval=60)
+
+
+def test_writes_land_in_order():
+    client = FlakyClient()
+    wb = _queue(client)
+    for n in range(5):
+        wb.submit_log("xp_adjust", {"n": n})
+    wb.submit_state({"Reading": 1.0}, {})
+    wb.submit_state({"Reading": 2.0}, {})
+    assert wb.flush(5)
+    assert client.logs == [0, 1, 2, 3, 4]
+    assert client.states[-1] == {"Reading": 2.0}
+    assert wb.status() == {"pending": 0, "failed": 0, "last_error": None}
+
+
+def test_failed_writes_are_held_and_retried():
+    client = FlakyClient()
+    wb = _queue(client)
+    client.down = True
+    wb.submit_log("xp_adjust", {"n": 0})
+    wb.submit_state({"Reading": 1.0}, {})
+    assert not wb.flush(5)
+    status = wb.status()
+    assert status["failed"] == 2 and status["last_error"] == "offline"
+    assert client.logs == [] and client.states == []
+
+    # newer work queues behind the held writes
+    wb.submit_log("xp_adjust", {"n": 1})
+    assert not wb.flush(5)
+
+    client.down = False
+    assert wb.flush(5)
+    assert client.logs == [0, 1]
+    assert client.states == [{"Reading": 1.0}]
+    assert wb.status()["failed"] == 0
@@ -0,0 +1,210 @@
+import atexit
+import copy
+import queue
+import threading
+import time
+
+from supabase_client import StaleWriteError, merge_patches
+
+# ---------- WRITE-BEHIND PERSISTENCE ----------
+_STATE = "state"
+_LOG = "log"
+_RETRY = "retry"  # no payload: wakes the worker to retry held writes
+
+
+class WriteBehindQueue:
+    """
+    Background writer for one save_key.
+
+    The render thread only enqueues state snapshots and log events; a daemon
+    thread drains the bounded queue and talks to the client. Consecutive
+    player_state upserts collapse into one (each snapshot is the full state,
+    so only the newest one matters). Pending work is flushed on an interval
+    and again at interpreter shutdown.
+
+    Every log event drained in one pass goes out as a single bulk insert.
+
+    When the table supports it, state goes out as a merged key-level patch
+    (client.patch_state) instead of the full blob.
+
+    Nothing is dropped after the retries run out: log events and the state
+    write that failed are held in order and sent again ahead of new work on
+    the next pass. The worker makes that pass on its own every
+    `retry_interval` seconds while anything is held, and flush() asks for one
+    straight away. Only a stale state write is discarded, since the store
+    already holds something newer. (In the app the client is the LocalStore,
+    which is itself the durable outbox for the cloud.)
+
+    `client` needs save_state(xp_values, debt_values), append_logs(events),
+    state_has_parts() and patch_state(patch, version), where each event is
+    {"event_type", "payload", "snapshot"}.
+    """
+
+    def __init__(
+        self,
+        client,
+        maxsize: int = 256,
+        flush_interval: float = 0.5,
+        retries: int = 3,
+        retry_interval: float = 2.0,
+    ):
+        self.client = client
+        self.flush_interval = float(flush_interval)
+        self.retries = int(retries)
+        self.retry_interval = float(retry_interval)
+
+        self._q = queue.Queue(maxsize=maxsize)
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._dropped = 0
+        self._last_error = None
+        self._closed = False
+
+        # held for the next pass after a failed write (worker thread only)
+        self._held_logs = []
+        self._held_state = None
+        self._held = 0
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---------- PRODUCER SIDE (render thread) ----------
+    def submit_state(self, xp_values: dict, debt_values: dict, patch: dict = None, version: int = 0):
+        """`patch` is the key-level diff since the last submit; None means "unknown, send everything"."""
+        self._put((_STATE, copy.deepcopy(xp_values), copy.deepcopy(debt_values), copy.deepcopy(patch), int(version)))
+
+    def submit_log(self, event_type: str, payload: dict, snapshot=None):
+        self.submit_logs([{"event_type": event_type, "payload": payload, "snapshot": snapshot}])
+
+    def submit_logs(self, events: list):
+        if events:
+            self._put((_LOG, copy.deepcopy(list(events))))
+
+    def _put(self, item):
+        with self._cond:
+            self._pending += 1
+        try:
+            self._q.put(item, timeout=1.0)
+        except queue.Full:
+            with self._cond:
+                self._pending -= 1
+                self._dropped += 1
+                self._last_error = "write queue full"
+                self._cond.notify_all()
+
+    def status(self) -> dict:
+        """`failed` counts writes held for retry (plus any the full queue turned away)."""
+        with self._cond:
+            return {"pending": self._pending, "failed": self._held + self._dropped, "last_error": self._last_error}
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Blocks until everything queued so far has been tried (or timeout); held writes are
+        retried now. Returns True if nothing is left pending or held.
+        """
+        with self._cond:
+            retry = self._held > 0
+        if retry:
+            self._put((_RETRY,))
+
+        deadline = time.monotonic() + float(timeout)
+        with self._cond:
+            while self._pending > 0:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(left)
+            return self._held == 0
+
+    def close(self, timeout: float = 5.0):
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+
+    # ---------- CONSUMER SIDE (worker thread) ----------
+    def _drain(self) -> list:
+        """
+        Waits for one item, lets the flush interval collect more, then takes everything queued.
+        While writes are held it only waits `retry_interval` (an empty list means "retry now").
+        """
+        try:
+            items = [self._q.get(timeout=self.retry_interval if self._held else None)]
+        except queue.Empty:
+            return []
+        if self.flush_interval > 0:
+            time.sleep(self.flush_interval)
+        while True:
+            try:
+                items.append(self._q.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _run(self):
+        while True:
+            items = self._drain()
+
+            logs = [it for it in items if it[0] == _LOG]
+            states = [it for it in items if it[0] == _STATE]
+
+            # held events go first so the log keeps its click order; all of them go out
+            # in one insert. state is written once (all patches merged, or newest snapshot wins)
+            events = self._held_logs + [ev for _kind, batch in logs for ev in batch]
+            self._held_logs = []
+            if events and self._attempt(self.client.append_logs, events) is not None:
+                self._held_logs = events
+            if states or self._held_state is not None:
+                self._write_state(states)
+
+            with self._cond:
+                self._pending -= len(items)
+                self._held = len(self._held_logs) + (1 if self._held_state is not None else 0)
+                if not self._held and not self._dropped:
+                    self._last_error = None
+                self._cond.notify_all()
+
+    def _write_state(self, states: list):
+        """Writes the newest snapshot (or merged patch) together with whatever state write is held."""
+        held, self._held_state = self._held_state, None
+        if states:
+            _kind, xp_values, debt_values, _patch, version = states[-1]
+            try:
+                use_patch = self.client.state_has_parts() and all(it[3] is not None for it in states)
+            except Exception:
+                use_patch = False
+
+            patch = None
+            if use_patch and (held is None or held["patch"] is not None):
+                patch = held["patch"] if held is not None else {}
+                for it in states:
+                    patch = merge_patches(patch, it[3])
+            held = {"xp_values": xp_values, "debt_values": debt_values, "patch": patch, "version": version}
+
+        if held["patch"] is None:
+            err = self._attempt(self.client.save_state, held["xp_values"], held["debt_values"])
+        elif held["patch"]:
+            err = self._attempt(self.client.patch_state, held["patch"], held["version"])
+        else:
+            return
+
+        if err is not None and not isinstance(err, StaleWriteError):
+            self._held_state = held
+
+    def _attempt(self, fn, *args):
+        """Calls fn with retry/backoff. Returns None on success, else the last exception."""
+        err = None
+        for i in range(max(1, self.retries)):
+            try:
+                fn(*args)
+                return None
+            except StaleWriteError as e:
+                err = e
+                break
+            except Exception as e:
+                err = e
+                time.sleep(min(2.0, 0.2 * (2 ** i)))
+
+        with self._cond:
+            self._last_error = str(err)
+        return err